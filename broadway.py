@@ -1,11 +1,9 @@
 import re
 import os
+import argparse
 import time
-import json
-import hashlib
 import logging
-import pandas as pd
-from datetime import datetime, date
+from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
@@ -15,9 +13,24 @@ from selenium.common.exceptions import NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 import undetected_chromedriver as uc
 import random
+from scrapers.checkpoint import Checkpoint
+from scrapers.export import prepare
+from scrapers.metadata import MetadataCache, default_cache
+from scrapers.planner import plan_crawl
+from scrapers.retry import CircuitOpenError, get_page
+from scrapers.venues import default_registry
+from scrapers.writer import open_writer, parse_formats
 
 # --- Configuration ---
 RUN_HEADLESS = True  # <--- Change this to True or False
+LIST_URL = "https://www.broadway.com/shows/tickets/?view_all=true"
+COLUMNS = [
+    "Title", "Link", "Description", "Image URL", "Production Type", "Market Presence", "Theatre",
+    "Age of Production (yrs)", "Category", "Origin", "Date", "Time", "Status",
+]
+# Calendar button aria-labels: "Saturday, Jul 19th ..." (the year comes from the month header)
+CALENDAR_LABEL_RE = re.compile(r'(\w+day, \w+ \d+)')
+CALENDAR_DATE_FORMATS = ("%A, %b %d %Y",)
 
 # --- Setup logging ---
 if not os.path.exists("log"):
@@ -34,14 +47,8 @@ def log_and_print(message):
     print(message)
     logging.info(message)
 
-# --- Hash function for (potential) deduplication ---
-def hash_event(event):
-    return hashlib.md5(json.dumps(event, sort_keys=True).encode()).hexdigest()
-
-# --- Scraper Logic ---
-def scrape_shows():
-    start_time = datetime.now()
-    log_and_print(f"🚀 Scraping started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+# --- Browser Setup ---
+def build_options():
     options = webdriver.ChromeOptions()
     if RUN_HEADLESS:
         options.add_argument("--headless=new")
@@ -58,357 +65,383 @@ def scrape_shows():
     options.add_argument(
         "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.5845.188 Safari/537.36"
     )
+    return options
 
-    driver = None
-    try:
-        driver = uc.Chrome(options=options)
-        driver.get("https://www.broadway.com/shows/tickets/?view_all=true")
-        log_and_print("🌐 Navigated to the website page.")
-        time.sleep(random.uniform(2, 4))
+def start_driver():
+    return uc.Chrome(options=build_options())
 
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.showlistpage__bg-color"))
-        )
+# --- Show List Page ---
+def scrape_show_cards(driver):
+    """Read title, link, description, poster, reviews and price from every card on the list page."""
+    get_page(driver, LIST_URL, wait_for="div.showlistpage__bg-color")
+    log_and_print("🌐 Navigated to the website page.")
+    time.sleep(random.uniform(2, 4))
 
-        shows = driver.find_elements(By.CSS_SELECTOR, 'li.showlistpage__show-card-list--card-container')
-        log_and_print(f"🔍 Found {len(shows)} shows.")
+    shows = driver.find_elements(By.CSS_SELECTOR, 'li.showlistpage__show-card-list--card-container')
+    log_and_print(f"🔍 Found {len(shows)} shows.")
 
-        links = []
+    links = []
 
-        # GET SOME DETAILS ON THE CARD LIST PAGE
-        for i, card in enumerate(shows):
-            try:
-                title_element = card.find_element(By.CSS_SELECTOR, '[data-qa="show-name"]')
-                title = title_element.text.strip()
-                link = title_element.get_attribute("href")
-
-                description = "N/A"
-                desc_elements = card.find_elements(By.CSS_SELECTOR, '.showlistpage__show-card-list--show-description p')
-                if desc_elements:
-                    description = desc_elements[0].text.strip()
-
-                img_url = "N/A"
-                poster_imgs = card.find_elements(By.CSS_SELECTOR, '[data-qa="show-poster"] img')
-                if poster_imgs:
-                    img_url = poster_imgs[0].get_attribute('src') or poster_imgs[0].get_attribute('data-src')
-
-                review_elements = card.find_elements(By.CSS_SELECTOR, '.showlistpage__show-card-list--total-customer-reviews')
-                reviews = review_elements[0].text.strip("()") if review_elements else "N/A"
-
-                price = "N/A"
-                price_containers = card.find_elements(By.CSS_SELECTOR, '.showlistpage__show-card-list--pricing-container')
-
-                for container in price_containers:
-                    if "hide" not in container.get_attribute("class"):
-                        try:
-                            price = container.find_element(By.CSS_SELECTOR, '.showlistpage__show-card-list--show-price').text.strip()
-                            break
-                        except:
-                            continue
-
-
-                if link:
-                    links.append({
-                        "Title": title,
-                        "Link": link,
-                        "Description": description,
-                        "Image URL": img_url,
-                        "Reviews": reviews,
-                        "Price": price
-                    })
-                    # log_and_print(f" [{i+1}] ✅ Extracted: {title} | {link} ")
+    # GET SOME DETAILS ON THE CARD LIST PAGE
+    for i, card in enumerate(shows):
+        try:
+            title_element = card.find_element(By.CSS_SELECTOR, '[data-qa="show-name"]')
+            title = title_element.text.strip()
+            link = title_element.get_attribute("href")
 
-            except Exception as e:
-                log_and_print(f"⚠️ Error processing a show card: {e}")
+            description = "N/A"
+            desc_elements = card.find_elements(By.CSS_SELECTOR, '.showlistpage__show-card-list--show-description p')
+            if desc_elements:
+                description = desc_elements[0].text.strip()
 
+            img_url = "N/A"
+            poster_imgs = card.find_elements(By.CSS_SELECTOR, '[data-qa="show-poster"] img')
+            if poster_imgs:
+                img_url = poster_imgs[0].get_attribute('src') or poster_imgs[0].get_attribute('data-src')
 
+            review_elements = card.find_elements(By.CSS_SELECTOR, '.showlistpage__show-card-list--total-customer-reviews')
+            reviews = review_elements[0].text.strip("()") if review_elements else "N/A"
 
-        wait = WebDriverWait(driver, 10)
-        actions = ActionChains(driver)
+            price = "N/A"
+            price_containers = card.find_elements(By.CSS_SELECTOR, '.showlistpage__show-card-list--pricing-container')
 
-        all_scraped_data = []
+            for container in price_containers:
+                if "hide" not in container.get_attribute("class"):
+                    try:
+                        price = container.find_element(By.CSS_SELECTOR, '.showlistpage__show-card-list--show-price').text.strip()
+                        break
+                    except:
+                        continue
 
-        # ========  ITERATE THROUGH EACH SHOW CARD AND  ============
-        for i, item in enumerate(links):
-            title = item["Title"]
-            link = item["Link"]
 
-            try:
-                # driver.get(link)
-                # wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.showpage__contents")))
-                # log_and_print(f"[{i+1}] ➡️  Opened detail page for {title}")
+            if link:
+                links.append({
+                    "Title": title,
+                    "Link": link,
+                    "Description": description,
+                    "Image URL": img_url,
+                    "Reviews": reviews,
+                    "Price": price
+                })
+                # log_and_print(f" [{i+1}] ✅ Extracted: {title} | {link} ")
 
-                try:
-                    driver.get(link)
-                except Exception as e:
-                    log_and_print(f"⚠️ Timeout loading page for {title}. Retrying after 5 seconds...")
-                    time.sleep(5)
-                    try:
-                        driver.get(link)
-                    except Exception as e:
-                        log_and_print(f"❌ Retry failed for {title}: {e}")
-                        continue
+        except Exception as e:
+            log_and_print(f"⚠️ Error processing a show card: {e}")
 
-                try:
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.showpage__contents")))
-                    log_and_print(f"[{i+1}] ➡️  Opened detail page for {title}")
-                except Exception as e:
-                    log_and_print(f"❌ Could not load detail content for {title}: {e}")
-                    continue
+    return links
 
-                # locate and click the "View Calendar" button
-                try:
-                    calendar_buttons = driver.find_elements(By.CSS_SELECTOR, 'a.showpage__calendar--button[data-qa="rsp-btn-view-calendar"]')
-                    if calendar_buttons and calendar_buttons[0].is_displayed() and calendar_buttons[0].is_enabled():
-                        wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'a.showpage__calendar--button[data-qa="rsp-btn-view-calendar"]')))
-                        driver.execute_script("arguments[0].click();", calendar_buttons[0])
-                        log_and_print(f"🗓️ Clicked 'View Calendar' for {title}")
-                        time.sleep(random.uniform(2, 4))
-                    else:
-                        log_and_print(f"⚠️ 'View Calendar' button not visible or enabled for {title}")
-                except Exception as e:
-                    log_and_print(f"⚠️ Error trying to click 'View Calendar' for {title}: {e}")
+# --- Show Detail Page ---
+def scrape_show_metadata(driver, title):
+    """Production type, origin, category, opening date and venue from the open detail page."""
+    # Production type
+    production_type = "N/A"
+    try:
+        category_section = driver.find_element(By.CSS_SELECTOR, "div.showpage__story--categories")
+        log_and_print(f"✅ 'Categories' section found for {title}")
 
-                
-                # ========  Scrape calendar performances (dates + times) ============
-                calendar_data = []
+        category_links = category_section.find_elements(By.CSS_SELECTOR, "a.showpage__story--button")
+        categories_text = [link.text.strip().lower() for link in category_links]
 
-                while True:
+        if any("musicals" in cat for cat in categories_text):
+            production_type = "Musicals"    
+        elif any("plays" in cat for cat in categories_text):
+            production_type = "Plays"                        
+        else:
+            production_type = "N/A"
 
-                    # Calendar scraping logic
-                    try:
-                        # Wait for calendar to render
-                        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.CalendarBody__root__Anjr2')))
-
-                        # Collect all active performance buttons
-                        performance_buttons = driver.find_elements(By.CSS_SELECTOR, 'button[data-qa="performance-button"]')
-
-
-                        # Get the current visible month + year (e.g., "June 2025")
-                        try:
-                            current_month_year = driver.find_element(By.CSS_SELECTOR, '[data-qa="current-month-year"]').text.strip()
-                            current_year = datetime.strptime(current_month_year, "%B %Y").year
-                        except Exception as e:
-                            log_and_print(f"⚠️ Failed to get current calendar year, using current system year: {e}")
-                            current_year = datetime.now().year
-
-                        #################################
-                        for btn in performance_buttons:
-                            try:
-                                aria_label = btn.get_attribute("aria-label")
-                                time_text = btn.text.strip()
-
-                                if aria_label and time_text:
-                                    # Extract full date part from aria-label using regex
-                                    date_match = re.search(r'(\w+day, \w+ \d+)', aria_label)
-                                    if date_match:
-                                        date_part = date_match.group(1)
-
-                                        # Remove ordinal suffixes (e.g., 28th -> 28)
-                                        date_part = re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_part)
-
-                                        # Parse to datetime object
-                                        date_obj = datetime.strptime(date_part, "%A, %b %d")
-
-                                        # Attach correct year
-                                        date_obj = date_obj.replace(year=current_year)
-                                        formatted_date = date_obj.strftime("%Y-%m-%d")
-
-                                        # Determine status
-                                        today = date.today()
-                                        performance_day = date_obj.date()
-                                        
-                                        if performance_day == today:
-                                            status = "active"
-                                        elif performance_day > today:
-                                            status = "upcoming"
-                                        elif performance_day < today:
-                                            status = "closed"
-                                        else:
-                                            status = "N/A"
-
-                                        calendar_data.append({
-                                            "date": formatted_date,
-                                            "time": time_text,
-                                            "status": status
-                                        })
-
-                                        log_and_print(f"📅 {title} — {formatted_date} at {time_text} ({status})")
-                                    else:
-                                        log_and_print(f"⚠️ Could not extract date from '{aria_label}'")
-
-                            except Exception as e:
-                                log_and_print(f"⚠️ Error reading performance button: {e}")
-
-                        #################################
-
-
-                        # Move to next month if available
-                        next_btn = driver.find_element(By.CSS_SELECTOR, 'button[data-qa="right-arrow"]')
-                        if next_btn.get_attribute("disabled"):
-                            log_and_print("📅 No more future months. Exiting calendar.")
-                            break
-
-                        driver.execute_script("arguments[0].click();", next_btn)
-                        time.sleep(random.uniform(1.5, 3))  # Let next month load
-
-                        
-
-                    except Exception as e:
-                        log_and_print(f"❌ Calendar scraping stopped: {e}")
-                        break
-                # calendar scraping logic ends here
+    except Exception:
+        log_and_print(f"⚠️ No 'Categories' section found for {title}; defaulting to production_type = N/A")
 
-                # Go back to card details page
-                driver.back()
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.showpage__contents")))
-                log_and_print(f"[{i+1}] ➡️  Back to detail page for {title}")
-                time.sleep(2)
+    log_and_print(f"🎭 Production Type for '{title}': {production_type}")
 
-                # Production type
-                production_type = "N/A"
-                try:
-                    category_section = driver.find_element(By.CSS_SELECTOR, "div.showpage__story--categories")
-                    log_and_print(f"✅ 'Categories' section found for {title}")
-                    
-                    category_links = category_section.find_elements(By.CSS_SELECTOR, "a.showpage__story--button")
-                    categories_text = [link.text.strip().lower() for link in category_links]
+    # Origin
+    origin = "N/A"
+    log_and_print(f"🔍'Origin' for {title} is {origin} ")
+
+    # Category
+    category = "show-production"
 
-                    if any("musicals" in cat for cat in categories_text):
-                        production_type = "Musicals"    
-                    elif any("plays" in cat for cat in categories_text):
-                        production_type = "Plays"                        
-                    else:
-                        production_type = "N/A"
+    # Opening date; the production's age is derived from it on every run
+    opening_date = None
 
-                except Exception:
-                    log_and_print(f"⚠️ No 'Categories' section found for {title}; defaulting to production_type = N/A")
+    try:
+        # Find the "Show Dates" section
+        show_dates_heading = driver.find_element(By.XPATH, '//h3[text()="Show Dates"]')
+        show_dates_content = show_dates_heading.find_element(By.XPATH, './following-sibling::div')
 
-                log_and_print(f"🎭 Production Type for '{title}': {production_type}")
+        raw_text = show_dates_content.text.strip()
+        log_and_print(f"📅 Raw show dates text for {title}: {raw_text}")
 
-                # Origin
-                origin = "N/A"
-                log_and_print(f"🔍'Origin' for {title} is {origin} ")
+        # Extract Opening Date using regex
+        match = re.search(r"Opening:\s*([A-Za-z]{3,9}\s\d{1,2},\s\d{4})", raw_text)
+        if match:
+            date_str = match.group(1)
+            try:
+                opening_date = datetime.strptime(date_str, "%b %d, %Y").date().isoformat()
+                log_and_print(f"🎭 Opening date for '{title}': {opening_date}")
+            except Exception as e:
+                log_and_print(f"⚠️ Failed to parse opening date '{date_str}': {e}")
+        else:
+            log_and_print(f"⚠️ No opening date found for {title}")
 
-                # Category
-                category = "show-production"
+    except Exception as e:
+        log_and_print(f"⚠️ Could not find 'Show Dates' section for {title}: {e}")
 
-                # Production age
-                production_age = "N/A"
 
-                try:
-                    # Find the "Show Dates" section
-                    show_dates_heading = driver.find_element(By.XPATH, '//h3[text()="Show Dates"]')
-                    show_dates_content = show_dates_heading.find_element(By.XPATH, './following-sibling::div')
-
-                    raw_text = show_dates_content.text.strip()
-                    log_and_print(f"📅 Raw show dates text for {title}: {raw_text}")
-
-                    # Extract Opening Date using regex
-                    match = re.search(r"Opening:\s*([A-Za-z]{3,9}\s\d{1,2},\s\d{4})", raw_text)
-                    if match:
-                        date_str = match.group(1)
-                        try:
-                            opening_date = datetime.strptime(date_str, "%b %d, %Y")
-                            today = datetime.now()
-
-                            if opening_date > today:
-                                production_age = "Upcoming"
-                                log_and_print(f"🕓 '{title}' has not opened yet. Age: {production_age}")
-                            else:
-                                delta = today - opening_date
-                                years = delta.days // 365
-                                production_age = f"{years}"
-                                log_and_print(f"🎭 Production age for '{title}': {production_age} year(s)")
-                        except Exception as e:
-                            log_and_print(f"⚠️ Failed to parse opening date '{date_str}': {e}")
-                    else:
-                        log_and_print(f"⚠️ No opening date found for {title}")
 
-                except Exception as e:
-                    log_and_print(f"⚠️ Could not find 'Show Dates' section for {title}: {e}")
 
 
 
+    # venue & market presence
+    try:
+        # Get venue name
+        venue_name_el = driver.find_element(By.CSS_SELECTOR, 'a.showpage__venue--name[data-qa="show-theater-link"]')
+        full_venue_name = venue_name_el.text.strip()
+
+        # Remove "Theatre" or "Theater" suffix from the name
+        venue_name = re.sub(r"\b(Theatre|Theater)\b", "", full_venue_name, flags=re.IGNORECASE).strip()
+
+        # Address and market presence from the venue registry; only read for new or stale venues
+        venues = default_registry()
+        venue_link = venue_name_el.get_attribute("href")
+        venue = venues.fresh(full_venue_name, venue_link)
+        if venue is None:
+            venue_address_el = venue_name_el.find_element(By.XPATH, './following-sibling::div')
+            venue_address = venue_address_el.get_attribute('innerHTML').replace('<br>', ' ').strip()
+            venue = venues.record("broadway", full_venue_name, venue_link, address=venue_address)
+        market_presence = venue["market_presence"] if venue else "Unknown"
+
+        log_and_print(f"🏛️ Venue: {venue_name}")
+        log_and_print(f"🌍 Market Presence: {market_presence}")
 
+    except Exception as e:
+        venue_name = "N/A"
+        market_presence = "Unknown"
+        log_and_print(f"⚠️ Venue info not found for {title}: {e}")
 
+    return {
+        "production_type": production_type, "origin": origin, "category": category,
+        "opening_date": opening_date, "theatre": venue_name, "market_presence": market_presence,
+    }
 
-                # venue & market presence
-                try:
-                    # Get venue name
-                    venue_name_el = driver.find_element(By.CSS_SELECTOR, 'a.showpage__venue--name[data-qa="show-theater-link"]')
-                    full_venue_name = venue_name_el.text.strip()
 
-                    # Remove "Theatre" or "Theater" suffix from the name
-                    venue_name = re.sub(r"\b(Theatre|Theater)\b", "", full_venue_name, flags=re.IGNORECASE).strip()
+def production_age_on(opening_date, now):
+    """Whole years since ``opening_date`` (ISO) at ``now``, ``"Upcoming"`` before it opens."""
+    if not opening_date:
+        return "N/A"
+    opening_date = datetime.fromisoformat(opening_date)
+    if opening_date > now:
+        return "Upcoming"
+    return f"{(now - opening_date).days // 365}"
+
 
-                    # Get address
-                    venue_address_el = venue_name_el.find_element(By.XPATH, './following-sibling::div')
-                    venue_address = venue_address_el.get_attribute('innerHTML').replace('<br>', ' ').strip()
+def scrape_show_detail(driver, wait, i, item, now=None, metadata=None):
+    """Scrape one show's calendar and detail-page metadata and return its rows.
 
-                    # Determine market presence
-                    if "New York" in venue_address or "NY" in venue_address or "Broadway" in venue_address:
-                        market_presence = "US"
-                    elif "London" in venue_address or "UK" in venue_address or "England" in venue_address:
-                        market_presence = "UK"
-                    else:
-                        market_presence = "Unknown"
+    ``now`` is the moment statuses are derived against (default: when the show finishes).
+    ``metadata`` is the ``MetadataCache`` the static fields come from when fresh.
+    """
+    title = item["Title"]
+    link = item["Link"]
 
-                    log_and_print(f"🏛️ Venue: {venue_name}")
-                    log_and_print(f"🌍 Market Presence: {market_presence}")
+    get_page(driver, link, wait_for="div.showpage__contents")
+    log_and_print(f"[{i+1}] ➡️  Opened detail page for {title}")
+
+    # locate and click the "View Calendar" button
+    try:
+        calendar_buttons = driver.find_elements(By.CSS_SELECTOR, 'a.showpage__calendar--button[data-qa="rsp-btn-view-calendar"]')
+        if calendar_buttons and calendar_buttons[0].is_displayed() and calendar_buttons[0].is_enabled():
+            wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'a.showpage__calendar--button[data-qa="rsp-btn-view-calendar"]')))
+            driver.execute_script("arguments[0].click();", calendar_buttons[0])
+            log_and_print(f"🗓️ Clicked 'View Calendar' for {title}")
+            time.sleep(random.uniform(2, 4))
+        else:
+            log_and_print(f"⚠️ 'View Calendar' button not visible or enabled for {title}")
+    except Exception as e:
+        log_and_print(f"⚠️ Error trying to click 'View Calendar' for {title}: {e}")
+
+
+    # ========  Scrape calendar performances (dates + times) ============
+    calendar_data = []
+
+    while True:
+
+        # Calendar scraping logic
+        try:
+            # Wait for calendar to render
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.CalendarBody__root__Anjr2')))
+
+            # Collect all active performance buttons
+            performance_buttons = driver.find_elements(By.CSS_SELECTOR, 'button[data-qa="performance-button"]')
+
+
+            # Get the current visible month + year (e.g., "June 2025")
+            try:
+                current_month_year = driver.find_element(By.CSS_SELECTOR, '[data-qa="current-month-year"]').text.strip()
+                current_year = datetime.strptime(current_month_year, "%B %Y").year
+            except Exception as e:
+                log_and_print(f"⚠️ Failed to get current calendar year, using current system year: {e}")
+                current_year = datetime.now().year
+
+            #################################
+            for btn in performance_buttons:
+                try:
+                    aria_label = btn.get_attribute("aria-label")
+                    time_text = btn.text.strip()
+
+                    if aria_label and time_text:
+                        # Full date part of the aria-label, e.g. "Saturday, Jul 19th"; parsed for the
+                        # whole show at once by scrapers.export.prepare
+                        date_match = CALENDAR_LABEL_RE.search(aria_label)
+                        if date_match:
+                            calendar_data.append({
+                                "date": f"{date_match.group(1)} {current_year}",
+                                "time": time_text,
+                            })
+                            log_and_print(f"📅 {title} — {date_match.group(1)} at {time_text}")
+                        else:
+                            log_and_print(f"⚠️ Could not extract date from '{aria_label}'")
 
                 except Exception as e:
-                    venue_name = "N/A"
-                    market_presence = "Unknown"
-                    log_and_print(f"⚠️ Venue info not found for {title}: {e}")
-
-
-                # Save final data row(s)
-                if calendar_data:
-                    for perf in calendar_data:
-                        all_scraped_data.append({
-                            "Title": title,
-                            "Link": link,
-                            "Description": item.get("Description", "N/A"),
-                            "Image URL": item.get("Image URL", "N/A"),
-                            # "Reviews": item.get("Reviews", "N/A"),
-                            # "Price": item.get("Price", "N/A"),
-                            "Production Type": production_type,
-                            "Market Presence": market_presence,
-                            "Theatre": venue_name,
-                            "Age of Production (yrs)": production_age,
-                            "Category": category,
-                            "Origin": origin,
-                            "Date": perf["date"],
-                            "Time": perf["time"],
-                            "Status": perf["status"],
-                        })
-                else:
-                    # If no calendar data, save at least one row
-                    all_scraped_data.append({
-                        "Title": title,
-                        "Link": link,
-                        "Description": item.get("Description", "N/A"),
-                        "Image URL": item.get("Image URL", "N/A"),
-                        # "Reviews": item.get("Reviews", "N/A"),
-                        # "Price": item.get("Price", "N/A"),
-                        "Production Type": production_type,
-                        "Market Presence": market_presence,
-                        "Theatre": venue_name,
-                        "Age of Production (yrs)": production_age,
-                        "Category": category,
-                        "Origin": origin,
-                        "Date": "N/A",
-                        "Time": "N/A",
-                        "Status": "N/A",
-                    })
+                    log_and_print(f"⚠️ Error reading performance button: {e}")
+
+            #################################
+
+
+            # Move to next month if available
+            next_btn = driver.find_element(By.CSS_SELECTOR, 'button[data-qa="right-arrow"]')
+            if next_btn.get_attribute("disabled"):
+                log_and_print("📅 No more future months. Exiting calendar.")
+                break
+
+            driver.execute_script("arguments[0].click();", next_btn)
+            time.sleep(random.uniform(1.5, 3))  # Let next month load
+
+
+
+        except Exception as e:
+            log_and_print(f"❌ Calendar scraping stopped: {e}")
+            break
+    # calendar scraping logic ends here
+
+    # Static metadata (type, opening date, venue...) comes from the cache; the detail page
+    # is only read again for new shows and once a week
+    metadata = metadata or default_cache("broadway")
+    details = metadata.get(link, now)
+    if details is None:
+        # Go back to card details page
+        driver.back()
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.showpage__contents")))
+        log_and_print(f"[{i+1}] ➡️  Back to detail page for {title}")
+        time.sleep(2)
+        details = scrape_show_metadata(driver, title)
+        if details["theatre"] != "N/A":  # a page that didn't render properly is read again next run
+            metadata.put(link, details, now)
+    else:
+        log_and_print(f"🗂️ Metadata for {title} from cache")
+
+    production_type = details["production_type"]
+    origin = details["origin"]
+    category = details["category"]
+    venue_name = details["theatre"]
+    market_presence = details["market_presence"]
+    production_age = production_age_on(details["opening_date"], now or datetime.now())
+    log_and_print(f"🎭 Production age for '{title}': {production_age}")
+
+    # Save final data row(s)
+    show_rows = []
+    if calendar_data:
+        for perf in calendar_data:
+            show_rows.append({
+                "Title": title,
+                "Link": link,
+                "Description": item.get("Description", "N/A"),
+                "Image URL": item.get("Image URL", "N/A"),
+                # "Reviews": item.get("Reviews", "N/A"),
+                # "Price": item.get("Price", "N/A"),
+                "Production Type": production_type,
+                "Market Presence": market_presence,
+                "Theatre": venue_name,
+                "Age of Production (yrs)": production_age,
+                "Category": category,
+                "Origin": origin,
+                "Date": perf["date"],
+                "Time": perf["time"],
+            })
+    else:
+        # If no calendar data, save at least one row
+        show_rows.append({
+            "Title": title,
+            "Link": link,
+            "Description": item.get("Description", "N/A"),
+            "Image URL": item.get("Image URL", "N/A"),
+            # "Reviews": item.get("Reviews", "N/A"),
+            # "Price": item.get("Price", "N/A"),
+            "Production Type": production_type,
+            "Market Presence": market_presence,
+            "Theatre": venue_name,
+            "Age of Production (yrs)": production_age,
+            "Category": category,
+            "Origin": origin,
+            "Date": "N/A",
+            "Time": "N/A",
+            "Status": "N/A",
+        })
+
+    # Dates to YYYY-MM-DD and status against one "now", for every performance at once
+    return prepare("broadway", show_rows, COLUMNS, now=now, status="date",
+                   formats=CALENDAR_DATE_FORMATS, date_format="%Y-%m-%d")
 
+# --- Scraper Logic ---
+def scrape_shows(resume=False, formats=("csv",), budget=None, new_only=False, refresh_metadata=False):
+    start_time = datetime.now()
+    log_and_print(f"🚀 Scraping started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    driver = None
+    finished = False
+    failed = []  # links of shows whose scrape raised: the output doesn't list them
+    checkpoint = Checkpoint("broadway", resume=resume)
+    writer = open_writer("broadway", COLUMNS, formats, dedup="all" if new_only else "run")
+    metadata = MetadataCache("broadway", refresh=refresh_metadata)
+    if checkpoint.completed:
+        for show_rows in checkpoint.rows():
+            writer.write_rows(show_rows)
+        log_and_print(f"♻️ Resumed {len(checkpoint.completed)} show(s) from the checkpoint.")
+    try:
+        driver = start_driver()
+        links = scrape_show_cards(driver)
+        if budget is not None:
+            crawl_plan = plan_crawl("broadway", links, budget)
+            log_and_print(crawl_plan.summary())
+            carried = crawl_plan.carry_forward(writer, exclude=checkpoint.completed)
+            log_and_print(f"📋 Scraping {len(crawl_plan.selected)} of {len(links)} shows; {carried} rows carried forward.")
+            links = crawl_plan.selected
+
+        wait = WebDriverWait(driver, 10)
+        actions = ActionChains(driver)
 
+        # ========  ITERATE THROUGH EACH SHOW CARD AND  ============
+        for i, item in enumerate(links):
+            title = item["Title"]
+            link = item["Link"]
 
+            if checkpoint.is_done(link):
+                log_and_print(f"[{i+1}] ⏭️  Skipping {title} (already in checkpoint)")
+                continue
 
+            try:
+                show_rows = scrape_show_detail(driver, wait, i, item, now=start_time, metadata=metadata)
+            except CircuitOpenError as e:
+                log_and_print(f"⛔ {e}. Skipping the remaining shows.")
+                break
             except Exception as e:
                 log_and_print(f"❌ Error visiting detail page for {title}: {e}")
+                failed.append(link)
+                continue
 
+            writer.write_rows(show_rows)
+            checkpoint.record(link, show_rows)
+        else:
+            finished = True
 
         log_and_print("🛌 Browser closed.")
 
@@ -426,16 +459,61 @@ def scrape_shows():
             f"✅ Scraping finished at {end_time.strftime('%Y-%m-%d %H:%M:%S')} (Duration: {duration:.2f} seconds)"
         )
 
-        if all_scraped_data:
+        log_and_print(metadata.summary())
+        metadata.close()
 
-            os.makedirs("data", exist_ok=True)  # Ensure 'data' folder exists
-            filename = f"data/broadway_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            df = pd.DataFrame(all_scraped_data)
-            df.to_csv(filename, index=False)
-            log_and_print(f"📁 Data saved to {filename}")
+        # A show that failed is missing from the output, not gone from the site
+        writer.close(complete=finished and not failed)
+        if failed:
+            log_and_print(f"⚠️ {len(failed)} show(s) failed; their listings are left as they were.")
+        if writer.rows_written:
+            log_and_print(f"📁 {writer.rows_written} rows saved to {', '.join(writer.paths)}")
         else:
             log_and_print("⚠️ No data to save.")
 
+        if finished:
+            checkpoint.clear()
+        else:
+            checkpoint.close()
+            log_and_print(f"💾 Run incomplete; checkpoint kept at {checkpoint.path}. Rerun with --resume.")
+
+    return writer.rows_written
+
+# --- List-page price snapshot (no detail pages) ---
+def scrape_prices():
+    start_time = datetime.now()
+    log_and_print(f"🚀 Price snapshot started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    driver = None
+    links = []
+    try:
+        driver = start_driver()
+        links = scrape_show_cards(driver)
+    except Exception as e:
+        log_and_print(f"❌ Fatal error in price snapshot: {e}")
+    finally:
+        if driver:
+            driver.quit()
+
+        if links:
+            scraped_at = start_time.strftime("%Y-%m-%d %H:%M:%S")
+            with open_writer("broadway_prices", ["Title", "Link", "Reviews", "Price", "Scraped At"],
+                             timestamp=start_time.strftime("%Y%m%d_%H%M%S")) as writer:
+                writer.write_rows({**item, "Scraped At": scraped_at} for item in links)
+            log_and_print(f"📁 Prices saved to {', '.join(writer.paths)}")
+        else:
+            log_and_print("⚠️ No prices to save.")
+
+    return len(links)
+
 # --- Main Execution Block ---
 if __name__ == "__main__":
-    scrape_shows()
+    parser = argparse.ArgumentParser(description="Scrape broadway.com show calendars.")
+    parser.add_argument("--resume", action="store_true", help="Skip shows recorded in the checkpoint from an interrupted run")
+    parser.add_argument("--formats", type=parse_formats, default=("csv",), help="Output formats, e.g. csv,ndjson")
+    parser.add_argument("--new-only", action="store_true", help="Only write performances no earlier run has written (saved to data/new/)")
+    parser.add_argument("--budget", type=int, help="Only scrape the N highest-priority shows; carry the rest forward")
+    parser.add_argument("--refresh-metadata", action="store_true", help="Re-read every show's static details instead of using the weekly cache")
+    args = parser.parse_args()
+    scrape_shows(resume=args.resume, formats=args.formats, budget=args.budget, new_only=args.new_only,
+                 refresh_metadata=args.refresh_metadata)
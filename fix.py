@@ -1,9 +1,7 @@
 import os
 import time
-import json
-import hashlib
+import argparse
 import logging
-import pandas as pd
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -14,9 +12,20 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import undetected_chromedriver as uc
 import random
+from scrapers.checkpoint import Checkpoint
+from scrapers.expand import expand_schedule, parse_rules
+from scrapers.export import prepare
+from scrapers.venues import default_registry
+from scrapers.writer import open_writer, parse_formats
 
 # --- Configuration ---
 RUN_HEADLESS = True
+# Column order of the output file
+COLUMNS = [
+    "Name", "Link", "Image URL", "Venue Name", "Venue Link",
+    "Market", "Market Presence", "Production Type", "Origin",
+    "Status", "Age of Production", "Date Range", "Date", "Time"
+]
 
 # --- Setup logging ---
 os.makedirs("log", exist_ok=True)
@@ -32,13 +41,7 @@ def log_and_print(message):
     print(message)
     logging.info(message)
 
-def hash_event(event):
-    # Ensure all values are strings before hashing, or handle non-string types
-    # For simplicity, convert all values to string if not already
-    event_str_values = {k: str(v) for k, v in event.items()}
-    return hashlib.md5(json.dumps(event_str_values, sort_keys=True).encode()).hexdigest()
-
-def scrape_shows():
+def scrape_shows(resume=False, formats=("csv",), new_only=False):
     start_time = datetime.now()
     log_and_print(f"🚀 Scraping started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     options = webdriver.ChromeOptions()
@@ -53,6 +56,14 @@ def scrape_shows():
     options.add_argument("--disable-dev-shm-usage") # Overcomes limited resource problems
 
     driver = None
+    finished = False
+    checkpoint = Checkpoint("broadway_shows", resume=resume)
+    writer = open_writer("broadway_shows", COLUMNS, formats, dedup="all" if new_only else "run")
+    venues = default_registry()
+    if checkpoint.completed:
+        for show_rows in checkpoint.rows():
+            writer.write_rows(show_rows)
+        log_and_print(f"♻️ Resumed {len(checkpoint.completed)} show(s) from the checkpoint.")
     try:
         driver = uc.Chrome(options=options)
         driver.get("https://playbill.com/shows/broadway")
@@ -87,9 +98,12 @@ def scrape_shows():
                 log_and_print(f"⚠️ Unexpected error processing card {i+1}: {e}")
 
         wait = WebDriverWait(driver, 10)
-        all_scraped_data = []
 
         for idx, entry in enumerate(links):
+            if checkpoint.is_done(entry["Link"]):
+                log_and_print(f"⏭️ Skipping show #{idx + 1}: {entry['Name']} (already in checkpoint)")
+                continue
+
             log_and_print(
                 f"\n➡️ Visiting show #{idx + 1}: {entry['Name']} ({entry['Link']} {entry['Venue Name']})"
             )
@@ -132,17 +146,21 @@ def scrape_shows():
                         if len(subtitle_elements) > 2 else "N/A"
                     )
 
-                    try:
-                        address_el = driver.find_element(By.CSS_SELECTOR, "ul.bsp-bio-links li:nth-child(2) a")
-                        market_location = address_el.text.strip()
-                        if market_location.endswith("NY") or "NEW YORK" in market_location.upper():
-                            market_location = market_location + " (US)"
-                    except NoSuchElementException: 
-                        log_and_print(f"DEBUG: Address element not found for {entry['Name']}. Setting market_location to N/A.")
-                        market_location = "N/A"
-                    except Exception as e:
-                        log_and_print(f"⚠️ Error extracting market location for {entry['Name']}: {e}")
-                        market_location = "N/A"
+                    # Known venues come from the registry; the address is only read for new or stale ones
+                    venue = venues.fresh(entry["Venue Name"], entry["Venue Link"])
+                    if venue is None:
+                        try:
+                            address_el = driver.find_element(By.CSS_SELECTOR, "ul.bsp-bio-links li:nth-child(2) a")
+                            full_address = address_el.text.strip()
+                        except NoSuchElementException: 
+                            log_and_print(f"DEBUG: Address element not found for {entry['Name']}. Setting market_location to N/A.")
+                            full_address = None
+                        venue = venues.record("broadway_shows", entry["Venue Name"], entry["Venue Link"], address=full_address)
+                    else:
+                        log_and_print(f"🏛️ Known venue: {venue['name']}")
+                    market_location = venue["address"] if venue and venue["address"] else "N/A"
+                    if venue and venue["market_presence"] == "US":
+                        market_location = market_location + " (US)"
 
                     log_and_print(f"🌍 Market: {market} | 🎭 Production Type: {production_type} | 📜 Origin: {origin}")
                     log_and_print(f"📍 Market Presence: {market_location}")
@@ -223,12 +241,9 @@ def scrape_shows():
                             current_date_range_for_schedule = line.strip(": ").strip()
                             log_and_print(f"  Recognized new Date Range for Schedule: '{current_date_range_for_schedule}'")
                         elif "@" in line:
-                            # This line contains a day and a time (e.g., "Monday @ 7pm")
-                            parts = line.split("@")
-                            if len(parts) >= 2:
-                                extracted_day = parts[0].replace("SCHEDULE", "").strip() # Remove "SCHEDULE"
-                                extracted_time = parts[1].strip()
-
+                            # This line contains a day and a time (e.g., "Monday @ 7pm", "Wednesday @ 2pm and 7pm")
+                            rules = parse_rules(line.replace("SCHEDULE", "")) # Remove "SCHEDULE"
+                            for extracted_day, extracted_time in rules:
                                 log_and_print(f"  Parsed Schedule Entry - Date Range: '{current_date_range_for_schedule}' | Day: '{extracted_day}' | Time: '{extracted_time}'")
 
                                 # Append this specific schedule entry to the list
@@ -250,7 +265,7 @@ def scrape_shows():
                                     "Date": extracted_day.strip(),
                                     "Time": extracted_time.strip()
                                 })
-                            else:
+                            if not rules:
                                 log_and_print(f"  DEBUG: Schedule line with '@' did not split into enough parts for {entry['Name']}: '{line}'")
                         else:
                             log_and_print(f"  DEBUG: Skipping unrecognized schedule line format for {entry['Name']}: '{line}'")
@@ -260,11 +275,14 @@ def scrape_shows():
                 except Exception as e:
                     log_and_print(f"⚠️ Error extracting schedule for {entry['Name']}: {e}")
 
-                # --- Append data to all_scraped_data ---
+                # One row per "Weekday @ time" so far; turn each into every date of its range
+                current_show_schedules_list = expand_schedule(current_show_schedules_list, reference=start_time)
+
+                # --- Write this show's rows ---
                 # If no schedules were found for the current show, append a single row with N/A for schedule details
                 if not current_show_schedules_list:
                     log_and_print(f"No specific schedules found for {entry['Name']}. Adding a single entry with N/A schedule fields.")
-                    all_scraped_data.append({
+                    current_show_schedules_list.append({
                         "Name": entry.get("Name", "").strip(),
                         "Link": entry.get("Link", "").strip(),
                         "Image URL": entry.get("Image URL", "").strip(),
@@ -282,18 +300,19 @@ def scrape_shows():
                         "Date": "N/A",
                         "Time": "N/A"
                     })
-                else:
-                    # If schedules were found, extend the main list with all collected schedules for this show
-                    all_scraped_data.extend(current_show_schedules_list)
+
+                current_show_schedules_list = prepare("broadway_shows", current_show_schedules_list, COLUMNS)
+                writer.write_rows(current_show_schedules_list)
+                checkpoint.record(entry["Link"], current_show_schedules_list)
 
                 log_and_print(
-                    f"📌 Finished processing {entry['Name']} with {len(current_show_schedules_list) if current_show_schedules_list else 1} schedule entry/entries.\n"
+                    f"📌 Finished processing {entry['Name']} with {len(current_show_schedules_list)} schedule entry/entries.\n"
                 )
 
             except Exception as e:
                 log_and_print(f"🚫 Critical error while processing show {entry['Name']}: {e}")
                 # In case of a critical error, still try to add a row with basic info and N/A for details not retrieved.
-                all_scraped_data.append({
+                writer.write_rows(prepare("broadway_shows", [{
                     "Name": entry.get("Name", "").strip(),
                     "Link": entry.get("Link", "").strip(),
                     "Image URL": entry.get("Image URL", "").strip(),
@@ -310,7 +329,9 @@ def scrape_shows():
                     "Date Range": "N/A", 
                     "Date": "N/A",
                     "Time": "N/A"
-                })
+                }], COLUMNS))
+
+        finished = True
 
     finally:
         if driver:
@@ -319,38 +340,27 @@ def scrape_shows():
         end_time = datetime.now()
         log_and_print(f"✅ Finished in {(end_time - start_time).total_seconds():.2f}s")
 
-        if all_scraped_data:
-            os.makedirs("data", exist_ok=True)
-            # Ensure the column order is exactly what you want for the CSV
-            columns = [
-                "Name", "Link", "Image URL", "Venue Name", "Venue Link",
-                "Market", "Market Presence", "Production Type", "Origin",
-                "Status", "Age of Production", "Date Range", "Date", "Time"
-            ]
-            df = pd.DataFrame(all_scraped_data)
-            
-            # Ensure all expected columns are present, fill missing ones with N/A
-            for col in columns:
-                if col not in df.columns:
-                    df[col] = "N/A"
-            
-            # Reorder columns to ensure correct output sequence
-            df = df[columns]
-
-            # Apply .strip().replace('\n', ' ') to all string columns
-            # Using .apply(lambda x: x.str.strip().str.replace('\n', ' ') if x.dtype == "object" else x) is more efficient
-            for col in df.columns:
-                if df[col].dtype == 'object': # Check if the column contains strings
-                    df[col] = df[col].apply(lambda x: x.strip().replace('\n', ' ') if isinstance(x, str) else x)
-
-            filename = f"data/broadway_shows_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            df.to_csv(filename, index=False)
-            log_and_print(f"📁 Data saved to {filename}")
+        writer.close(complete=finished)
+        if writer.rows_written:
+            log_and_print(f"📁 {writer.rows_written} rows saved to {', '.join(writer.paths)}")
         else:
             log_and_print("⚠️ No data scraped.")
 
+        if finished:
+            checkpoint.clear()
+        else:
+            checkpoint.close()
+            log_and_print(f"💾 Run incomplete; checkpoint kept at {checkpoint.path}. Rerun with --resume.")
+
+    return writer.rows_written
+
 if __name__ == "__main__":
-    scrape_shows()
+    parser = argparse.ArgumentParser(description="Scrape playbill.com Broadway show details and schedules.")
+    parser.add_argument("--resume", action="store_true", help="Skip shows recorded in the checkpoint from an interrupted run")
+    parser.add_argument("--formats", type=parse_formats, default=("csv",), help="Output formats, e.g. csv,ndjson")
+    parser.add_argument("--new-only", action="store_true", help="Only write performances no earlier run has written (saved to data/new/)")
+    args = parser.parse_args()
+    scrape_shows(resume=args.resume, formats=args.formats, new_only=args.new_only)
 
 
 
@@ -1,11 +1,8 @@
-import re
 import os
+import argparse
 import time
-import json
-import hashlib
 import logging
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
@@ -15,9 +12,20 @@ from selenium.common.exceptions import NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 import undetected_chromedriver as uc
 import random
+from scrapers import sitemap
+from scrapers.checkpoint import Checkpoint
+from scrapers.expand import expand_schedule, parse_rules, range_dates
+from scrapers.metadata import MetadataCache, default_cache
+from scrapers.planner import plan_crawl
+from scrapers.venues import default_registry
+from scrapers.writer import open_writer, parse_formats
 
 # --- Configuration ---
 RUN_HEADLESS = True  # <--- Change this to True or False
+COLUMNS = [
+    "Name", "Link", "Image URL", "Theatre", "Market", "Market Presence", "Production Type", "Origin",
+    "Status", "Age of Production (yrs)", "Date Range", "Date", "Time", "Category",
+]
 
 # --- Setup logging ---
 if not os.path.exists("log"):
@@ -36,16 +44,8 @@ def log_and_print(message):
     logging.info(message)
 
 
-# --- Hash function for (potential) deduplication ---
-def hash_event(event):
-    return hashlib.md5(json.dumps(event, sort_keys=True).encode()).hexdigest()
-
-
-# --- Scraper Logic ---
-def scrape_shows():
-
-    start_time = datetime.now()
-    log_and_print(f"🚀 Scraping started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+# --- Browser Setup ---
+def build_options():
     options = webdriver.ChromeOptions()
     if RUN_HEADLESS:
         options.add_argument("--headless=new")
@@ -55,294 +55,392 @@ def scrape_shows():
     options.add_argument(
         "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.5845.188 Safari/537.36"
     )
+    return options
 
-    driver = None
+
+def start_driver():
+    return uc.Chrome(options=build_options())
+
+
+# --- Show List Page ---
+def scrape_show_cards(driver):
+    """Collect name, link, cover image and venue from every card on the Broadway listing."""
+    driver.get("https://playbill.com/shows/broadway")
+    log_and_print("🌐 Navigated to https://playbill.com/shows/broadway page.")
+    time.sleep(random.uniform(2, 4))
+
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.show-container"))
+    )
+    cards = driver.find_elements(By.CSS_SELECTOR, "div.show-container")
+    log_and_print(f"📦 Found {len(cards)} show cards on the main page.")
+
+    links = []
+    for i, card in enumerate(cards):
+        try:
+            title_element = card.find_element(By.CSS_SELECTOR, "div.prod-title a")
+            name = title_element.text
+            link = title_element.get_attribute("href")
+            img_src = card.find_element(
+                By.CSS_SELECTOR, "div.cover-container img"
+            ).get_attribute("src")
+            venue_element = card.find_element(By.CSS_SELECTOR, "div.prod-venue a")
+            # venue_name = venue_element.text
+            venue_name = venue_element.text.replace("Theatre", "").strip()
+            venue_link = venue_element.get_attribute("href")
+
+            if link:
+                links.append(
+                    {
+                        "Name": name,
+                        "Link": link,
+                        "image url": img_src,
+                        "venue_name": venue_name,
+                        "venue_link": venue_link,
+                    }
+                )
+                # log_and_print(f"🔗 [{i+1}] Found show: {name} - {link}")
+        except NoSuchElementException as e:
+            log_and_print(f"Error finding elements in card: {e}")
+
+    return links
+
+
+def card_from_snapshot(link, row):
+    """Show card for a sitemap-discovered link, from its row in the latest snapshot (None: new show)."""
+    if row is None:
+        return {"Name": None, "Link": link, "image url": None, "venue_name": None, "venue_link": None}
+    return {
+        "Name": row.get("Name"),
+        "Link": link,
+        "image url": row.get("Image URL"),
+        "venue_name": row.get("Theatre"),
+        "venue_link": None,
+    }
+
+
+def fill_card_from_page(driver, entry):
+    """Name, cover image and venue of a new show found through the sitemap, from its open production page."""
+    try:
+        entry["Name"] = driver.find_element(By.CSS_SELECTOR, "h1").text.strip()
+    except NoSuchElementException:
+        entry["Name"] = "N/A"
+    try:
+        entry["image url"] = driver.find_element(
+            By.CSS_SELECTOR, 'meta[property="og:image"]'
+        ).get_attribute("content")
+    except NoSuchElementException:
+        entry["image url"] = "N/A"
+    try:
+        venue_element = driver.find_element(By.CSS_SELECTOR, "ul.bsp-bio-links li:nth-child(1) a")
+        entry["venue_name"] = venue_element.text.replace("Theatre", "").strip()
+        entry["venue_link"] = venue_element.get_attribute("href")
+    except NoSuchElementException:
+        entry["venue_name"] = "N/A"
+    log_and_print(f"🆕 New show from the sitemap: {entry['Name']} at {entry['venue_name']}")
+
+
+# --- Show Detail Page ---
+def scrape_production_details(driver):
+    """Market, production type, origin and the opening / closing date texts of the open production page."""
     try:
-        driver = uc.Chrome(options=options)
-        driver.get("https://playbill.com/shows/broadway")
-        log_and_print("🌐 Navigated to https://playbill.com/shows/broadway page.")
-        time.sleep(random.uniform(2, 4))
+        subtitle_elements = driver.find_elements(
+            By.CSS_SELECTOR, "div.bsp-bio-subtitle h5"
+        )
 
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.show-container"))
+        market = (
+            subtitle_elements[0].get_attribute("textContent").strip()
+            if len(subtitle_elements) > 0
+            else "N/A"
         )
-        cards = driver.find_elements(By.CSS_SELECTOR, "div.show-container")
-        log_and_print(f"📦 Found {len(cards)} show cards on the main page.")
+        production_type = (
+            subtitle_elements[1].get_attribute("textContent").strip()
+            if len(subtitle_elements) > 1
+            else "N/A"
+        )
+        origin = (
+            subtitle_elements[2].get_attribute("textContent").strip()
+            if len(subtitle_elements) > 2
+            else "N/A"
+        )
+    except Exception as e:
+        log_and_print(f"⚠️ Could not extract production details: {e}")
+        market = production_type = origin = "N/A"
 
-        links = []
-        for i, card in enumerate(cards):
+    # --- Opening and closing dates ---
+    opening_date_str = "N/A"
+    closing_date_str = "N/A"
+
+    try:
+        date_blocks = driver.find_elements(
+            By.CSS_SELECTOR, "div.bsp-carousel-slide.with-circular-links"
+        )
+        for block in date_blocks:
             try:
-                title_element = card.find_element(By.CSS_SELECTOR, "div.prod-title a")
-                name = title_element.text
-                link = title_element.get_attribute("href")
-                img_src = card.find_element(
-                    By.CSS_SELECTOR, "div.cover-container img"
-                ).get_attribute("src")
-                venue_element = card.find_element(By.CSS_SELECTOR, "div.prod-venue a")
-                # venue_name = venue_element.text
-                venue_name = venue_element.text.replace("Theatre", "").strip()
-                venue_link = venue_element.get_attribute("href")
-
-                if link:
-                    links.append(
-                        {
-                            "Name": name,
-                            "Link": link,
-                            "image url": img_src,
-                            "venue_name": venue_name,
-                            "venue_link": venue_link,
-                        }
-                    )
-                    # log_and_print(f"🔗 [{i+1}] Found show: {name} - {link}")
-            except NoSuchElementException as e:
-                log_and_print(f"Error finding elements in card: {e}")
+                title_el = block.find_element(
+                    By.CSS_SELECTOR, ".bsp-list-promo-title"
+                )
+                title = (
+                    title_el.text.strip().upper()
+                )  # Normalize to match "OPENING DATE"
+            except:
+                continue
+
+            # Extract all span text parts and combine
+            span_texts = block.find_elements(
+                By.CSS_SELECTOR, ".info-circular span"
+            )
+            full_text = " ".join(
+                [
+                    s.text.strip().upper()
+                    for s in span_texts
+                    if s.text.strip()
+                ]
+            )
+
+            log_and_print(f"🔍 {title} => Date Text: '{full_text}'")
+
+            if title == "OPENING DATE":
+                opening_date_str = full_text
+            elif title == "CLOSING DATE":
+                closing_date_str = full_text
+
+    except Exception as e:
+        log_and_print(f"⚠️ Could not extract opening/closing dates: {e}")
+
+    return {
+        "market": market, "production_type": production_type, "origin": origin,
+        "opening_date": opening_date_str, "closing_date": closing_date_str,
+    }
+
+
+def production_status(opening_date_str, closing_date_str, now):
+    """``(status, age in years)`` at ``now`` from the page's ``"JUN 24 2025"`` opening / closing texts."""
+    status = "Unknown"
+    age_of_production = "N/A"
+
+    if opening_date_str != "N/A":
+        try:
+            opening_dt = datetime.strptime(
+                opening_date_str.title(), "%b %d %Y"
+            )  # Normalize to title case
+            years = (
+                now.year
+                - opening_dt.year
+                - (
+                    (now.month, now.day)
+                    < (opening_dt.month, opening_dt.day)
+                )
+            )
+            age_of_production = f"{years}"
+        except Exception as e:
+            log_and_print(f"⚠️ Failed parsing opening date: {e}")
+
+    if closing_date_str != "N/A":
+        if "CURRENTLY RUNNING" in closing_date_str:
+            status = "Active"
+        else:
+            try:
+                closing_dt = datetime.strptime(
+                    closing_date_str.title(), "%b %d %Y"
+                )
+                if closing_dt < now:
+                    status = "Closed"
+                else:
+                    status = "Upcoming"
+            except:
+                status = "Upcoming"
+
+    # Final fallback
+    if status == "Unknown" and opening_date_str != "N/A":
+        status = "Active"
+
+    return status, age_of_production
+
+
+def scrape_show_detail(driver, wait, idx, entry, now=None, metadata=None):
+    """Scrape one production page's details and schedule and return one row per performance.
+
+    ``metadata`` is the ``MetadataCache`` the static details come from when fresh.
+    """
+    now = now or datetime.now()
+    driver.get(entry["Link"])
+    time.sleep(random.uniform(2, 4))
+
+    try:
+        wait.until(
+            EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "div.bsp-bio-subtitle")
+            )
+        )
+    except Exception as e:
+        log_and_print(f"⚠️ Production page did not finish loading: {e}")
+
+    if not entry.get("Name"):
+        fill_card_from_page(driver, entry)
+
+    # Static details come from the cache; the page is only read for them for new shows and once a week
+    metadata = metadata or default_cache("playbill")
+    details = metadata.get(entry["Link"], now)
+    if details is None:
+        details = scrape_production_details(driver)
+        if details["market"] != "N/A":  # a page that didn't render properly is read again next run
+            metadata.put(entry["Link"], details, now)
+    else:
+        log_and_print(f"🗂️ Details for {entry['Name']} from cache")
+    market = details["market"]
+    production_type = details["production_type"]
+    origin = details["origin"]
+
+    # Address and market come from the venue registry; the page is only read for new or stale venues
+    try:
+        venues = default_registry()
+        venue = venues.fresh(entry["venue_name"], entry["venue_link"])
+        if venue is None:
+            try:
+                full_address = driver.find_element(
+                    By.CSS_SELECTOR, "ul.bsp-bio-links li:nth-child(2) a"
+                ).text.strip()
+            except NoSuchElementException:
+                full_address = None
+            venue = venues.record("playbill", entry["venue_name"], entry["venue_link"], address=full_address)
+        if venue and venue["market_presence"] == "US":
+            market_location = "New York (US)"
+        else:
+            market_location = "N/A"
+    except Exception as e:
+        log_and_print(f"⚠️ Could not look up the venue: {e}")
+        market_location = "N/A"
+
+    log_and_print(
+        f"🌍 Market: {market} | 🎭 Production Type: {production_type} | 📜 Origin: {origin}"
+    )
+    log_and_print(f"📍 Market Presence: {market_location}")
+
+    # --- Production status and age, from the cached dates against this run ---
+    status, age_of_production = production_status(details["opening_date"], details["closing_date"], now)
+    log_and_print(f"📆 Opening Date: {details['opening_date']}")
+    log_and_print(f"📅 Status: {status} | 🕰️ Age: {age_of_production}")
+
+    # --- Extract schedule ---
+    structured_schedule = []
+
+    try:
+        schedule_block = driver.find_element(
+            By.CSS_SELECTOR, "div.bsp-bio-text"
+        ).text
+        date_blocks = [
+            block.strip()
+            for block in schedule_block.split("\n\n")
+            if "@" in block
+        ]
+
+        for block in date_blocks:
+            lines = block.split("\n")
+            print("📄 All lines in block:", lines)
+
+            date_range = ""
+            schedule_data = ""
+
+            if len(lines) >= 2:
+                schedule_line = lines[1].strip()
+                if ":" in schedule_line:
+                    parts = schedule_line.split(":", 1)
+                    date_range = parts[0].strip()
+                    schedule_data = parts[1].strip()
+                else:
+                    schedule_data = schedule_line
+            else:
+                continue
+
+            if range_dates(date_range, now.date()) is None:
+                log_and_print(f"⚠️ Could not parse date range '{date_range}'")
+                continue
+
+            # 🔄 One rule per "Weekday @ time"; expanded to every date of the range below
+            for day_names, time_slot in parse_rules(schedule_data):
+                structured_schedule.append(
+                    {
+                        "Name": entry["Name"],
+                        "Link": entry["Link"],
+                        "Image URL": entry["image url"],
+                        "Theatre": entry["venue_name"],
+                        # "Venue Link": entry["venue_link"],
+                        "Market": market,
+                        "Market Presence": market_location,
+                        "Production Type": production_type,
+                        "Origin": origin,
+                        "Status": status,
+                        "Age of Production (yrs)": age_of_production,
+                        "Date Range": date_range,
+                        "Date": day_names,
+                        "Time": time_slot,
+                        "Category": "show-production",
+                    }
+                )
+
+        structured_schedule = expand_schedule(structured_schedule, reference=now)
+        for row in structured_schedule:
+            log_and_print(f"📅 Day: {row['Date']} | ⏰ Time: {row['Time']}")
+
+    except Exception as e:
+        log_and_print(f"⚠️ Could not extract schedule: {e}")
+
+    return structured_schedule
+
+
+# --- Scraper Logic ---
+def scrape_shows(resume=False, formats=("csv",), budget=None, new_only=False, refresh_metadata=False,
+                 discover="listing"):
+    """Scrape the Broadway productions found on the listing page, or (``discover="sitemap"``) only
+    those whose page changed since the last run, carrying the others forward."""
+
+    start_time = datetime.now()
+    log_and_print(f"🚀 Scraping started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    driver = None
+    finished = False
+    failed = []  # links of shows whose scrape raised: the output doesn't list them
+    checkpoint = Checkpoint("playbill", resume=resume)
+    writer = open_writer("playbill", COLUMNS, formats, dedup="all" if new_only else "run")
+    metadata = MetadataCache("playbill", refresh=refresh_metadata)
+    discovery = None
+    if checkpoint.completed:
+        for show_rows in checkpoint.rows():
+            writer.write_rows(show_rows)
+        log_and_print(f"♻️ Resumed {len(checkpoint.completed)} show(s) from the checkpoint.")
+    try:
+        driver = start_driver()
+        if discover == "sitemap":
+            discovery = sitemap.discover("playbill", card_from_snapshot, now=start_time)
+            log_and_print(discovery.summary())
+            carried = discovery.plan.carry_forward(writer, exclude=checkpoint.completed)
+            log_and_print(f"📋 {carried} rows of unchanged shows carried forward.")
+            links = discovery.plan.selected
+        else:
+            links = scrape_show_cards(driver)
+        if budget is not None and discovery is None:
+            crawl_plan = plan_crawl("playbill", links, budget)
+            log_and_print(crawl_plan.summary())
+            carried = crawl_plan.carry_forward(writer, exclude=checkpoint.completed)
+            log_and_print(f"📋 Scraping {len(crawl_plan.selected)} of {len(links)} shows; {carried} rows carried forward.")
+            links = crawl_plan.selected
 
         wait = WebDriverWait(driver, 10)
         actions = ActionChains(driver)
 
-        all_scraped_data = []
-
         for idx, entry in enumerate(links):
+            if checkpoint.is_done(entry["Link"]):
+                log_and_print(f"⏭️ Skipping show #{idx + 1}: {entry['Name']} (already in checkpoint)")
+                continue
+
             log_and_print(
-                f"\n➡️ Visiting show #{idx + 1}: {entry['Name']} ({entry['Link']} {entry['venue_name']})"
+                f"\n➡️ Visiting show #{idx + 1}: {entry['Name'] or 'new show'} ({entry['Link']} {entry['venue_name']})"
             )
             try:
-                driver.get(entry["Link"])
-                time.sleep(random.uniform(2, 4))
-
-                try:
-                    wait.until(
-                        EC.presence_of_element_located(
-                            (By.CSS_SELECTOR, "div.bsp-bio-subtitle")
-                        )
-                    )
-                    subtitle_elements = driver.find_elements(
-                        By.CSS_SELECTOR, "div.bsp-bio-subtitle h5"
-                    )
-
-                    market = (
-                        subtitle_elements[0].get_attribute("textContent").strip()
-                        if len(subtitle_elements) > 0
-                        else "N/A"
-                    )
-                    production_type = (
-                        subtitle_elements[1].get_attribute("textContent").strip()
-                        if len(subtitle_elements) > 1
-                        else "N/A"
-                    )
-                    origin = (
-                        subtitle_elements[2].get_attribute("textContent").strip()
-                        if len(subtitle_elements) > 2
-                        else "N/A"
-                    )
-
-                    try:
-                        address_el = driver.find_element(
-                            By.CSS_SELECTOR, "ul.bsp-bio-links li:nth-child(2) a"
-                        )
-                        full_address = address_el.text.strip()
-                        if "New York" in full_address or full_address.endswith("NY"):
-                            market_location = "New York (US)"
-                        else:
-                            market_location = "N/A"
-                    except:
-                        market_location = "N/A"
-
-                    log_and_print(
-                        f"🌍 Market: {market} | 🎭 Production Type: {production_type} | 📜 Origin: {origin}"
-                    )
-                    log_and_print(f"📍 Market Presence: {market_location}")
-                except Exception as e:
-                    log_and_print(f"⚠️ Could not extract production details: {e}")
-                    market = production_type = origin = market_location = "N/A"
-
-                # --- Extract production status and age ---
-                status = "Unknown"
-                age_of_production = "N/A"
-                opening_date_str = "N/A"
-
-                try:
-                    date_blocks = driver.find_elements(
-                        By.CSS_SELECTOR, "div.bsp-carousel-slide.with-circular-links"
-                    )
-                    for block in date_blocks:
-                        try:
-                            title_el = block.find_element(
-                                By.CSS_SELECTOR, ".bsp-list-promo-title"
-                            )
-                            title = (
-                                title_el.text.strip().upper()
-                            )  # Normalize to match "OPENING DATE"
-                        except:
-                            continue
-
-                        # Extract all span text parts and combine
-                        span_texts = block.find_elements(
-                            By.CSS_SELECTOR, ".info-circular span"
-                        )
-                        full_text = " ".join(
-                            [
-                                s.text.strip().upper()
-                                for s in span_texts
-                                if s.text.strip()
-                            ]
-                        )
-
-                        log_and_print(f"🔍 {title} => Date Text: '{full_text}'")
-
-                        if title == "OPENING DATE":
-                            opening_date_str = full_text
-                            try:
-                                opening_dt = datetime.strptime(
-                                    full_text.title(), "%b %d %Y"
-                                )  # Normalize to title case
-                                today = datetime.now()
-                                years = (
-                                    today.year
-                                    - opening_dt.year
-                                    - (
-                                        (today.month, today.day)
-                                        < (opening_dt.month, opening_dt.day)
-                                    )
-                                )
-                                age_of_production = f"{years}"
-                            except Exception as e:
-                                log_and_print(f"⚠️ Failed parsing opening date: {e}")
-
-                        elif title == "CLOSING DATE":
-                            if "CURRENTLY RUNNING" in full_text:
-                                status = "Active"
-                            else:
-                                try:
-                                    closing_dt = datetime.strptime(
-                                        full_text.title(), "%b %d %Y"
-                                    )
-                                    if closing_dt < datetime.now():
-                                        status = "Closed"
-                                    else:
-                                        status = "Upcoming"
-                                except:
-                                    status = "Upcoming"
-
-                    # Final fallback
-                    if status == "Unknown" and opening_date_str != "N/A":
-                        status = "Active"
-
-                    log_and_print(f"📆 Opening Date: {opening_date_str}")
-                    log_and_print(f"📅 Status: {status} | 🕰️ Age: {age_of_production}")
-
-                except Exception as e:
-                    log_and_print(f"⚠️ Could not extract status/age: {e}")
-
-                # --- Extract schedule ---
-                structured_schedule = []
-
-                try:
-                    schedule_block = driver.find_element(
-                        By.CSS_SELECTOR, "div.bsp-bio-text"
-                    ).text
-                    date_blocks = [
-                        block.strip()
-                        for block in schedule_block.split("\n\n")
-                        if "@" in block
-                    ]
-
-                    for block in date_blocks:
-                        lines = block.split("\n")
-                        print("📄 All lines in block:", lines)
-
-                        date_range = ""
-                        schedule_data = ""
-
-                        if len(lines) >= 2:
-                            schedule_line = lines[1].strip()
-                            if ":" in schedule_line:
-                                parts = schedule_line.split(":", 1)
-                                date_range = parts[0].strip()
-                                schedule_data = parts[1].strip()
-                            else:
-                                schedule_data = schedule_line
-                        else:
-                            continue
-
-                        # 🧠 Parse actual dates from date_range (e.g. "June 24–29")
-                        try:
-                            year = datetime.now().year
-                            month = date_range.split()[0]
-                            day_start, day_end = map(
-                                int, date_range.replace(month, "").split("–")
-                            )
-                            start_date = datetime.strptime(
-                                f"{month} {day_start} {year}", "%B %d %Y"
-                            )
-                            day_map = {}
-                            for i in range(day_end - day_start + 1):
-                                d = start_date + timedelta(days=i)
-                                weekday = d.strftime("%A").lower()
-                                padded_date = d.strftime(
-                                    "%B %d, %Y"
-                                )  # <-- padded date e.g. June 24, 2025
-                                day_map[weekday] = padded_date
-                        except Exception as e:
-                            log_and_print(
-                                f"⚠️ Could not parse date range '{date_range}': {e}"
-                            )
-                            continue
-
-                        # 🔄 Split entries by comma or 'and'
-                        schedule_entries = re.split(r",|\band\b", schedule_data)
-                        schedule_entries = [
-                            s.strip() for s in schedule_entries if "@" in s
-                        ]
-
-                        for entry_str in schedule_entries:
-                            try:
-                                day_part, time_raw = entry_str.split("@")
-                                day_name = day_part.strip().lower()
-                                time_slot = time_raw.strip()
-
-                                # Remove leftover day names from time
-                                time_slot = re.sub(
-                                    r"\b(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b",
-                                    "",
-                                    time_slot,
-                                    flags=re.IGNORECASE,
-                                ).strip()
-
-                                actual_date = day_map.get(day_name, "Unknown")
-
-                                log_and_print(
-                                    f"📅 Day: {actual_date} | ⏰ Time: {time_slot}"
-                                )
-
-                                structured_schedule.append(
-                                    {
-                                        "Name": entry["Name"],
-                                        "Link": entry["Link"],
-                                        "Image URL": entry["image url"],
-                                        "Theatre": entry["venue_name"],
-                                        # "Venue Link": entry["venue_link"],
-                                        "Market": market,
-                                        "Market Presence": market_location,
-                                        "Production Type": production_type,
-                                        "Origin": origin,
-                                        "Status": status,
-                                        "Age of Production (yrs)": age_of_production,
-                                        "Date Range": date_range,
-                                        "Date": actual_date,  # e.g. June 24, 2025
-                                        "Time": time_slot,
-                                        "Category": "show-production",
-                                    }
-                                )
-                            except Exception as e:
-                                log_and_print(
-                                    f"⚠️ Failed parsing schedule entry '{entry_str}': {e}"
-                                )
-
-                except Exception as e:
-                    log_and_print(f"⚠️ Could not extract schedule: {e}")
-
-                all_scraped_data.extend(structured_schedule)
+                structured_schedule = scrape_show_detail(driver, wait, idx, entry, now=start_time, metadata=metadata)
+                writer.write_rows(structured_schedule)
+                checkpoint.record(entry["Link"], structured_schedule)
 
                 log_and_print(
                     f"📌 Finished scraping {entry['Name']} with {len(structured_schedule)} schedule entries.\n"
@@ -350,7 +448,9 @@ def scrape_shows():
 
             except Exception as e:
                 log_and_print(f"🚫 Error scraping show {entry['Name']}: {e}")
+                failed.append(entry["Link"])
 
+        finished = True
         log_and_print("🛑 Browser closed.")
 
     except Exception as e:
@@ -367,17 +467,39 @@ def scrape_shows():
             f"✅ Scraping finished at {end_time.strftime('%Y-%m-%d %H:%M:%S')} (Duration: {duration:.2f} seconds)"
         )
 
-        if all_scraped_data:
+        log_and_print(metadata.summary())
+        metadata.close()
 
-            os.makedirs("data", exist_ok=True)  # Ensure 'data' folder exists
-            filename = f"data/playbill_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            df = pd.DataFrame(all_scraped_data)
-            df.to_csv(filename, index=False)
-            log_and_print(f"📁 Data saved to {filename}")
+        # A show that failed is missing from the output, not gone from the site
+        writer.close(complete=finished and not failed)
+        if failed:
+            log_and_print(f"⚠️ {len(failed)} show(s) failed; their listings are left as they were.")
+        if writer.rows_written:
+            log_and_print(f"📁 {writer.rows_written} rows saved to {', '.join(writer.paths)}")
         else:
             log_and_print("⚠️ No data to save.")
 
+        if finished:
+            if discovery is not None:
+                discovery.save(crawled=checkpoint.completed)  # failed shows keep their old lastmod
+            checkpoint.clear()
+        else:
+            checkpoint.close()
+            log_and_print(f"💾 Run incomplete; checkpoint kept at {checkpoint.path}. Rerun with --resume.")
+
+    return writer.rows_written
+
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
-    scrape_shows()
+    parser = argparse.ArgumentParser(description="Scrape playbill.com Broadway schedules.")
+    parser.add_argument("--resume", action="store_true", help="Skip shows recorded in the checkpoint from an interrupted run")
+    parser.add_argument("--formats", type=parse_formats, default=("csv",), help="Output formats, e.g. csv,ndjson")
+    parser.add_argument("--new-only", action="store_true", help="Only write performances no earlier run has written (saved to data/new/)")
+    parser.add_argument("--budget", type=int, help="Only scrape the N highest-priority shows; carry the rest forward")
+    parser.add_argument("--discover", choices=("listing", "sitemap"), default="listing",
+                        help="Find shows on the listing page, or only crawl those changed in the sitemap")
+    parser.add_argument("--refresh-metadata", action="store_true", help="Re-read every show's static details instead of using the weekly cache")
+    args = parser.parse_args()
+    scrape_shows(resume=args.resume, formats=args.formats, budget=args.budget, new_only=args.new_only,
+                 refresh_metadata=args.refresh_metadata, discover=args.discover)
@@ -0,0 +1 @@
+"""Shared building blocks for the site scrapers (broadway.py, playbill.py, ...)."""
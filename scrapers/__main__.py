@@ -0,0 +1,152 @@
+"""Command line entry point: ``python -m scrapers <command>``."""
+import argparse
+import sys
+
+from scrapers import archive, catalog, consolidate, dataset, diff, entities, expand, export, history, metadata, planner, queries, runner, scheduler, sitemap, sqlite_store, venues, workqueue, writer
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m scrapers")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run several site scrapers in parallel")
+    run.add_argument("--sites", help=f"Comma separated sites (default: all of {','.join(runner.SITES)})")
+    run.add_argument("--max-browsers", type=int, default=runner.MAX_BROWSERS,
+                     help="Maximum number of scrapers (Chrome instances) running at once")
+    run.add_argument("--cpus", type=int, help="Pin the scrapers and their browsers to this many CPU cores")
+    run.add_argument("--quiet", action="store_true", help="Silence per-site console output (logs are kept)")
+    run.add_argument("--resume", action="store_true", help="Resume sites from their checkpoint journals")
+    run.add_argument("--budget", type=int,
+                     help="Per site, only scrape the N highest-priority shows (see 'plan'); others are carried forward")
+    run.add_argument("--new-only", action="store_true",
+                     help="Only write performances no earlier run has written (cross-run dedup), to data/new/")
+    run.set_defaults(handler=runner.main)
+
+    daemon = commands.add_parser("schedule", help="Run sites forever, each on its own cadence")
+    daemon.add_argument("--sites", help=f"Comma separated sites (default: {','.join(scheduler.CADENCES)})")
+    daemon.add_argument("--every", action="append", metavar="SITE=CADENCE",
+                        help="Override a site's cadence, e.g. --every broadway=6h --every broadway_prices=1h")
+    daemon.add_argument("--max-browsers", type=int, default=runner.MAX_BROWSERS)
+    daemon.add_argument("--cpus", type=int)
+    daemon.set_defaults(handler=scheduler.main)
+
+    queue = commands.add_parser("queue", help="Share one site's show pages across worker processes and hosts")
+    queue.add_argument("action", choices=("enqueue", "work", "collect", "stats"))
+    queue.add_argument("--site", choices=workqueue.QUEUE_SITES, required=True)
+    queue.add_argument("--queue", required=True, help="Queue name, one per run (e.g. broadway-20250718)")
+    queue.add_argument("--backend", choices=tuple(workqueue.BACKENDS), default="sqlite")
+    queue.add_argument("--db", default=workqueue.QUEUE_DB, help="SQLite queue file (sqlite backend)")
+    queue.add_argument("--lease-seconds", type=int, default=workqueue.LEASE_SECONDS)
+    queue.add_argument("--max-attempts", type=int, default=workqueue.MAX_ATTEMPTS)
+    queue.add_argument("--worker-id", help="Defaults to <hostname>-<pid>")
+    queue.add_argument("--formats", type=writer.parse_formats, default=("csv",), help="Output formats for collect")
+    queue.set_defaults(handler=workqueue.main)
+
+    plan = commands.add_parser("plan", help="Show how the refresh planner would rank a site's shows")
+    plan.add_argument("--site", required=True, help="Site snapshot prefix, e.g. broadway or playbill")
+    plan.add_argument("--budget", type=int, help="Number of shows to scrape (default: all, ranked)")
+    plan.add_argument("--as-of", help="Plan as if run at this ISO datetime (default: now)")
+    plan.set_defaults(handler=planner.main)
+
+    parquet = commands.add_parser("dataset", help="Import past CSV snapshots into, or load from, the Parquet dataset")
+    parquet.add_argument("action", choices=("import", "load"))
+    parquet.add_argument("--site", help="Only this site (default: all)")
+    parquet.add_argument("--since", help="load: first run date, YYYY-MM-DD")
+    parquet.add_argument("--overwrite", action="store_true", help="import: rewrite runs already in the dataset")
+    parquet.set_defaults(handler=dataset.main)
+
+    snapshots = commands.add_parser("catalog", help="Query snapshot metadata without opening the files")
+    snapshots.add_argument("action", choices=("refresh", "list", "find"))
+    snapshots.add_argument("--site")
+    snapshots.add_argument("--show", help="find: show link or (partial) title")
+    snapshots.add_argument("--from", dest="start", help="find: first performance date, YYYY-MM-DD")
+    snapshots.add_argument("--to", dest="end", help="find: last performance date, YYYY-MM-DD")
+    snapshots.set_defaults(handler=catalog.main)
+
+    compare = commands.add_parser("diff", help="Added, removed and changed performances between two snapshots")
+    compare.add_argument("old", nargs="?", help="Older snapshot file")
+    compare.add_argument("new", nargs="?", help="Newer snapshot file")
+    compare.add_argument("--latest", metavar="SITE", help="Diff the site's two most recent snapshots")
+    compare.add_argument("--site", help="Site layout, when it cannot be told from the file names")
+    compare.add_argument("--output", help="Write the changes as NDJSON to this file (default: stdout)")
+    compare.add_argument("--summary", action="store_true", help="Only print the counts")
+    compare.set_defaults(handler=diff.main)
+
+    shows = commands.add_parser("history", help="Index snapshots and look up a show's performances across them")
+    shows.add_argument("action", choices=("update", "show"))
+    shows.add_argument("show", nargs="?", help="show: link or (partial) title")
+    shows.add_argument("--site")
+    shows.add_argument("--from", dest="start", help="First performance date, YYYY-MM-DD")
+    shows.add_argument("--to", dest="end", help="Last performance date, YYYY-MM-DD")
+    shows.add_argument("--changes", action="store_true", help="Performances added/removed between snapshots")
+    shows.set_defaults(handler=history.main)
+
+    archived = commands.add_parser("archive", help="Store snapshots in the compact dictionary-encoded archive")
+    archived.add_argument("action", choices=("add", "list", "extract"))
+    archived.add_argument("name", nargs="?", help="extract: snapshot name, e.g. broadway_20250718_105404")
+    archived.add_argument("--site", help="add/list: only this site (default: all)")
+    archived.add_argument("--delete", action="store_true", help="add: remove each CSV once it reads back identically")
+    archived.add_argument("--output", help="extract: CSV path (default: data/<name>.csv)")
+    archived.set_defaults(handler=archive.main)
+
+    resolve = commands.add_parser("entities", help="Match the same show across sites to one canonical id")
+    resolve.add_argument("action", choices=("resolve", "list", "lookup"))
+    resolve.add_argument("title", nargs="?", help="lookup: a show title as any site lists it")
+    resolve.add_argument("--site", help="resolve: only this site's latest snapshot (default: every site)")
+    resolve.add_argument("--shared", action="store_true", help="list: only shows listed on more than one site")
+    resolve.set_defaults(handler=entities.main)
+
+    mapped = commands.add_parser("sitemap", help="Show which productions changed in a site's sitemap since the last run")
+    mapped.add_argument("site", choices=sorted(sitemap.SITEMAPS))
+    mapped.add_argument("--source", help="Sitemap URL or local file (default: the site's sitemap)")
+    mapped.set_defaults(handler=sitemap.main)
+
+    details = commands.add_parser("metadata", help="List or clear the cached static details of shows")
+    details.add_argument("action", choices=("list", "clear"))
+    details.add_argument("--site", help="Only this site (default: all)")
+    details.set_defaults(handler=metadata.main)
+
+    houses = commands.add_parser("venues", help="List the venue registry shared by the scrapers")
+    houses.add_argument("action", choices=("list",))
+    houses.set_defaults(handler=venues.main)
+
+    merged = commands.add_parser("consolidate", help="Merge every site's performances into one canonical table")
+    merged.add_argument("action", choices=("update", "show"))
+    merged.add_argument("show", nargs="?", help="show: title as any site lists it (default: every show)")
+    merged.add_argument("--from", dest="start", help="show: first performance date, YYYY-MM-DD (default: today)")
+    merged.add_argument("--to", dest="end", help="show: last performance date, YYYY-MM-DD")
+    merged.set_defaults(handler=consolidate.main)
+
+    weeks = commands.add_parser("expand", help="List every performance of a weekly schedule over a date range")
+    weeks.add_argument("range", help='e.g. "June 30–August 3"')
+    weeks.add_argument("rules", help='e.g. "Tuesday @ 7pm, Wednesday @ 2pm and 7pm"')
+    weeks.set_defaults(handler=expand.main)
+
+    tidy = commands.add_parser("export", help="Benchmark the vectorised row cleanup shared by the scrapers")
+    tidy.add_argument("action", choices=("bench",))
+    tidy.add_argument("--rows", type=int, default=1_000_000)
+    tidy.set_defaults(handler=export.main)
+
+    store = commands.add_parser("store", help="Load past CSV snapshots into the SQLite store")
+    store.add_argument("--site", help="Only this site (default: all)")
+    store.set_defaults(handler=sqlite_store.main)
+
+    query = commands.add_parser("query", help="Look up performances in the SQLite store")
+    query.add_argument("what", choices=("venue", "show", "date", "venues"))
+    query.add_argument("value", nargs="?", help="Venue name, show title or YYYY-MM-DD")
+    query.add_argument("--site")
+    query.add_argument("--from", dest="start", help="YYYY-MM-DD (default: today)")
+    query.add_argument("--to", dest="end", help="YYYY-MM-DD (default: 30 days after --from)")
+    query.add_argument("--next-week", action="store_true", help="Monday to Sunday of next week")
+    query.set_defaults(handler=queries.main)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
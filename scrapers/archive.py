@@ -0,0 +1,252 @@
+"""Compact long-term archive of snapshots (``data/archive/``).
+
+A broadway.com snapshot is ~7k rows that repeat the same handful of titles,
+descriptions, links and image URLs per performance.  The archive stores
+every cell as a code into one string table shared by all archived
+snapshots, so a description is stored once however many runs repeat it:
+
+* ``strings.bin`` - the shared table, appended as zlib-compressed segments
+  (``<u32 length><zlib(JSON list)>``), one per archived snapshot that
+  brought new strings
+* ``<site>_<stamp>.arc`` - one file per snapshot: a small JSON header
+  (site, columns, row count, block offsets) followed by one zlib block of
+  uint32 codes per column
+
+Codes are stored column by column, where they run in long repeats, so a
+broadway snapshot takes ~5 KB against ~40 KB for the gzipped CSV (~2 MB
+raw).  Reading one snapshot touches one file, decompresses only the
+requested columns and maps codes through the table already in memory::
+
+    archive = Archive()
+    archive.add(snapshots.latest_snapshot("broadway"))
+    archive.read("broadway_20250718_105404", columns=["Title", "Date"])
+
+    python -m scrapers archive add --site broadway --delete
+    python -m scrapers archive extract broadway_20250718_105404
+"""
+import os
+import csv
+import json
+import zlib
+import struct
+import contextlib
+from array import array
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+from scrapers import snapshots
+
+ARCHIVE_DIR = os.path.join("data", "archive")
+MAGIC = b"SCARC1"
+LENGTH = struct.Struct("<I")
+CODE_TYPE = "I"  # uint32
+LEVEL = 9
+
+
+class ArchivedSnapshot(snapshots.Snapshot):
+    """A snapshot read back from the archive; usable wherever a ``snapshots.Snapshot`` is."""
+
+    def __init__(self, archive, name):
+        site, taken_at = snapshots.parse_snapshot_name(f"{name}.csv")
+        super().__init__(archive.path(name), site, taken_at)
+        self.archive = archive
+
+    def rows(self):
+        return self.archive.rows(self.name)
+
+
+class Archive:
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self._strings = None
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.arc")
+
+    # --- shared string table ---
+    def _segments(self):
+        """``(segments, committed length)`` of ``strings.bin``; a half-written last segment is ignored."""
+        path = os.path.join(self.directory, "strings.bin")
+        if not os.path.exists(path):
+            return [], 0
+        with open(path, "rb") as f:
+            data = f.read()
+        segments, position = [], 0
+        while position + LENGTH.size <= len(data):
+            (length,) = LENGTH.unpack_from(data, position)
+            if position + LENGTH.size + length > len(data):
+                break
+            segments.append(data[position + LENGTH.size:position + LENGTH.size + length])
+            position += LENGTH.size + length
+        return segments, position
+
+    def _read_strings(self):
+        strings = []
+        for segment in self._segments()[0]:
+            strings.extend(json.loads(zlib.decompress(segment)))
+        return strings
+
+    @property
+    def strings(self):
+        if self._strings is None:
+            self._strings = self._read_strings()
+        return self._strings
+
+    def _append_strings(self, new):
+        path = os.path.join(self.directory, "strings.bin")
+        segment = zlib.compress(json.dumps(new, ensure_ascii=False).encode("utf-8"), LEVEL)
+        committed = self._segments()[1]
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.truncate(committed)  # drop a half-written segment left by a crash
+            f.seek(committed)
+            f.write(LENGTH.pack(len(segment)) + segment)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    # --- writing ---
+    def add(self, snapshot, overwrite=False):
+        """Archive one ``snapshots.Snapshot``; returns the archive path (None if already archived)."""
+        path = self.path(snapshot.name)
+        if os.path.exists(path) and not overwrite:
+            return None
+        rows = list(snapshot.rows())
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        with self._locked():
+            self._strings = self._read_strings()  # another process may have added strings meanwhile
+            codes = {value: i for i, value in enumerate(self._strings)}
+            new = []
+            blocks = []
+            for column in columns:
+                encoded = array(CODE_TYPE)
+                for row in rows:
+                    value = row.get(column)
+                    value = "" if value is None else str(value)
+                    code = codes.get(value)
+                    if code is None:
+                        code = codes[value] = len(codes)
+                        new.append(value)
+                    encoded.append(code)
+                blocks.append(zlib.compress(encoded.tobytes(), LEVEL))
+            if new:
+                self._append_strings(new)
+                self._strings.extend(new)
+
+            header = json.dumps({
+                "site": snapshot.site, "taken_at": snapshot.taken_at.isoformat(timespec="seconds"),
+                "source": os.path.basename(snapshot.path), "rows": len(rows), "columns": columns,
+                "strings": len(self._strings), "blocks": [len(block) for block in blocks],
+            }).encode("utf-8")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(MAGIC + LENGTH.pack(len(header)) + header)
+                for block in blocks:
+                    f.write(block)
+            os.replace(tmp_path, path)
+        return path
+
+    # --- reading ---
+    def names(self, site=None):
+        """Archived snapshot names, oldest first."""
+        found = []
+        if os.path.isdir(self.directory):
+            for entry in os.listdir(self.directory):
+                if not entry.endswith(".arc"):
+                    continue
+                parsed = snapshots.parse_snapshot_name(f"{entry[:-4]}.csv")
+                if parsed and (not site or parsed[0] == site):
+                    found.append((parsed[1], entry[:-4]))
+        return [name for _, name in sorted(found)]
+
+    def snapshot(self, name):
+        return ArchivedSnapshot(self, name)
+
+    def _open(self, name):
+        with open(self.path(name), "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path(name)} is not a snapshot archive")
+            (length,) = LENGTH.unpack(f.read(LENGTH.size))
+            header = json.loads(f.read(length))
+            return header, len(MAGIC) + LENGTH.size + length
+
+    def header(self, name):
+        return self._open(name)[0]
+
+    def read(self, name, columns=None):
+        """``{column: [values]}`` of one snapshot, only decompressing ``columns`` (default: all)."""
+        header, offset = self._open(name)
+        strings = self.strings
+        if header["strings"] > len(strings):
+            strings = self._strings = self._read_strings()
+        wanted = header["columns"] if columns is None else [c for c in columns if c in header["columns"]]
+        out = {}
+        with open(self.path(name), "rb") as f:
+            position = offset
+            for column, size in zip(header["columns"], header["blocks"]):
+                if column in wanted:
+                    f.seek(position)
+                    codes = array(CODE_TYPE)
+                    codes.frombytes(zlib.decompress(f.read(size)))
+                    out[column] = list(map(strings.__getitem__, codes))
+                position += size
+        return {column: out[column] for column in wanted}
+
+    def rows(self, name, columns=None):
+        table = self.read(name, columns)
+        names = list(table)
+        for values in zip(*table.values()):
+            yield dict(zip(names, values))
+
+    def extract(self, name, path=None):
+        """Write the snapshot back out as CSV (default ``data/<name>.csv``); returns the path."""
+        path = path or os.path.join(snapshots.SNAPSHOT_DIRS[0], f"{name}.csv")
+        table = self.read(name)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            out = csv.writer(f, lineterminator="\n")  # as the snapshots are written, not csv's "\r\n"
+            out.writerow(table)
+            out.writerows(zip(*table.values()))
+        return path
+
+
+def main(args):
+    archive = Archive()
+    if args.action == "add":
+        added = 0
+        for snapshot in snapshots.find_snapshots(args.site):
+            size = os.path.getsize(snapshot.path)
+            path = archive.add(snapshot)
+            if path is None:
+                continue
+            added += 1
+            print(f"{snapshot.path} -> {path} ({size} -> {os.path.getsize(path)} bytes)")
+            if args.delete:
+                if list(archive.rows(snapshot.name)) != [
+                    {k: "" if v is None else str(v) for k, v in row.items()} for row in snapshot.rows()
+                ]:
+                    raise SystemExit(f"{path} does not read back as {snapshot.path}; kept the original")
+                os.remove(snapshot.path)
+        print(f"{added} snapshot(s) archived")
+    elif args.action == "list":
+        for name in archive.names(args.site):
+            header = archive.header(name)
+            print(f"{header['taken_at']}  {header['site']:<14} {header['rows']:>7} rows  "
+                  f"{os.path.getsize(archive.path(name)):>8} bytes  {name}")
+    elif args.action == "extract":
+        if not args.name:
+            raise SystemExit("extract needs a snapshot name, e.g. broadway_20250718_105404")
+        print(archive.extract(args.name, args.output))
+    return 0
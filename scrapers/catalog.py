@@ -0,0 +1,289 @@
+"""Catalog of every snapshot with precomputed metadata (``data/catalog.sqlite``).
+
+For each run the catalog keeps one file (the CSV when the run was saved in
+several formats, as ``snapshots.find_snapshots`` does) with its row count,
+columns, first/last performance date, number of shows, size and SHA-256,
+plus per show how many performances it has on each date.  Writers record
+their files as they close (see ``scrapers.writer``), and ``refresh`` picks
+up files written any other way, or moved to ``data/old/``.  Questions are
+then answered from the catalog without opening a CSV::
+
+    catalog = Catalog()
+    catalog.snapshots(site="broadway")
+    catalog.runs_with_show("Wicked", date(2025, 8, 1), date(2025, 8, 31))
+
+    python -m scrapers catalog find --show Wicked --from 2025-08-01 --to 2025-08-31
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime
+
+from scrapers import snapshots
+
+CATALOG_DB = os.path.join("data", "catalog.sqlite")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        path TEXT PRIMARY KEY,
+        site TEXT NOT NULL,
+        taken_at TEXT NOT NULL,
+        format TEXT NOT NULL,
+        rows INTEGER NOT NULL,
+        columns TEXT NOT NULL,
+        min_date TEXT,
+        max_date TEXT,
+        show_count INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        cataloged_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS snapshot_shows (
+        path TEXT NOT NULL,
+        show_key TEXT NOT NULL,
+        title TEXT,
+        rows INTEGER NOT NULL,
+        min_date TEXT,
+        max_date TEXT,
+        PRIMARY KEY (path, show_key)
+    );
+    CREATE TABLE IF NOT EXISTS show_dates (
+        path TEXT NOT NULL,
+        show_key TEXT NOT NULL,
+        date TEXT NOT NULL,
+        performances INTEGER NOT NULL,
+        PRIMARY KEY (path, show_key, date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_snapshots_site ON snapshots (site, taken_at);
+    CREATE INDEX IF NOT EXISTS idx_snapshots_sha ON snapshots (sha256);
+    CREATE INDEX IF NOT EXISTS idx_snapshot_shows_title ON snapshot_shows (title COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_show_dates_date ON show_dates (date, show_key);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStats:
+    """Metadata accumulated while rows stream through a writer (or a file is scanned)."""
+
+    def __init__(self, site):
+        self.site = site
+        self.rows = 0
+        self.columns = {}  # insertion-ordered set
+        self.shows = {}
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.rows += 1
+            self.columns.update(dict.fromkeys(row))
+            key = snapshots.show_key(row, self.site)
+            if not key:
+                continue
+            show = self.shows.get(key)
+            if show is None:
+                show = self.shows[key] = {"title": snapshots.field(row, self.site, "title"), "rows": 0,
+                                          "min": None, "max": None, "dates": Counter()}
+            show["rows"] += 1
+            performed_on = snapshots.parse_date(snapshots.field(row, self.site, "date"))
+            if performed_on is not None:
+                day = performed_on.isoformat()
+                show["min"] = day if show["min"] is None else min(show["min"], day)
+                show["max"] = day if show["max"] is None else max(show["max"], day)
+                show["dates"][day] += 1
+
+    @property
+    def min_date(self):
+        return min((s["min"] for s in self.shows.values() if s["min"]), default=None)
+
+    @property
+    def max_date(self):
+        return max((s["max"] for s in self.shows.values() if s["max"]), default=None)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Catalog:
+    def __init__(self, path=CATALOG_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'show_months'").fetchone():
+            # Catalogs from before per-date counts: drop the entries, ``refresh`` rebuilds them from the files
+            with self.conn:
+                self.conn.executescript("DROP TABLE show_months; DELETE FROM snapshot_shows; DELETE FROM snapshots;")
+            logger.warning("Snapshot catalog emptied for the per-date schema; run 'catalog refresh' to rebuild it")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, path, site, taken_at, stats, columns=None, sha256=None):
+        """Store (or replace) one file's entry from already computed stats."""
+        stat = os.stat(path)
+        sha256 = sha256 or file_sha256(path)
+        fmt = os.path.splitext(path)[1].lstrip(".")
+        with self.conn:
+            self._forget(path)
+            self.conn.execute(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, site, taken_at.isoformat(timespec="seconds"), fmt, stats.rows,
+                 json.dumps(list(columns or stats.columns)), stats.min_date, stats.max_date, len(stats.shows),
+                 sha256, stat.st_size, stat.st_mtime, datetime.now().isoformat(timespec="seconds")),
+            )
+            self.conn.executemany(
+                "INSERT INTO snapshot_shows VALUES (?, ?, ?, ?, ?, ?)",
+                ((path, key, s["title"], s["rows"], s["min"], s["max"]) for key, s in stats.shows.items()),
+            )
+            self.conn.executemany(
+                "INSERT INTO show_dates VALUES (?, ?, ?, ?)",
+                ((path, key, day, n) for key, s in stats.shows.items() for day, n in s["dates"].items()),
+            )
+
+    def _forget(self, path):
+        for table in ("snapshots", "snapshot_shows", "show_dates"):
+            self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+    def _copy(self, source, path):
+        """Reuse the entry of an identical file (same hash) under a new path, e.g. after a move to data/old/."""
+        stat = os.stat(path)
+        with self.conn:
+            self._forget(path)
+            self.conn.execute(
+                "INSERT INTO snapshots SELECT ?, site, taken_at, format, rows, columns, min_date, max_date, "
+                "show_count, sha256, ?, ?, ? FROM snapshots WHERE path = ?",
+                (path, stat.st_size, stat.st_mtime, datetime.now().isoformat(timespec="seconds"), source),
+            )
+            self.conn.execute(
+                "INSERT INTO snapshot_shows SELECT ?, show_key, title, rows, min_date, max_date "
+                "FROM snapshot_shows WHERE path = ?", (path, source),
+            )
+            self.conn.execute(
+                "INSERT INTO show_dates SELECT ?, show_key, date, performances FROM show_dates WHERE path = ?",
+                (path, source),
+            )
+
+    def refresh(self, directories=snapshots.SNAPSHOT_DIRS):
+        """Catalog new or changed CSV/NDJSON snapshots, one file per run, and drop entries whose file
+        is gone or that are another format of a cataloged run."""
+        indexed = added = 0
+        chosen = {snapshot.path: snapshot for snapshot in snapshots.find_snapshots(None, directories)}
+        runs = {(snapshot.site, snapshot.taken_at.isoformat(timespec="seconds")) for snapshot in chosen.values()}
+        known = {row["path"]: row for row in self.conn.execute("SELECT path, site, taken_at, size, mtime, sha256 FROM snapshots")}
+        for path, row in list(known.items()):
+            if not os.path.exists(path) or (path not in chosen and (row["site"], row["taken_at"]) in runs):
+                with self.conn:
+                    self._forget(path)
+                del known[path]
+        by_hash = {row["sha256"]: path for path, row in known.items()}
+
+        for path, snapshot in chosen.items():
+            stat = os.stat(path)
+            row = known.get(path)
+            if row and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+                continue
+            sha256 = file_sha256(path)
+            if sha256 in by_hash and by_hash[sha256] != path:
+                self._copy(by_hash[sha256], path)
+            else:
+                stats = SnapshotStats(snapshot.site)
+                stats.add_rows(snapshot.rows())
+                self.record(path, snapshot.site, snapshot.taken_at, stats, sha256=sha256)
+                indexed += 1
+            by_hash[sha256] = path
+            added += 1
+        return added, indexed
+
+    # --- queries ---
+    def snapshots(self, site=None, since=None, until=None):
+        """Catalog entries, oldest first, optionally for one site and a ``taken_at`` range."""
+        sql, params = "SELECT * FROM snapshots WHERE 1 = 1", []
+        if site:
+            sql += " AND site = ?"
+            params.append(site)
+        if since:
+            sql += " AND taken_at >= ?"
+            params.append(since.isoformat())
+        if until:
+            sql += " AND taken_at <= ?"
+            params.append(until.isoformat())
+        rows = self.conn.execute(sql + " ORDER BY taken_at, site", params).fetchall()
+        return [dict(row, columns=json.loads(row["columns"])) for row in rows]
+
+    def get(self, path):
+        row = self.conn.execute("SELECT * FROM snapshots WHERE path = ?", (path,)).fetchone()
+        return dict(row, columns=json.loads(row["columns"])) if row else None
+
+    def covering(self, start, end, site=None):
+        """Snapshots whose performance dates overlap ``start``..``end``."""
+        sql = "SELECT * FROM snapshots WHERE min_date <= ? AND max_date >= ?"
+        params = [end.isoformat(), start.isoformat()]
+        if site:
+            sql += " AND site = ?"
+            params.append(site)
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY taken_at", params)]
+
+    def runs_with_show(self, show, start, end, site=None):
+        """Runs listing performances of ``show`` (link, exact or partial title) between ``start`` and ``end``,
+        with how many there are (``performances``) and the first and last of them in the range."""
+        sql = """
+            SELECT s.path, s.site, s.taken_at, ss.title, ss.min_date, ss.max_date,
+                   SUM(d.performances) AS performances, MIN(d.date) AS first_date, MAX(d.date) AS last_date
+            FROM show_dates d
+            JOIN snapshot_shows ss ON ss.path = d.path AND ss.show_key = d.show_key
+            JOIN snapshots s ON s.path = d.path
+            WHERE d.date BETWEEN ? AND ?
+              AND (ss.show_key = ? OR ss.title LIKE ? COLLATE NOCASE)
+        """
+        params = [start.isoformat(), end.isoformat(), show, f"%{show}%"]
+        if site:
+            sql += " AND s.site = ?"
+            params.append(site)
+        sql += " GROUP BY s.path, ss.show_key ORDER BY s.taken_at"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+
+def record_files(paths, site, taken_at, stats, columns=None, catalog_path=CATALOG_DB):
+    """Writer hook: catalog the files a run just produced.  Never fails the run."""
+    try:
+        catalog = Catalog(catalog_path)
+        try:
+            for path in paths:
+                if os.path.exists(path):
+                    catalog.record(path, site, taken_at, stats, columns=columns)
+        finally:
+            catalog.close()
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Could not update the snapshot catalog: {e}")
+
+
+def main(args):
+    from datetime import date
+
+    catalog = Catalog()
+    if args.action == "refresh":
+        added, indexed = catalog.refresh()
+        print(f"{added} file(s) cataloged ({indexed} scanned, {added - indexed} reused by hash)")
+    elif args.action == "list":
+        for entry in catalog.snapshots(site=args.site):
+            print(f"{entry['taken_at']}  {entry['site']:<14} {entry['rows']:>7} rows  {entry['show_count']:>4} shows  "
+                  f"{entry['min_date'] or '-'} .. {entry['max_date'] or '-'}  {entry['path']}")
+    elif args.action == "find":
+        if not args.show:
+            raise SystemExit("find needs --show")
+        start = date.fromisoformat(args.start) if args.start else date.min
+        end = date.fromisoformat(args.end) if args.end else date.max
+        for hit in catalog.runs_with_show(args.show, start, end, site=args.site):
+            print(f"{hit['taken_at']}  {hit['site']:<14} {hit['title']}: {hit['performances']} performance(s) "
+                  f"in {hit['first_date']}..{hit['last_date']}  {hit['path']}")
+    catalog.close()
+    return 0
@@ -0,0 +1,73 @@
+"""Crash-safe per-show checkpoint journal.
+
+Each finished show is appended to ``data/checkpoints/<site>.jsonl`` as one
+JSON line ``{"key": <show link>, "rows": [...]}`` and fsync'd, so a crash or
+hard kill loses at most the show in progress.  A run started with
+``resume=True`` skips the journalled shows and replays their rows; the
+journal is removed once the run's output has been saved.
+"""
+import os
+import json
+import logging
+
+CHECKPOINT_DIR = os.path.join("data", "checkpoints")
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    def __init__(self, site, resume=False, directory=CHECKPOINT_DIR):
+        self.path = os.path.join(directory, f"{site}.jsonl")
+        self.completed = set()
+        os.makedirs(directory, exist_ok=True)
+        if resume:
+            self.completed = {record["key"] for record in self._records()}
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self._file.tell() and not self._ends_with_newline():
+            self._file.write("\n")  # keep new records off a truncated last line
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _records(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A hard kill can leave a half-written last line
+                        logger.warning(f"Ignoring truncated checkpoint line in {self.path}")
+        except FileNotFoundError:
+            return
+
+    def is_done(self, key):
+        return key in self.completed
+
+    def rows(self):
+        """Stream the journalled rows, show by show, in completion order."""
+        seen = set()
+        for record in self._records():
+            if record["key"] in self.completed and record["key"] not in seen:
+                seen.add(record["key"])
+                yield record["rows"]
+
+    def record(self, key, rows):
+        self._file.write(json.dumps({"key": key, "rows": rows}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.completed.add(key)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def clear(self):
+        """Drop the journal after the run's output is safely written."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
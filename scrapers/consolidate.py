@@ -0,0 +1,294 @@
+"""One table of performances across every site (``data/consolidated.sqlite``).
+
+broadway.com calendars, playbill schedules, ticketmaster listings and
+ovationtix (tnny) dates describe the same performances in four layouts.
+Each snapshot is mapped onto one schema (the "Show & Production" fields of
+``text``) and merged into ``performances``, keyed on the canonical show
+(``scrapers.entities``), date and time:
+
+* ``listings`` keeps what each site last said about each performance, with
+  ``first_seen`` / ``last_seen`` and ``dropped`` once the site's newest
+  complete snapshot no longer lists a future performance (a run cut short
+  only adds and refreshes listings);
+* ``performances`` is derived from the listings: each field comes from the
+  first site in ``PRECEDENCE`` (or ``FIELD_PRECEDENCE``) that has a value,
+  sites still listing the performance before those that dropped it, except
+  that any site reporting a cancellation marks it cancelled.
+
+A snapshot only re-derives the performances it lists or drops, so updates
+cost the size of the snapshot, not of the table.  ``ingested`` remembers
+which snapshots are merged; writers merge theirs as they close (see
+``scrapers.writer``) and ``update`` picks up the rest::
+
+    python -m scrapers consolidate update
+    python -m scrapers consolidate show Wicked --from 2025-08-01 --to 2025-08-07
+"""
+import os
+import re
+import sqlite3
+import logging
+from datetime import date, datetime
+
+from scrapers import snapshots
+from scrapers.entities import ENTITIES_DB, Resolver
+from scrapers.normalize import FIELDS, normalize_row
+
+CONSOLIDATED_DB = os.path.join("data", "consolidated.sqlite")
+
+# Most trusted source first; sites not listed rank last
+PRECEDENCE = ("broadway", "playbill", "ticketmaster", "tnny_events", "broadway_shows")
+FIELD_PRECEDENCE = {
+    "production_type": ("playbill", "broadway", "broadway_shows", "ticketmaster", "tnny_events"),  # "Musical", not "Musicals"
+}
+MERGED_FIELDS = ("title", "theatre", "production_type", "origin", "market_presence", "status", "link", "image_url")
+CANCELLED_RE = re.compile(r"cancel", re.IGNORECASE)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS listings (
+        site TEXT NOT NULL,
+        show_id INTEGER NOT NULL,
+        performance_date TEXT NOT NULL,
+        performance_time TEXT NOT NULL,  -- HH:MM, '' when the site gives none
+        title TEXT, theatre TEXT, production_type TEXT, origin TEXT, market_presence TEXT,
+        status TEXT, link TEXT, image_url TEXT,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        dropped INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (site, show_id, performance_date, performance_time)
+    );
+    CREATE INDEX IF NOT EXISTS idx_listings_performance ON listings (show_id, performance_date, performance_time);
+    CREATE TABLE IF NOT EXISTS performances (
+        show_id INTEGER NOT NULL,
+        performance_date TEXT NOT NULL,
+        performance_time TEXT NOT NULL,
+        title TEXT,
+        standardized_title TEXT,
+        day_of_week TEXT NOT NULL,
+        is_cancelled INTEGER NOT NULL,
+        listed INTEGER NOT NULL,  -- 0 once every site dropped it
+        theatre TEXT, production_type TEXT, origin TEXT, market_presence TEXT, status TEXT, link TEXT, image_url TEXT,
+        source TEXT NOT NULL,     -- site the title came from
+        sources TEXT NOT NULL,    -- comma separated sites listing it
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        PRIMARY KEY (show_id, performance_date, performance_time)
+    );
+    CREATE INDEX IF NOT EXISTS idx_performances_date ON performances (performance_date);
+    CREATE INDEX IF NOT EXISTS idx_performances_title ON performances (standardized_title COLLATE NOCASE);
+    CREATE TABLE IF NOT EXISTS ingested (
+        snapshot TEXT PRIMARY KEY,
+        site TEXT NOT NULL,
+        taken_at TEXT NOT NULL,
+        rows INTEGER NOT NULL,
+        ingested_at TEXT NOT NULL
+    );
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def _rank(site, field=None):
+    order = FIELD_PRECEDENCE.get(field, PRECEDENCE)
+    return order.index(site) if site in order else len(order)
+
+
+def merge(listings, standardized_title):
+    """Consolidated row from the listings (dicts) of one performance."""
+    ordered = sorted(listings, key=lambda l: (l["dropped"], _rank(l["site"])))
+    live = [l for l in ordered if not l["dropped"]]
+    out = {}
+    for field in MERGED_FIELDS:
+        candidates = sorted(ordered, key=lambda l: (l["dropped"], _rank(l["site"], field)))
+        out[field] = next((l[field] for l in candidates if l[field]), None)
+    # A cancellation is news the other sites may not have caught up with
+    cancelled = next((l["status"] for l in live if l["status"] and CANCELLED_RE.search(l["status"])), None)
+    if cancelled:
+        out["status"] = cancelled
+    first = ordered[0]
+    performed_on = date.fromisoformat(first["performance_date"])
+    out.update({
+        "show_id": first["show_id"],
+        "performance_date": first["performance_date"],
+        "performance_time": first["performance_time"],
+        "standardized_title": standardized_title,
+        "day_of_week": performed_on.strftime("%A"),
+        "is_cancelled": int(bool(cancelled)),
+        "listed": int(bool(live)),
+        "source": first["site"],
+        "sources": ",".join(sorted({l["site"] for l in live})),
+        "first_seen": min(l["first_seen"] for l in listings),
+        "last_seen": max(l["last_seen"] for l in listings),
+    })
+    return out
+
+
+class Consolidator:
+    def __init__(self, path=CONSOLIDATED_DB, entities_path=ENTITIES_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.resolver = Resolver(entities_path)
+
+    def close(self):
+        self.resolver.close()
+        self.conn.close()
+
+    def ingested(self):
+        return {row["snapshot"] for row in self.conn.execute("SELECT snapshot FROM ingested")}
+
+    def _listings(self, snapshot):
+        """``{(show id, date, time): listing}`` of one snapshot in the common schema."""
+        site = snapshot.site
+        typed = [normalize_row(site, row) for row in snapshot.rows()]
+        resolved = self.resolver.resolve_many(site, [row.get("title") for row in typed])
+        listings = {}
+        for row in typed:
+            if not row.get("title") or row["date"] is None:
+                continue
+            show_id, _ = resolved[row["title"]]
+            key = (show_id, row["date"].isoformat(), row["time"].strftime("%H:%M") if row["time"] else "")
+            listings[key] = {field: row.get(field) for field in MERGED_FIELDS}
+        return listings
+
+    def ingest(self, snapshot, complete=True):
+        """Merge one snapshot; returns the number of performances re-derived.
+
+        Only a ``complete`` snapshot (the site's whole listing) drops the
+        future performances it doesn't list.
+        """
+        site, seen = snapshot.site, snapshot.taken_at.isoformat(timespec="seconds")
+        listings = self._listings(snapshot)
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"""
+                INSERT INTO listings (site, show_id, performance_date, performance_time, {", ".join(MERGED_FIELDS)},
+                                      first_seen, last_seen, dropped)
+                VALUES (?, ?, ?, ?, {", ".join("?" * len(MERGED_FIELDS))}, ?, ?, 0)
+                ON CONFLICT (site, show_id, performance_date, performance_time) DO UPDATE SET
+                    {", ".join(f"{f} = CASE WHEN excluded.last_seen >= last_seen THEN excluded.{f} ELSE {f} END"
+                               for f in MERGED_FIELDS)},
+                    last_seen = MAX(last_seen, excluded.last_seen),
+                    dropped = CASE WHEN excluded.last_seen >= last_seen THEN 0 ELSE dropped END
+                """,
+                ((site, *key, *(values[f] for f in MERGED_FIELDS), seen, seen) for key, values in listings.items()),
+            )
+            touched = set(listings)
+            newest = conn.execute("SELECT MAX(taken_at) FROM ingested WHERE site = ?", (site,)).fetchone()[0]
+            if complete and (newest is None or seen >= newest):
+                # Future performances the site listed before but no longer does
+                dropped = conn.execute(
+                    "SELECT show_id, performance_date, performance_time FROM listings "
+                    "WHERE site = ? AND last_seen < ? AND performance_date >= ? AND dropped = 0",
+                    (site, seen, snapshot.taken_at.date().isoformat()),
+                ).fetchall()
+                conn.execute(
+                    "UPDATE listings SET dropped = 1 "
+                    "WHERE site = ? AND last_seen < ? AND performance_date >= ? AND dropped = 0",
+                    (site, seen, snapshot.taken_at.date().isoformat()),
+                )
+                touched.update(tuple(row) for row in dropped)
+            self._rederive(touched)
+            conn.execute(
+                "INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?, ?)",
+                (snapshot.name, site, seen, len(listings), datetime.now().isoformat(timespec="seconds")),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(touched)
+
+    def _rederive(self, keys):
+        conn = self.conn
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS touched (show_id, performance_date, performance_time)")
+        conn.execute("DELETE FROM touched")
+        conn.executemany("INSERT INTO touched VALUES (?, ?, ?)", keys)
+        grouped = {}
+        for row in conn.execute(
+            "SELECT l.* FROM touched t JOIN listings l USING (show_id, performance_date, performance_time)"
+        ):
+            grouped.setdefault((row["show_id"], row["performance_date"], row["performance_time"]), []).append(dict(row))
+        merged = [merge(listings, self.resolver.titles.get(key[0])) for key, listings in grouped.items()]
+        if not merged:
+            return
+        columns = list(merged[0])
+        conn.executemany(
+            f"INSERT OR REPLACE INTO performances ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            ([row[c] for c in columns] for row in merged),
+        )
+
+    def update(self, found=None, complete=True):
+        """Merge every snapshot not merged yet, oldest first; returns ``(snapshots, performances re-derived)``."""
+        found = snapshots.find_snapshots() if found is None else found
+        done = self.ingested()
+        merged = derived = 0
+        for snapshot in found:
+            if snapshot.site in FIELDS and snapshot.name not in done:
+                derived += self.ingest(snapshot, complete=complete)
+                merged += 1
+        return merged, derived
+
+    def performances(self, start=None, end=None, show=None, listed_only=True):
+        sql, params = "SELECT * FROM performances WHERE 1 = 1", []
+        if start:
+            sql += " AND performance_date >= ?"
+            params.append(start.isoformat())
+        if end:
+            sql += " AND performance_date <= ?"
+            params.append(end.isoformat())
+        if show:
+            show_id = self.resolver.match(show)
+            if show_id is None:
+                return []
+            sql += " AND show_id = ?"
+            params.append(show_id)
+        if listed_only:
+            sql += " AND listed = 1"
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY performance_date, performance_time", params)]
+
+
+def record_files(paths, directory=os.path.dirname(CONSOLIDATED_DB), complete=True):
+    """Writer hook: merge the snapshot a run just wrote.  Never fails the run.
+
+    ``complete`` is False for a run that stopped early, so the shows it
+    didn't get to aren't marked dropped.
+    """
+    for path in paths:
+        parsed = snapshots.parse_snapshot_name(path)
+        if parsed and os.path.exists(path):
+            break
+    else:
+        return
+    try:
+        consolidator = Consolidator(os.path.join(directory, os.path.basename(CONSOLIDATED_DB)),
+                                    os.path.join(directory, os.path.basename(ENTITIES_DB)))
+        try:
+            consolidator.update([snapshots.Snapshot(path, *parsed)], complete=complete)
+        finally:
+            consolidator.close()
+    except Exception as e:  # a bad row or resolver error must not fail a finished scrape
+        logger.warning(f"Could not update the consolidated performances: {type(e).__name__}: {e}")
+
+
+def main(args):
+    consolidator = Consolidator()
+    try:
+        if args.action == "update":
+            merged, derived = consolidator.update()
+            print(f"{merged} snapshot(s) merged, {derived} performance(s) updated")
+        elif args.action == "show":
+            start = date.fromisoformat(args.start) if args.start else date.today()
+            end = date.fromisoformat(args.end) if args.end else None
+            rows = consolidator.performances(start, end, show=args.show)
+            for row in rows:
+                print(f"{row['performance_date']} {row['day_of_week']:<9} {row['performance_time'] or '--:--'}  "
+                      f"{row['standardized_title']:<35} {row['theatre'] or '-':<20} "
+                      f"{'CANCELLED ' if row['is_cancelled'] else ''}[{row['sources']}]")
+            print(f"{len(rows)} performance(s)")
+    finally:
+        consolidator.close()
+    return 0
@@ -0,0 +1,178 @@
+"""Typed, partitioned Parquet dataset of every run.
+
+Layout (hive partitioning, one file per run)::
+
+    data/dataset/site=broadway/run_date=2025-07-18/broadway_20250718_105404.parquet
+
+Rows are normalised to one schema for all sites (see ``scrapers.normalize``):
+real ``date`` / ``time`` columns, dictionary-encoded status and production
+type, zstd compression.  Scrapers write it with ``--formats parquet`` (or
+``csv,parquet``), past CSV snapshots are imported with
+``python -m scrapers dataset import`` and history is read back with ``load``::
+
+    df = load(sites=["broadway"], since=date(2025, 7, 1))
+"""
+import os
+import json
+import logging
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scrapers import snapshots
+from scrapers.normalize import normalize_row
+
+DATASET_DIR = os.path.join("data", "dataset")
+ROW_GROUP_SIZE = 50_000
+COMPRESSION = "zstd"
+
+CATEGORY = pa.dictionary(pa.int16(), pa.string())
+
+SCHEMA = pa.schema([
+    ("scraped_at", pa.timestamp("s")),
+    ("title", pa.string()),
+    ("link", pa.string()),
+    ("performance_date", pa.date32()),
+    ("performance_time", pa.time32("s")),
+    ("status", CATEGORY),
+    ("production_type", CATEGORY),
+    ("category", CATEGORY),
+    ("origin", CATEGORY),
+    ("market", CATEGORY),
+    ("market_presence", CATEGORY),
+    ("theatre", CATEGORY),
+    ("location", CATEGORY),
+    ("age_of_production", pa.int16()),
+    ("date_range", pa.string()),
+    ("description", pa.string()),
+    ("image_url", pa.string()),
+    ("venue_link", pa.string()),
+    ("extra", pa.string()),  # JSON of any site columns without a common field
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("site", pa.string()), ("run_date", pa.date32())]), flavor="hive")
+
+logger = logging.getLogger(__name__)
+
+
+def run_path(site, scraped_at, directory=DATASET_DIR):
+    return os.path.join(
+        directory, f"site={site}", f"run_date={scraped_at:%Y-%m-%d}", f"{site}_{scraped_at:%Y%m%d_%H%M%S}.parquet"
+    )
+
+
+def to_table(site, rows, scraped_at):
+    columns = {name: [] for name in SCHEMA.names}
+    for row in rows:
+        typed = normalize_row(site, row)
+        extra = typed.pop("extra")
+        typed.update(
+            scraped_at=scraped_at,
+            performance_date=typed.pop("date"),
+            performance_time=typed.pop("time"),
+            extra=json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+        for name, values in columns.items():
+            values.append(typed.get(name))
+    return pa.table(columns, schema=SCHEMA)
+
+
+class DatasetWriter:
+    """Row writer (see ``scrapers.writer``) that appends a run to the dataset.
+
+    ``open_writer`` hands it the usual ``data/<site>_<timestamp>.parquet``
+    path; the site and timestamp are taken from that name and the file is
+    placed in its partition instead.  Rows are buffered and flushed as row
+    groups of ``ROW_GROUP_SIZE``.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, path, columns=None):
+        site, scraped_at = snapshots.parse_snapshot_name(path.replace(".parquet", ".csv"))
+        directory = os.path.join(os.path.dirname(path) or ".", "dataset")
+        self.site = site
+        self.scraped_at = scraped_at
+        self.path = run_path(site, scraped_at, directory)
+        self.columns = SCHEMA.names
+        self._buffer = []
+        self._writer = None
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        table = to_table(self.site, self._buffer, self.scraped_at)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, SCHEMA, compression=COMPRESSION)
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def write_rows(self, rows):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def import_snapshot(snapshot, directory=DATASET_DIR, overwrite=False):
+    """Convert one past CSV/NDJSON snapshot into its dataset file; returns the row count."""
+    path = run_path(snapshot.site, snapshot.taken_at, directory)
+    if os.path.exists(path) and not overwrite:
+        return 0
+    table = to_table(snapshot.site, snapshot.rows(), snapshot.taken_at)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(table, path, compression=COMPRESSION, row_group_size=ROW_GROUP_SIZE)
+    return table.num_rows
+
+
+def open_dataset(directory=DATASET_DIR):
+    return ds.dataset(directory, format="parquet", partitioning=PARTITIONING)
+
+
+def load(sites=None, since=None, until=None, columns=None, directory=DATASET_DIR):
+    """History as a DataFrame, pruned to the requested sites and run dates before any file is read."""
+    if not os.path.isdir(directory):
+        return pa.table({}).to_pandas()
+    conditions = []
+    if sites:
+        conditions.append(pc.field("site").isin(list(sites)))
+    if since:
+        conditions.append(pc.field("run_date") >= pa.scalar(since, pa.date32()))
+    if until:
+        conditions.append(pc.field("run_date") <= pa.scalar(until, pa.date32()))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return open_dataset(directory).to_table(columns=columns, filter=expression).to_pandas()
+
+
+def main(args):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.action == "import":
+        total = 0
+        for snapshot in snapshots.find_snapshots(args.site):
+            if snapshot.site not in snapshots.FIELDS:
+                continue
+            rows = import_snapshot(snapshot, overwrite=args.overwrite)
+            if rows:
+                logger.info(f"Imported {rows} rows from {snapshot.path}")
+            total += rows
+        logger.info(f"{total} rows imported into {DATASET_DIR}")
+    else:
+        since = date.fromisoformat(args.since) if args.since else None
+        start = datetime.now()
+        df = load(sites=[args.site] if args.site else None, since=since)
+        elapsed = (datetime.now() - start).total_seconds() * 1000
+        print(f"{len(df)} rows loaded in {elapsed:.0f} ms")
+        if len(df):
+            print(df.groupby(["site", "run_date"], observed=True).size().to_string())
+    return 0
@@ -0,0 +1,105 @@
+"""Persistent per-site index of events already scraped.
+
+An event is identified by ``(site, title, performance date, time)``, plus
+the venue (``theatre`` / ``location``) on sites that give one - a touring
+show plays the same title at the same hour in several cities - with title
+whitespace/case, venue names and the sites' date and time formats
+normalised, and hashed to 64 bits (``hash_event``).  The hashes of every event ever written
+are kept in ``data/dedup/<site>.u64``: a sorted array of little-endian
+uint64, 8 bytes per event, memory-mapped and searched with binary search,
+so lookups are O(log n) and a million events take 8 MB.  Hashes seen during
+the current run live in a set and are merged into the file on ``commit``.
+
+The writers (``scrapers.writer``) use it to drop duplicate performances
+within a run and, with ``dedup="all"``, to emit only events never seen in
+any earlier run.
+"""
+import os
+import hashlib
+
+import numpy as np
+
+from scrapers import snapshots
+from scrapers.normalize import FIELDS, parse_date, parse_time, venue_key
+
+DEDUP_DIR = os.path.join("data", "dedup")
+DTYPE = np.dtype("<u8")
+VENUE_FIELDS = ("theatre", "location")
+
+
+def event_key(site, row):
+    """The stable identity of one performance."""
+    title = snapshots.field(row, site, "title") or ""
+    raw_date = snapshots.field(row, site, "date") or ""
+    raw_time = snapshots.field(row, site, "time") or ""
+    if not raw_time and " - " in raw_date:
+        raw_time = raw_date.split(" - ", 1)[1]
+    performed_on, starts_at = parse_date(raw_date), parse_time(raw_time)
+    key = (
+        site,
+        " ".join(title.split()).casefold(),
+        performed_on.isoformat() if performed_on else raw_date,
+        starts_at.strftime("%H:%M") if starts_at else raw_time,
+    )
+    for name in VENUE_FIELDS:
+        if name in FIELDS.get(site, {}):
+            value = snapshots.field(row, site, name)
+            key += (venue_key(value) if name == "theatre" else " ".join((value or "").split()).casefold(),)
+    return key
+
+
+def hash_event(site, row):
+    """64-bit hash of ``event_key``; stable across runs, processes and machines."""
+    digest = hashlib.blake2b("\x1f".join(event_key(site, row)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class DedupIndex:
+    def __init__(self, site, directory=DEDUP_DIR):
+        self.site = site
+        self.path = os.path.join(directory, f"{site}.u64")
+        self.pending = set()
+        self._stored = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return np.empty(0, DTYPE)
+        return np.memmap(self.path, dtype=DTYPE, mode="r")
+
+    def __len__(self):
+        return len(self._stored) + len(self.pending)
+
+    def seen_before(self, digests):
+        """For each hash, was the event written by an earlier (committed) run?"""
+        digests = np.asarray(digests, dtype=DTYPE)
+        stored = self._stored
+        if not len(stored):
+            return np.zeros(len(digests), dtype=bool)
+        i = np.searchsorted(stored, digests)
+        return stored[np.minimum(i, len(stored) - 1)] == digests
+
+    def split(self, rows):
+        """``(rows new to this run, rows new to every run)``; all of them are remembered for ``commit``."""
+        fresh, digests = [], []
+        for row in rows:
+            digest = hash_event(self.site, row)
+            if digest not in self.pending:
+                self.pending.add(digest)
+                fresh.append(row)
+                digests.append(digest)
+        seen = self.seen_before(digests)
+        return fresh, [row for row, old in zip(fresh, seen) if not old]
+
+    def commit(self):
+        """Merge this run's hashes into the sorted file (atomic replace)."""
+        if not self.pending:
+            return
+        added = np.fromiter(self.pending, dtype=DTYPE, count=len(self.pending))
+        merged = np.union1d(self._load(), added)  # re-read: another process may have committed meanwhile
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        merged.astype(DTYPE).tofile(tmp_path)
+        self._stored = None  # drop the memmap before replacing the file it maps
+        os.replace(tmp_path, self.path)
+        self._stored = self._load()
+        self.pending = set()
@@ -0,0 +1,258 @@
+"""What changed between two snapshots of a site.
+
+Rows are matched on the natural key (site, title, performance date, time),
+located through each site's own column layout (``scrapers.normalize.FIELDS``)
+and normalised so ``2025-07-19`` / ``July 19, 2025`` or ``8pm`` / ``8:00 PM``
+compare equal.  Any other column that differs makes the row "changed".
+
+It is a hash join in bounded memory: snapshots are streamed in Arrow
+batches of ``BLOCK_SIZE`` bytes, the older one is reduced to
+``key -> (row hash, row number)``, the newer one is probed against it, and
+a final pass over the older file fetches only the rows that were removed or
+changed.  Rows become Python dicts only when they are reported.
+
+    python -m scrapers diff data/old/broadway_20250717_172724.csv data/broadway_20250718_105404.csv
+    python -m scrapers diff --latest broadway
+"""
+import os
+import csv
+import sys
+import json
+from bisect import bisect_left
+from collections import Counter
+from itertools import repeat
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+
+from scrapers import snapshots
+from scrapers.normalize import FIELDS, parse_date, parse_time
+
+BLOCK_SIZE = 16 << 20  # bytes of CSV parsed per batch
+SEP = "\x1f"
+ROW_SEP = "\x1e"
+
+
+class Change:
+    def __init__(self, kind, key, old=None, new=None, fields=None):
+        self.kind = kind      # "added" | "removed" | "changed"
+        self.key = key
+        self.old = old
+        self.new = new
+        self.fields = fields or {}  # changed: column -> (old value, new value)
+
+    def to_dict(self):
+        out = {"change": self.kind, "site": self.key[0], "title": self.key[1],
+               "date": self.key[2], "time": self.key[3]}
+        if self.kind == "changed":
+            out["fields"] = {name: list(values) for name, values in self.fields.items()}
+        else:
+            out["row"] = self.new if self.kind == "added" else self.old
+        return out
+
+
+def read_batches(snapshot, block_size=BLOCK_SIZE):
+    """``(columns, record batches)`` of the snapshot, every column as a non-null string."""
+    if snapshot.path.endswith(".ndjson"):
+        with open(snapshot.path, encoding="utf-8") as f:
+            first = f.readline()
+        columns = list(json.loads(first)) if first.strip() else []
+        if not columns:
+            return columns, iter(())
+        # An explicit schema keeps ISO dates from being inferred as timestamps
+        table = pa_json.read_json(
+            snapshot.path,
+            read_options=pa_json.ReadOptions(block_size=block_size),
+            parse_options=pa_json.ParseOptions(
+                explicit_schema=pa.schema([(c, pa.string()) for c in columns]), unexpected_field_behavior="ignore"
+            ),
+        )
+        return columns, iter(pa.table({c: pc.fill_null(table[c], "") for c in columns}).to_batches())
+
+    with open(snapshot.path, newline="", encoding="utf-8") as f:
+        columns = next(csv.reader(f), [])
+    if not columns:
+        return columns, iter(())
+    reader = pa_csv.open_csv(
+        snapshot.path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={c: pa.string() for c in columns}, strings_can_be_null=False, quoted_strings_can_be_null=False
+        ),
+    )
+    return columns, iter(reader)
+
+
+def project(batch, columns):
+    """The batch's columns in ``columns`` order; missing ones are empty strings."""
+    names = batch.schema.names
+    if names == columns:
+        return batch.columns
+    empty = pa.array([""] * batch.num_rows, pa.string())
+    return [batch.column(names.index(c)) if c in names else empty for c in columns]
+
+
+def _parse_when(when):
+    raw_date, _, raw_time = when.partition(SEP)
+    if not raw_time and " - " in raw_date:
+        raw_time = raw_date.split(" - ", 1)[1]
+    performed_on, starts_at = parse_date(raw_date), parse_time(raw_time)
+    return SEP.join((
+        performed_on.isoformat() if performed_on else raw_date,
+        starts_at.strftime("%H:%M") if starts_at else raw_time,
+    ))
+
+
+def _normalize_title(title):
+    return " ".join(title.split()).casefold()
+
+
+class KeyMaker:
+    """Natural keys ``site|title|date|time`` for a batch of rows.
+
+    Titles and date/time pairs repeat heavily, so the columns are
+    dictionary-encoded and each distinct value is parsed once.  Keys repeated
+    within a snapshot get an occurrence number so duplicates pair up in order.
+    """
+
+    def __init__(self, site, columns):
+        self.site = site
+        self.positions = {}
+        for name in ("title", "date", "time"):
+            column = FIELDS.get(site, {}).get(name)
+            self.positions[name] = columns.index(column) if column in columns else None
+        self._titles = {}
+        self._when = {}
+        self._seen = {}
+
+    def _column(self, arrays, name):
+        position = self.positions[name]
+        return arrays[position] if position is not None else pa.array([""] * len(arrays[0]), pa.string())
+
+    @staticmethod
+    def _memo(array, cache, parse):
+        encoded = pc.dictionary_encode(array)
+        mapped = []
+        for value in encoded.dictionary.to_pylist():
+            if value not in cache:
+                cache[value] = parse(value)
+            mapped.append(cache[value])
+        return pa.array(mapped, pa.string()).take(encoded.indices)
+
+    def __call__(self, arrays):
+        titles = self._memo(self._column(arrays, "title"), self._titles, _normalize_title)
+        when = self._memo(
+            pc.binary_join_element_wise(self._column(arrays, "date"), self._column(arrays, "time"), SEP),
+            self._when, _parse_when,
+        )
+        keys = pc.binary_join_element_wise(self.site, titles, when, SEP).to_pylist()
+        seen = self._seen
+        if len(set(keys)) == len(keys) and seen.keys().isdisjoint(keys):
+            seen.update(dict.fromkeys(keys, 1))
+            return keys
+        for i, key in enumerate(keys):
+            count = seen[key] = seen.get(key, 0) + 1
+            if count > 1:
+                keys[i] = f"{key}{SEP}{count}"
+        return keys
+
+
+def row_hashes(arrays):
+    return [hash(row) for row in pc.binary_join_element_wise(*arrays, ROW_SEP).to_pylist()]
+
+
+def split_key(key):
+    return tuple(key.split(SEP)[:4])
+
+
+def diff_snapshots(old, new, site=None, block_size=BLOCK_SIZE):
+    """Yield ``Change`` objects between two ``snapshots.Snapshot`` (added first, then changed, then removed)."""
+    site = site or new.site or old.site
+
+    columns, batches = read_batches(old, block_size)
+    make_key = KeyMaker(site, columns)
+    index = {}
+    position = 0
+    for batch in batches:
+        arrays = project(batch, columns)
+        index.update(zip(make_key(arrays), zip(row_hashes(arrays), range(position, position + batch.num_rows))))
+        position += batch.num_rows
+
+    # New rows are compared on the old layout, so added, dropped or reordered columns line up
+    _, batches = read_batches(new, block_size)
+    make_key = KeyMaker(site, columns)
+    pending = {}  # old row number -> new row, for changed rows
+    for batch in batches:
+        arrays = project(batch, columns)
+        keys = make_key(arrays)
+        matches = list(map(index.pop, keys, repeat(None)))
+        added = [(i, key) for i, (key, match) in enumerate(zip(keys, matches)) if match is None]
+        changed = [(i, match[1]) for i, (match, digest) in enumerate(zip(matches, row_hashes(arrays)))
+                   if match is not None and match[0] != digest]
+        if added:
+            rows = pa.Table.from_arrays(arrays, names=columns).take([i for i, _ in added]).to_pylist()
+            for (_, key), row in zip(added, rows):
+                yield Change("added", split_key(key), new=row)
+        if changed:
+            rows = pa.Table.from_arrays(arrays, names=columns).take([i for i, _ in changed]).to_pylist()
+            pending.update(zip((row_number for _, row_number in changed), rows))
+
+    targets = sorted(pending.keys() | {row_number for _, row_number in index.values()})
+    if not targets:
+        return
+    _, batches = read_batches(old, block_size)
+    make_key = KeyMaker(site, columns)
+    position = 0
+    for batch in batches:
+        arrays = project(batch, columns)
+        keys = make_key(arrays)
+        lo, hi = bisect_left(targets, position), bisect_left(targets, position + batch.num_rows)
+        wanted = [row_number - position for row_number in targets[lo:hi]]
+        if wanted:
+            rows = pa.Table.from_arrays(arrays, names=columns).take(wanted).to_pylist()
+            for i, before in zip(wanted, rows):
+                after = pending.get(position + i)
+                if after is None:
+                    yield Change("removed", split_key(keys[i]), old=before)
+                else:
+                    fields = {c: (before[c], after[c]) for c in columns if before[c] != after[c]}
+                    yield Change("changed", split_key(keys[i]), old=before, new=after, fields=fields)
+        position += batch.num_rows
+
+
+def open_snapshot(path, site=None):
+    parsed = snapshots.parse_snapshot_name(path)
+    if parsed:
+        return snapshots.Snapshot(path, *parsed)
+    if not site:
+        raise SystemExit(f"Cannot tell the site of '{path}' from its name; pass --site")
+    return snapshots.Snapshot(path, site, None)
+
+
+def main(args):
+    if args.latest:
+        found = snapshots.find_snapshots(args.latest)
+        if len(found) < 2:
+            raise SystemExit(f"Need two snapshots of '{args.latest}', found {len(found)}")
+        old, new = found[-2], found[-1]
+    elif args.old and args.new:
+        old, new = open_snapshot(args.old, args.site), open_snapshot(args.new, args.site)
+    else:
+        raise SystemExit("Pass OLD and NEW snapshot paths, or --latest SITE")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = Counter()
+    try:
+        for change in diff_snapshots(old, new, site=args.site):
+            counts[change.kind] += 1
+            if args.output or not args.summary:
+                out.write(json.dumps(change.to_dict(), ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            out.close()
+    print(f"{os.path.basename(old.path)} -> {os.path.basename(new.path)}: "
+          f"{counts['added']} added, {counts['removed']} removed, {counts['changed']} changed", file=sys.stderr)
+    return 0
@@ -0,0 +1,221 @@
+"""One id per production across sites (``data/entities.sqlite``).
+
+broadway.com's "MJ", playbill's "MJ The Musical" and ticketmaster's "MJ"
+are the same show.  ``Resolver.resolve(site, title)`` returns the show's
+canonical id and standardized title:
+
+1. a title seen before resolves from the alias cache (a dict, O(1));
+2. otherwise its comparison key (``normalize.title_key``: decorations such
+   as ticketmaster's "(Broadway)" market tag, articles, case, accents and
+   ``&`` removed) is looked up exactly;
+3. otherwise candidates come from a character-trigram inverted index over
+   the known keys, only the few sharing the most trigrams are scored with
+   ``difflib``, and the best one above ``THRESHOLD`` wins;
+4. failing that, the title becomes a new show.
+
+Trigrams shared by more than ``MAX_POSTING`` shows are too common to
+narrow anything and are skipped, so a lookup scores at most ``CANDIDATES``
+titles however many shows are known: thousands of titles resolve in
+linear time, never pairwise.  Every decision is stored as an alias, so the
+next run resolves from the cache alone::
+
+    python -m scrapers entities resolve
+    python -m scrapers entities list --shared
+"""
+import os
+import sqlite3
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+from scrapers import snapshots
+from scrapers.normalize import FIELDS, standardize_title, title_key
+
+ENTITIES_DB = os.path.join("data", "entities.sqlite")
+
+THRESHOLD = 0.88   # difflib ratio of the keys to call two titles the same show
+CANDIDATES = 10    # titles scored per lookup
+MIN_SHARED = 0.4   # share of a key's trigrams a candidate must have
+MAX_POSTING = 200  # trigrams on more shows than this are ignored for blocking
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS shows (
+        id INTEGER PRIMARY KEY,
+        standardized_title TEXT NOT NULL,
+        match_key TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS aliases (
+        site TEXT NOT NULL,
+        title TEXT NOT NULL,
+        show_id INTEGER NOT NULL REFERENCES shows (id),
+        score REAL NOT NULL,
+        PRIMARY KEY (site, title)
+    );
+    CREATE INDEX IF NOT EXISTS idx_aliases_show ON aliases (show_id);
+"""
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Resolver:
+    def __init__(self, path=ENTITIES_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.aliases = {(site, title): show_id for site, title, show_id in
+                        self.conn.execute("SELECT site, title, show_id FROM aliases")}
+        self.by_title = {}   # title as listed on any site -> show id
+        for (_, title), show_id in self.aliases.items():
+            self.by_title.setdefault(title, show_id)
+        self.titles = {}
+        self.keys = {}       # match key -> show id
+        self.key_of = {}     # show id -> match key
+        for show_id, standardized, key in self.conn.execute("SELECT id, standardized_title, match_key FROM shows"):
+            self.titles[show_id] = standardized
+            self.keys[key] = show_id
+            self.key_of[show_id] = key
+        # (show, site) -> that site's key for it: a site lists a show once, so a
+        # second, different title on the same site is a different show
+        self.site_keys = {}
+        for site, title, show_id in self.conn.execute("SELECT site, title, show_id FROM aliases"):
+            self.site_keys.setdefault((show_id, site), title_key(title))
+        self._index = None
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # --- blocking ---
+    @property
+    def index(self):
+        """trigram -> ids of the shows whose key contains it; built on the first cache miss."""
+        if self._index is None:
+            self._index = defaultdict(list)
+            for key, show_id in self.keys.items():
+                self._add_to_index(key, show_id)
+        return self._index
+
+    def _add_to_index(self, key, show_id):
+        for gram in trigrams(key):
+            self._index[gram].append(show_id)
+
+    def candidates(self, key):
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            posting = self.index.get(gram, ())
+            if len(posting) <= MAX_POSTING:
+                shared.update(posting)
+        minimum = MIN_SHARED * len(grams)
+        return [show_id for show_id, count in shared.most_common(CANDIDATES) if count >= minimum]
+
+    def match(self, title):
+        """Show id of ``title`` on any site without recording it (None when no show matches)."""
+        title = " ".join((title or "").split())
+        if title in self.by_title:
+            return self.by_title[title]
+        key = title_key(title)
+        return self.keys.get(key) or self.best_match(None, key)[0]
+
+    def best_match(self, site, key):
+        best, best_score = None, 0.0
+        for show_id in self.candidates(key):
+            other = self.site_keys.get((show_id, site))
+            if other is not None and other != key:
+                continue
+            score = SequenceMatcher(None, key, self.key_of[show_id]).ratio()
+            if score > best_score:
+                best, best_score = show_id, score
+        return (best, best_score) if best_score >= THRESHOLD else (None, best_score)
+
+    # --- resolving ---
+    def resolve(self, site, title):
+        """``(show id, standardized title)`` of ``title`` as listed on ``site``; None for an empty title."""
+        title = " ".join((title or "").split())
+        if not title:
+            return None
+        show_id = self.aliases.get((site, title))
+        if show_id is None:
+            key = title_key(title)
+            score = 1.0
+            show_id = self.keys.get(key)
+            if show_id is None:
+                show_id, score = self.best_match(site, key)
+            if show_id is None:
+                show_id, score = self._new_show(title, key), 1.0
+            self.aliases[(site, title)] = show_id
+            self.by_title.setdefault(title, show_id)
+            self.site_keys.setdefault((show_id, site), key)
+            self._pending.append((site, title, show_id, score))
+        return show_id, self.titles[show_id]
+
+    def _new_show(self, title, key):
+        standardized = standardize_title(title)
+        show_id = self.conn.execute(
+            "INSERT INTO shows (standardized_title, match_key) VALUES (?, ?)", (standardized, key)
+        ).lastrowid
+        self.titles[show_id] = standardized
+        self.keys[key] = show_id
+        self.key_of[show_id] = key
+        if self._index is not None:
+            self._add_to_index(key, show_id)
+        return show_id
+
+    def resolve_many(self, site, titles):
+        """``{title: (show id, standardized title)}`` for many titles, stored in one transaction."""
+        resolved = {title: self.resolve(site, title) for title in set(titles) if title}
+        self.flush()
+        return resolved
+
+    def flush(self):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO aliases VALUES (?, ?, ?, ?)", self._pending)
+        self._pending = []
+
+    # --- reading ---
+    def shows(self):
+        """``[(show id, standardized title, {site: [titles]})]`` ordered by title."""
+        by_show = defaultdict(lambda: defaultdict(list))
+        for (site, title), show_id in self.aliases.items():
+            by_show[show_id][site].append(title)
+        return sorted(((show_id, self.titles[show_id], dict(sites)) for show_id, sites in by_show.items()),
+                      key=lambda entry: entry[1].casefold())
+
+
+def resolve_snapshots(resolver, site=None):
+    """Resolve every title in the latest snapshot of each site (or ``site``); returns the number resolved."""
+    total = 0
+    for name in ([site] if site else FIELDS):
+        snapshot = snapshots.latest_snapshot(name)
+        if snapshot is None:
+            continue
+        titles = {snapshots.field(row, name, "title") for row in snapshot.rows()}
+        total += len(resolver.resolve_many(name, titles - {None}))
+    return total
+
+
+def main(args):
+    resolver = Resolver()
+    try:
+        if args.action == "resolve":
+            print(f"{resolve_snapshots(resolver, args.site)} title(s) resolved to {len(resolver.titles)} show(s)")
+        elif args.action == "lookup":
+            if not args.title:
+                raise SystemExit("lookup needs a title")
+            show_id = resolver.match(args.title)
+            if show_id is None:
+                raise SystemExit(f"No known show matches '{args.title}'")
+            _, standardized, sites = next(entry for entry in resolver.shows() if entry[0] == show_id)
+            print(f"{show_id}  {standardized}  " + "  ".join(f"{s}: {' | '.join(t)}" for s, t in sorted(sites.items())))
+        elif args.action == "list":
+            for show_id, standardized, sites in resolver.shows():
+                if args.shared and len(sites) < 2:
+                    continue
+                print(f"{show_id:>5}  {standardized:<45} "
+                      + "  ".join(f"{site}: {' | '.join(titles)}" for site, titles in sorted(sites.items())))
+    finally:
+        resolver.close()
+    return 0
@@ -0,0 +1,206 @@
+"""Weekly schedules turned into every concrete performance.
+
+playbill and broadway.com's show pages list schedules as a date range and
+weekly rules::
+
+    June 30–August 3: Tuesday @ 7pm, Wednesday @ 2pm and 7pm, Thu–Sat @ 8pm
+
+``expand_schedule`` takes one row per rule (``Date Range`` / ``Date`` holding
+the weekday(s) / ``Time``) and returns one row per performance, with
+``Date`` replaced by the actual date.  Every date of a range is produced,
+however many weeks it spans, including ranges across months and years
+(``"December 29–January 4"``).  A range with an open start (``"Through
+June 29"``, ``"Now–June 29"``) runs from the reference date.  Rows that
+still can't be expanded are passed through and counted in a warning.
+
+The few distinct range strings of a run are parsed once (memoised) into
+``pd.date_range`` calendars, and the rules are joined onto them with one
+merge, so a season-long run costs the same Python work as a single week::
+
+    rows = expand_schedule(rule_rows, reference=start_time)
+
+    python -m scrapers expand "June 30–August 3" "Tuesday @ 7pm, Wednesday @ 2pm and 7pm"
+"""
+import re
+import logging
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import pandas as pd
+
+from scrapers.normalize import MISSING, TIME_12H_RE, TIME_24H_RE
+
+MONTHS = {name: i for i, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEKDAY_RE = re.compile(r"\b(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?", re.IGNORECASE)
+DASH = r"\s*(?:[-–—]|\bto\b|\bthrough\b|\bthru\b)\s*"
+DATE_PART = r"(?:(?P<{0}month>[A-Za-z]+)\.?\s+)?(?P<{0}day>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s*(?P<{0}year>\d{{4}}))?"
+RANGE_RE = re.compile(rf"^{DATE_PART.format('start_')}(?:{DASH}{DATE_PART.format('end_')})?$", re.IGNORECASE)
+# "Now–June 29", "Now through June 29", "Through June 29", "Until June 29"
+OPEN_RANGE_RE = re.compile(
+    rf"^(?:(?:now|today){DASH}|(?:now\s+)?(?:through|thru|until|till)\s+){DATE_PART.format('end_')}$", re.IGNORECASE
+)
+RULE_SPLIT_RE = re.compile(r",|;|&|\band\b", re.IGNORECASE)
+# A range without a year starting this long before the reference date is next year's
+# (a December scrape listing "January 5–11")
+LOOKBACK = timedelta(days=180)
+DATE_FORMAT = "%B %d, %Y"  # playbill's "June 24, 2025"
+
+logger = logging.getLogger(__name__)
+
+
+def _month(name):
+    return MONTHS.get((name or "")[:3].lower())
+
+
+@lru_cache(maxsize=1024)
+def parse_range(text, reference):
+    """``(first, last)`` dates of ``"June 24–29"``, ``"June 30 - July 6"``, ``"Dec 29, 2025–Jan 4, 2026"``...
+
+    ``reference`` (a ``date``) supplies missing years and the start of an
+    open range (``"Through June 29"``); None when ``text`` is not a date
+    range, or an open range that has already ended.
+    """
+    text = " ".join((text or "").split())
+    match = OPEN_RANGE_RE.match(text)
+    if match:
+        return _open_range(match, reference)
+    match = RANGE_RE.match(text)
+    if not match or not _month(match["start_month"]):
+        return None
+    start_month, end_month = _month(match["start_month"]), _month(match["end_month"] or match["start_month"])
+    if end_month is None:
+        return None
+    try:
+        if match["start_year"]:
+            start = datetime(int(match["start_year"]), start_month, int(match["start_day"])).date()
+        else:
+            start = datetime(reference.year, start_month, int(match["start_day"])).date()
+            if start < reference - LOOKBACK:
+                start = start.replace(year=start.year + 1)
+        if not match["end_day"]:
+            return start, start
+        end_year = int(match["end_year"]) if match["end_year"] else start.year
+        end = datetime(end_year, end_month, int(match["end_day"])).date()
+        if end < start and not match["end_year"]:
+            end = end.replace(year=end.year + 1)
+    except ValueError:  # "June 31"
+        return None
+    return (start, end) if end >= start else None
+
+
+def _open_range(match, reference):
+    end_month = _month(match["end_month"])
+    if end_month is None:
+        return None
+    try:
+        end = datetime(int(match["end_year"] or reference.year), end_month, int(match["end_day"])).date()
+    except ValueError:
+        return None
+    if end < reference - LOOKBACK and not match["end_year"]:
+        end = end.replace(year=end.year + 1)
+    return (reference, end) if end >= reference else None
+
+
+@lru_cache(maxsize=1024)
+def range_dates(text, reference):
+    """Every date of the range as a ``DatetimeIndex`` (None when unparseable)."""
+    parsed = parse_range(text, reference)
+    return None if parsed is None else pd.date_range(*parsed, freq="D")
+
+
+@lru_cache(maxsize=1024)
+def parse_days(text):
+    """Weekday numbers (Monday = 0) in ``"Tuesday"``, ``"Tue & Thu"``, ``"Thu–Sat"``; empty when none."""
+    days = []
+    for part in re.split(r",|&|\band\b", text or "", flags=re.IGNORECASE):
+        names = [WEEKDAYS.index(name.group()[:3].lower()) for name in WEEKDAY_RE.finditer(part)]
+        if len(names) == 2 and re.search(DASH, part, re.IGNORECASE):
+            first, last = names
+            names = [(first + i) % 7 for i in range((last - first) % 7 + 1)]
+        days.extend(day for day in names if day not in days)
+    return tuple(days)
+
+
+@lru_cache(maxsize=1024)
+def parse_rules(text):
+    """``((days, time), ...)`` from ``"Tuesday @ 7pm, Wednesday @ 2pm and 7pm"``.
+
+    A bare time repeats the days before it; bare days wait for the next
+    ``@`` (``"Tuesday, Thursday @ 7pm"``).
+    """
+    rules, pending, days = [], [], None
+    for piece in RULE_SPLIT_RE.split(text or ""):
+        piece = piece.strip()
+        if "@" in piece:
+            day_text, time_text = piece.split("@", 1)
+            days = ", ".join(pending + [day_text.strip()])
+            pending = []
+            time_text = WEEKDAY_RE.sub("", time_text).strip()
+            if time_text:
+                rules.append((days, time_text))
+        elif days and (TIME_12H_RE.fullmatch(piece) or TIME_24H_RE.fullmatch(piece)):
+            rules.append((days, piece))
+        elif parse_days(piece):
+            pending.append(piece)
+    return tuple(rules)
+
+
+def expand_schedule(rows, date_range="Date Range", day="Date", reference=None, date_format=DATE_FORMAT):
+    """One row per performance from one row per weekly rule.
+
+    ``row[date_range]`` is the rule's range and ``row[day]`` its weekday(s);
+    each output row is the rule's row with ``day`` set to a date of the
+    range on one of those weekdays (``date_format``), in date order.  Rows
+    whose range or weekday can't be parsed are passed through unchanged.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    reference = reference or datetime.now()
+    reference = reference.date() if isinstance(reference, datetime) else reference
+    frame = pd.DataFrame(rows, dtype=object)
+    if date_range not in frame or day not in frame:
+        return rows
+    frame["_rule"] = range(len(frame))
+    ranges = frame[date_range].where(~frame[date_range].isin(MISSING), None)
+    frame["_range"], distinct = pd.factorize(ranges)
+    frame["_weekday"] = frame[day].map(lambda text: list(parse_days(text)) if isinstance(text, str) else [])
+
+    calendars = []
+    for code, text in enumerate(distinct):
+        dates = range_dates(str(text), reference)
+        if dates is not None:
+            calendars.append(pd.DataFrame({"_range": code, "_weekday": dates.dayofweek, "_date": dates}))
+    if not calendars:
+        return rows
+    calendar = pd.concat(calendars, ignore_index=True)
+
+    rules = frame.explode("_weekday").dropna(subset=["_weekday"]).astype({"_weekday": int})
+    expanded = rules.merge(calendar, on=["_range", "_weekday"], how="inner")
+    known_range = frame["_range"].isin(calendar["_range"].unique())
+    resolved = known_range & frame["_weekday"].map(bool)
+    expanded[day] = expanded["_date"].dt.strftime(date_format)
+    expanded = expanded.sort_values(["_range", "_date", "_rule"], kind="stable")
+    passed = frame[~resolved]
+    if len(passed):
+        unparsed = sorted({str(text) for text in frame.loc[~known_range, date_range] if text not in MISSING})
+        logger.warning(f"{len(passed)} schedule row(s) not expanded to dates and kept as listed"
+                       + (f" (unparsed ranges: {'; '.join(unparsed)})" if unparsed else ""))
+    out = pd.concat([expanded, passed], ignore_index=True)
+    columns = list(rows[0]) + [c for c in frame.columns if c not in rows[0] and not c.startswith("_")]
+    return out[columns].to_dict("records")
+
+
+def main(args):
+    rules = parse_rules(args.rules)
+    if not rules:
+        raise SystemExit(f"No 'Weekday @ time' rules in '{args.rules}'")
+    rows = expand_schedule(
+        [{"Date Range": args.range, "Date": days, "Time": time_text} for days, time_text in rules]
+    )
+    for row in rows:
+        print(f"{row['Date']:<20} {row['Time']}")
+    print(f"{len(rows)} performance(s)")
+    return 0
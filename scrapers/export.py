@@ -0,0 +1,196 @@
+"""Vectorised cleanup of scraped rows before they are written.
+
+The scrapers used to tidy every value on its own: ``clean_row`` stripping
+strings row by row, a ``strptime`` per performance for its status, a regex
+and ``strptime`` per calendar button.  ``prepare`` does it for a whole
+batch of rows with pandas string and datetime operations:
+
+* whitespace (newlines included) collapsed and stripped, missing markers
+  (``""``, ``"N/A"``...) unified;
+* performance dates and times parsed with the sites' formats;
+* status derived from them against one ``now`` for the whole run;
+* columns put in the output order, missing ones filled with ``"N/A"``.
+
+Scraped values repeat heavily (a show's title, link and description on each
+of its performances, a few hundred distinct dates), so every column is
+factorised and the work is done once per distinct value::
+
+    rows = prepare("tnny_events", event_rows, COLUMNS, now=started, status="datetime")
+
+    python -m scrapers export bench --rows 1000000
+"""
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from scrapers.normalize import DATE_FORMATS, FIELDS, MISSING, TIME_12H_RE, TIME_24H_RE
+
+WHITESPACE_RE = re.compile(r"\s+")
+ORDINAL_RE = re.compile(r"(?<=\d)(?:st|nd|rd|th)\b")
+MISSING_TEXT = [value for value in MISSING if value is not None]
+ACTIVE_WINDOW = timedelta(minutes=5)  # "active" when starting within this of now (status="datetime")
+STATUS_MODES = ("date", "datetime", None)
+
+
+def _by_value(series, func):
+    """``func`` (vectorised, Series -> Series) applied to the distinct values of ``series`` only."""
+    codes, uniques = pd.factorize(series)
+    result = func(pd.Series(uniques, dtype=object)).reset_index(drop=True)
+    # Missing values have code -1, which picks the NA appended at the end
+    result = pd.concat([result, pd.Series([None], dtype=result.dtype)], ignore_index=True)
+    return pd.Series(result.to_numpy()[codes], index=series.index, dtype=result.dtype)
+
+
+def clean_text(series):
+    """Whitespace collapsed and stripped; missing markers become NA."""
+    def clean(values):
+        values = values.astype("string").str.replace(WHITESPACE_RE.pattern, " ", regex=True).str.strip()
+        return values.mask(values.isin(MISSING_TEXT)).astype(object)
+    return _by_value(series, clean)
+
+
+def parse_dates(series, formats=DATE_FORMATS, year=None):
+    """Dates in any of ``formats`` -> ``datetime64`` (NaT when unparseable).
+
+    tnny's ``"15 July 2025 - 7:00 pm"`` is cut at ``" - "`` and ordinals
+    (``"19th"``) are dropped.  ``year`` completes formats without one, e.g.
+    broadway.com's ``"Saturday, Jul 19th"``.
+    """
+    def parse(values):
+        text = values.astype("string").str.split(" - ", n=1).str[0].str.replace(ORDINAL_RE.pattern, "", regex=True)
+        text = text.str.strip()
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+        for fmt in formats:
+            todo = parsed.isna() & text.notna()
+            if not todo.any():
+                break
+            candidate, pattern = text[todo], fmt
+            if year is not None and "%Y" not in fmt:
+                candidate, pattern = candidate + f" {year}", f"{fmt} %Y"
+            parsed[todo] = pd.to_datetime(candidate, format=pattern, errors="coerce")
+        return parsed
+    return _by_value(series, parse)
+
+
+def parse_times(series):
+    """``"8:00pm"`` / ``"7pm"`` / ``"19:30"`` (alone or after ``" - "``) -> ``timedelta64`` since midnight."""
+    def parse(values):
+        text = values.astype("string")
+        twelve = text.str.extract(TIME_12H_RE)
+        afternoon = (twelve[2].str.lower() == "p").fillna(False).astype(bool)
+        hours = pd.to_numeric(twelve[0], errors="coerce") % 12 + afternoon * 12
+        minutes = pd.to_numeric(twelve[1], errors="coerce").fillna(0)
+        twenty_four = text.str.extract(TIME_24H_RE)
+        hours = hours.fillna(pd.to_numeric(twenty_four[0], errors="coerce"))
+        minutes = minutes.where(twelve[0].notna(), pd.to_numeric(twenty_four[1], errors="coerce"))
+        valid = (hours < 24) & (minutes < 60)
+        return pd.to_timedelta((hours * 60 + minutes).where(valid), unit="min")
+    return _by_value(series, parse)
+
+
+def derive_status(dates, now, times=None, window=ACTIVE_WINDOW):
+    """``active`` / ``upcoming`` / ``closed`` / ``N/A`` for each performance, against one ``now``.
+
+    Without ``times`` a performance is active on its day (broadway.com);
+    with them, within ``window`` of its start (ovationtix).
+    """
+    if times is None:
+        when, current = dates.dt.normalize(), pd.Timestamp(now).normalize()
+        active = when == current
+    else:
+        when, current = dates + times.fillna(pd.Timedelta(0)), pd.Timestamp(now)
+        active = (when - current).abs() <= window
+    status = np.select([when.isna(), active, when > current], ["N/A", "active", "upcoming"], default="closed")
+    return pd.Series(status, index=dates.index, dtype=object)
+
+
+def prepare_frame(site, frame, columns, now=None, status=None, formats=DATE_FORMATS, year=None, date_format=None):
+    """The vectorised pipeline on a DataFrame of raw rows; returns the cleaned DataFrame in ``columns`` order.
+
+    ``status`` derives the site's status column from its date (``"date"``) or
+    date and time (``"datetime"``); None keeps the scraped value.
+    ``date_format`` rewrites parsed dates (e.g. ``"%Y-%m-%d"``).
+    """
+    if status not in STATUS_MODES:
+        raise ValueError(f"Unknown status mode '{status}'. Choose from: {', '.join(map(str, STATUS_MODES))}")
+    frame = frame.reindex(columns=columns)
+    for column in columns:
+        frame[column] = clean_text(frame[column])
+
+    fields = FIELDS.get(site, {})
+    date_column, time_column = fields.get("date"), fields.get("time")
+    if (status or date_format) and date_column in frame:
+        dates = parse_dates(frame[date_column], formats, year)
+        if status:
+            times = None
+            if status == "datetime":
+                times = parse_times(frame[time_column] if time_column in frame else frame[date_column])
+            frame[fields.get("status", "status")] = derive_status(dates, now or datetime.now(), times)
+        if date_format:
+            frame[date_column] = frame[date_column].where(dates.isna(), dates.dt.strftime(date_format))
+    return frame.fillna("N/A")
+
+
+def prepare(site, rows, columns, now=None, status=None, formats=DATE_FORMATS, year=None, date_format=None):
+    """``prepare_frame`` for a list of row dicts, returning row dicts ready for ``open_writer``."""
+    rows = list(rows)
+    if not rows:
+        return []
+    frame = prepare_frame(site, pd.DataFrame(rows, dtype=object), columns, now=now, status=status,
+                          formats=formats, year=year, date_format=date_format)
+    return frame.to_dict("records")
+
+
+# --- benchmark ---
+def _bench_frame(count):
+    """``count`` broadway.com-shaped raw rows: 80 shows, six months of dates, messy whitespace."""
+    rng = np.random.default_rng(0)
+    shows = 80
+    show = rng.integers(0, shows, count)
+    day = pd.Timestamp("2025-07-01") + pd.to_timedelta(rng.integers(0, 183, count), unit="D")
+    labels = pd.Series(day.strftime("%A, %b %d")).str.replace(r" 0(\d)$", r" \1", regex=True)
+    return pd.DataFrame({
+        "Title": pd.Series([f"  Show {i}\n" for i in range(shows)])[show].to_numpy(),
+        "Link": pd.Series([f"https://www.broadway.com/shows/show-{i}/" for i in range(shows)])[show].to_numpy(),
+        "Description": pd.Series([f"A  description of\tshow {i}. " * 5 for i in range(shows)])[show].to_numpy(),
+        "Image URL": pd.Series([f"https://imaging.broadway.com/{i}.png" for i in range(shows)])[show].to_numpy(),
+        "Production Type": np.where(show % 3, "Musicals", "Plays"),
+        "Theatre": pd.Series([f"Theatre {i % 40}" for i in range(shows)])[show].to_numpy(),
+        "Date": (labels + "th").to_numpy(),
+        "Time": np.array(["2:00pm", "7:00pm", "7:30pm", "8:00pm"])[rng.integers(0, 4, count)],
+    })
+
+
+def benchmark(count, now=None):
+    """Seconds for ``prepare_frame`` over ``count`` rows, and for the row-by-row equivalent (extrapolated)."""
+    import time
+    from scrapers.normalize import parse_date, parse_time
+
+    frame = _bench_frame(count)
+    now = now or datetime(2025, 10, 1, 12)
+    columns = list(frame.columns) + ["Status"]
+    started = time.perf_counter()
+    out = prepare_frame("broadway", frame, columns, now=now, status="date",
+                        formats=("%A, %b %d",), year=2025, date_format="%Y-%m-%d")
+    vectorised = time.perf_counter() - started
+
+    sample = frame.head(min(count, 20_000)).to_dict("records")
+    started = time.perf_counter()
+    for row in sample:
+        {k: WHITESPACE_RE.sub(" ", v).strip() for k, v in row.items()}
+        performed = datetime.strptime(ORDINAL_RE.sub("", row["Date"]) + " 2025", "%A, %b %d %Y")
+        parse_time(row["Time"]), parse_date(performed.strftime("%Y-%m-%d"))
+        "upcoming" if performed.date() > now.date() else "closed"
+    per_row = (time.perf_counter() - started) * count / len(sample)
+    return vectorised, per_row, out
+
+
+def main(args):
+    if args.action == "bench":
+        vectorised, per_row, out = benchmark(args.rows)
+        print(f"{args.rows:,} rows: vectorised {vectorised:.2f}s ({args.rows / vectorised:,.0f} rows/s), "
+              f"row by row ~{per_row:.1f}s")
+        print(out.head(3).to_string())
+    return 0
@@ -0,0 +1,340 @@
+"""Performance history of every show across all snapshots (``data/history/``).
+
+"How has Wicked's schedule changed since July" used to mean loading every
+``data/old/*.csv``.  The history store keeps every snapshot's performances
+in a few memory-mapped columns instead, appended as snapshots land:
+
+* ``date.i4``  - performance date as a proleptic ordinal (0 when unparseable)
+* ``time.i2``  - minutes after midnight (-1 when unknown)
+* ``venue.u4`` / ``status.u4`` - codes into the manifest's string table
+* ``entries.u4`` - the index: one ``(show, snapshot, first row, end row)`` per
+  show per snapshot
+
+Within a snapshot a show's rows are contiguous and sorted by date, so
+``history`` looks the show up in the index and binary-searches the date
+range inside each of its row ranges; it touches only the rows it returns
+and stays in the low milliseconds however many months are stored.
+``manifest.json`` (snapshots, shows, strings and the committed lengths) is
+replaced atomically after the columns are appended, so an interrupted
+update leaves nothing half-indexed::
+
+    history("Wicked", (date(2025, 7, 1), date(2025, 12, 31)))
+
+    python -m scrapers history update
+    python -m scrapers history show Wicked --from 2025-07-01 --changes
+"""
+import os
+import json
+import logging
+import contextlib
+from datetime import date, datetime
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+from scrapers import snapshots
+from scrapers.normalize import FIELDS, parse_date, parse_time
+
+HISTORY_DIR = os.path.join("data", "history")
+
+COLUMNS = {"date": np.dtype("<i4"), "time": np.dtype("<i2"), "venue": np.dtype("<u4"), "status": np.dtype("<u4")}
+ENTRY_DTYPE = np.dtype("<u4")
+ENTRY_WIDTH = 4  # show, snapshot, start, stop
+NO_DATE, NO_TIME = 0, -1
+
+logger = logging.getLogger(__name__)
+
+
+def _title_key(title):
+    return " ".join((title or "").split()).casefold()
+
+
+class History:
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        self.manifest = self._read_manifest()
+        self._reset_lookups()
+        self._columns = None
+        self._entries = None
+
+    # --- storage ---
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self):
+        try:
+            with open(self._path("manifest.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"rows": 0, "entries": 0, "snapshots": [], "shows": [], "strings": [""]}
+
+    def _reset_lookups(self):
+        manifest = self.manifest
+        self._snapshot_ids = {s["name"]: i for i, s in enumerate(manifest["snapshots"])}
+        self._show_ids = {(site, key): i for i, (site, key, _) in enumerate(manifest["shows"])}
+        self._string_ids = {value: i for i, value in enumerate(manifest["strings"])}
+
+    def _load(self, name, dtype, length):
+        path = self._path(name)
+        if not length or not os.path.exists(path):
+            return np.empty(0, dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            rows = self.manifest["rows"]
+            self._columns = {name: self._load(f"{name}.{dtype.kind}{dtype.itemsize}", dtype, rows)
+                             for name, dtype in COLUMNS.items()}
+        return self._columns
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            count = self.manifest["entries"]
+            self._entries = self._load("entries.u4", ENTRY_DTYPE, count * ENTRY_WIDTH).reshape(-1, ENTRY_WIDTH)
+        return self._entries
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(".lock"), "w") as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    # --- building ---
+    def _code(self, value):
+        code = self._string_ids.get(value)
+        if code is None:
+            code = self._string_ids[value] = len(self.manifest["strings"])
+            self.manifest["strings"].append(value)
+        return code
+
+    def _show(self, site, key, title):
+        code = self._show_ids.get((site, key))
+        if code is None:
+            code = self._show_ids[(site, key)] = len(self.manifest["shows"])
+            self.manifest["shows"].append([site, key, title])
+        return code
+
+    def _encode(self, snapshot):
+        """Rows of one snapshot as ``{show code: [(date, time, venue, status), ...]}``."""
+        site = snapshot.site
+        dates, times = {}, {}
+        shows = {}
+        for row in snapshot.rows():
+            key = snapshots.show_key(row, site)
+            if not key:
+                continue
+            raw_date = snapshots.field(row, site, "date") or ""
+            raw_time = snapshots.field(row, site, "time") or ""
+            if not raw_time and " - " in raw_date:
+                raw_time = raw_date.split(" - ", 1)[1]
+            if raw_date not in dates:
+                performed_on = parse_date(raw_date)
+                dates[raw_date] = performed_on.toordinal() if performed_on else NO_DATE
+            if raw_time not in times:
+                starts_at = parse_time(raw_time)
+                times[raw_time] = starts_at.hour * 60 + starts_at.minute if starts_at else NO_TIME
+            code = self._show(site, key, snapshots.field(row, site, "title") or key)
+            shows.setdefault(code, []).append((
+                dates[raw_date], times[raw_time],
+                self._code(snapshots.field(row, site, "theatre") or ""),
+                self._code(snapshots.field(row, site, "status") or ""),
+            ))
+        return shows
+
+    def _append(self, snapshot_id, shows):
+        rows, entries = [], []
+        start = self.manifest["rows"]
+        for code, performances in shows.items():
+            performances.sort()
+            entries.append((code, snapshot_id, start, start + len(performances)))
+            rows.extend(performances)
+            start += len(performances)
+        if not rows:
+            return
+        table = np.array(rows, dtype=np.int64)
+        for i, (name, dtype) in enumerate(COLUMNS.items()):
+            with open(self._path(f"{name}.{dtype.kind}{dtype.itemsize}"), "ab") as f:
+                f.write(table[:, i].astype(dtype).tobytes())
+        with open(self._path("entries.u4"), "ab") as f:
+            f.write(np.array(entries, dtype=ENTRY_DTYPE).tobytes())
+        self.manifest["rows"] = start
+        self.manifest["entries"] += len(entries)
+
+    def _truncate(self):
+        """Drop anything appended after the last committed manifest (an interrupted update)."""
+        for name, dtype in COLUMNS.items():
+            path = self._path(f"{name}.{dtype.kind}{dtype.itemsize}")
+            if os.path.exists(path):
+                os.truncate(path, self.manifest["rows"] * dtype.itemsize)
+        path = self._path("entries.u4")
+        if os.path.exists(path):
+            os.truncate(path, self.manifest["entries"] * ENTRY_WIDTH * ENTRY_DTYPE.itemsize)
+
+    def _commit(self):
+        tmp_path = self._path("manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path("manifest.json"))
+        self._columns = self._entries = None
+
+    def update(self, found=None):
+        """Index snapshots not indexed yet (default: every snapshot on disk); returns how many were added."""
+        found = snapshots.find_snapshots() if found is None else found
+        with self._locked():
+            self.manifest = self._read_manifest()  # another process may have committed meanwhile
+            self._reset_lookups()
+            self._truncate()
+            added = 0
+            for snapshot in found:
+                if snapshot.site not in FIELDS:
+                    continue
+                known = self._snapshot_ids.get(snapshot.name)
+                if known is not None:
+                    self.manifest["snapshots"][known]["path"] = snapshot.path  # e.g. moved to data/old/
+                    continue
+                snapshot_id = self._snapshot_ids[snapshot.name] = len(self.manifest["snapshots"])
+                self.manifest["snapshots"].append({
+                    "name": snapshot.name, "path": snapshot.path, "site": snapshot.site,
+                    "taken_at": snapshot.taken_at.isoformat(timespec="seconds"),
+                })
+                self._append(snapshot_id, self._encode(snapshot))
+                added += 1
+            self._commit()
+        return added
+
+    # --- queries ---
+    def find_shows(self, show, site=None):
+        """Show codes matching a link, an exact title, or failing those a partial title."""
+        wanted = _title_key(show)
+        exact, partial = [], []
+        for code, (show_site, key, title) in enumerate(self.manifest["shows"]):
+            if site and show_site != site:
+                continue
+            title_key = _title_key(title)
+            if key == show or title_key == wanted:
+                exact.append(code)
+            elif wanted in title_key:
+                partial.append(code)
+        return exact or partial
+
+    def history(self, show, date_range=None, site=None):
+        """Performances of ``show`` in every snapshot, oldest snapshot first.
+
+        ``date_range`` is an inclusive ``(start, end)`` of performance dates;
+        either end may be None.  Returns one dict per (snapshot, show) with a
+        ``performances`` list of ``(date, "HH:MM" or None, venue, status)``.
+        """
+        codes = self.find_shows(show, site)
+        entries = self.entries
+        if not codes or not len(entries):
+            return []
+        start, end = date_range or (None, None)
+        low = start.toordinal() if start else NO_DATE + 1
+        high = end.toordinal() if end else np.iinfo(np.int32).max
+        columns = self.columns
+        dates, times, venues, statuses = columns["date"], columns["time"], columns["venue"], columns["status"]
+        strings, shows, runs = self.manifest["strings"], self.manifest["shows"], self.manifest["snapshots"]
+
+        matched = entries[np.isin(entries[:, 0], codes)].tolist()
+        bounds = []
+        for code, snapshot_id, first, stop in matched:
+            span = dates[first:stop]
+            bounds.append((first + int(np.searchsorted(span, low, side="left")),
+                           first + int(np.searchsorted(span, high, side="right"))))
+        # One gather for every matched range, then cheap Python over plain ints
+        picked = np.concatenate([np.arange(lo, hi) for lo, hi in bounds]) if bounds else np.empty(0, np.int64)
+        days = {d: date.fromordinal(d) for d in np.unique(dates[picked]).tolist()}
+        clock = {t: f"{t // 60:02d}:{t % 60:02d}" if t >= 0 else None for t in np.unique(times[picked]).tolist()}
+        rows = list(zip(map(days.__getitem__, dates[picked].tolist()), map(clock.__getitem__, times[picked].tolist()),
+                        (strings[v] or None for v in venues[picked].tolist()),
+                        (strings[s] or None for s in statuses[picked].tolist())))
+
+        results = []
+        offset = 0
+        for (code, snapshot_id, _, _), (lo, hi) in zip(matched, bounds):
+            run = runs[snapshot_id]
+            results.append({
+                "snapshot": run["name"], "site": run["site"], "taken_at": datetime.fromisoformat(run["taken_at"]),
+                "show": shows[code][1], "title": shows[code][2], "performances": rows[offset:offset + hi - lo],
+            })
+            offset += hi - lo
+        results.sort(key=lambda r: (r["taken_at"], r["site"], r["title"]))
+        return results
+
+
+def changes(results):
+    """Consecutive snapshots of each show compared: ``(later result, added, removed)`` performance sets."""
+    previous = {}
+    for result in results:
+        key = (result["site"], result["show"])
+        current = {p[:2] for p in result["performances"]}
+        if key in previous:
+            before = previous[key]
+            yield result, current - before, before - current
+        previous[key] = current
+
+
+def history(show, date_range=None, site=None, directory=HISTORY_DIR):
+    return History(directory).history(show, date_range, site=site)
+
+
+def record_files(paths, directory=HISTORY_DIR):
+    """Writer hook: index the snapshot a run just wrote.  Never fails the run."""
+    for path in paths:
+        parsed = snapshots.parse_snapshot_name(path)
+        if parsed and os.path.exists(path):
+            break
+    else:
+        return
+    try:
+        History(directory).update([snapshots.Snapshot(path, *parsed)])  # one file per run, whatever the formats
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not update the history index: {e}")
+
+
+def main(args):
+    from time import perf_counter
+
+    store = History()
+    if args.action == "update":
+        began = perf_counter()
+        added = store.update()
+        print(f"{added} snapshot(s) indexed in {perf_counter() - began:.1f}s "
+              f"({store.manifest['rows']} performances, {len(store.manifest['snapshots'])} snapshots)")
+        return 0
+
+    if not args.show:
+        raise SystemExit("show needs a title or link")
+    start = date.fromisoformat(args.start) if args.start else None
+    end = date.fromisoformat(args.end) if args.end else None
+    began = perf_counter()
+    results = store.history(args.show, (start, end), site=args.site)
+    elapsed = (perf_counter() - began) * 1000
+    if args.changes:
+        for result, added, removed in changes(results):
+            print(f"{result['taken_at']:%Y-%m-%d %H:%M}  {result['site']:<12} {result['title']}: "
+                  f"+{len(added)} -{len(removed)}")
+            for day, at in sorted(added, key=str):
+                print(f"    + {day} {at or ''}")
+            for day, at in sorted(removed, key=str):
+                print(f"    - {day} {at or ''}")
+    else:
+        for result in results:
+            dates = [p[0] for p in result["performances"]]
+            span = f"{min(dates)} .. {max(dates)}" if dates else "-"
+            print(f"{result['taken_at']:%Y-%m-%d %H:%M}  {result['site']:<12} {result['title']}: "
+                  f"{len(dates)} performance(s)  {span}")
+    print(f"{len(results)} snapshot entries in {elapsed:.1f} ms")
+    return 0
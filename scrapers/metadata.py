@@ -0,0 +1,116 @@
+"""Per-show static metadata kept between runs (``data/show_metadata.sqlite``).
+
+Production type, origin, opening date, venue... almost never change, yet
+every run used to read them off each detail page with a handful of
+``find_element`` calls and waits.  ``MetadataCache`` keeps them per show
+link for ``MAX_AGE`` (a week), so a daily run only scrapes the calendars and
+every show gets a full refresh once a week.  Values derived from the date of
+the run (age of production, status from the closing date) are not cached;
+the scrapers cache the dates and derive them again::
+
+    cache = MetadataCache("broadway", refresh=args.refresh_metadata)
+    details = cache.get(link)
+    if details is None:
+        details = cache.put(link, scrape_details(driver))
+    ...
+    log_and_print(cache.summary())
+
+    python -m scrapers metadata list --site broadway
+    python -m scrapers metadata clear --site playbill
+"""
+import os
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from scrapers.normalize import FIELDS
+
+METADATA_DB = os.path.join("data", "show_metadata.sqlite")
+MAX_AGE = timedelta(days=7)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS show_metadata (
+        site TEXT NOT NULL,
+        link TEXT NOT NULL,
+        fields TEXT NOT NULL,
+        refreshed_at TEXT NOT NULL,
+        PRIMARY KEY (site, link)
+    );
+"""
+
+
+class MetadataCache:
+    def __init__(self, site, path=METADATA_DB, max_age=MAX_AGE, refresh=False):
+        """``refresh`` ignores what is cached (every show is scraped and stored again)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.site = site
+        self.max_age = max_age
+        self.refresh = refresh
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.hits = self.misses = 0
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, link, now=None):
+        """The show's cached fields, or None when missing, older than ``max_age`` or refreshing."""
+        found = None
+        if not self.refresh:
+            found = self.conn.execute(
+                "SELECT fields, refreshed_at FROM show_metadata WHERE site = ? AND link = ?", (self.site, link)
+            ).fetchone()
+        if found and (now or datetime.now()) - datetime.fromisoformat(found[1]) <= self.max_age:
+            self.hits += 1
+            return json.loads(found[0])
+        self.misses += 1
+        return None
+
+    def put(self, link, fields, now=None):
+        """Store freshly scraped fields (JSON-serialisable values); returns ``fields``."""
+        refreshed_at = (now or datetime.now()).isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO show_metadata VALUES (?, ?, ?, ?)",
+                (self.site, link, json.dumps(fields, ensure_ascii=False), refreshed_at),
+            )
+        return fields
+
+    def clear(self):
+        with self.conn:
+            return self.conn.execute("DELETE FROM show_metadata WHERE site = ?", (self.site,)).rowcount
+
+    def entries(self):
+        """``[(link, fields, refreshed_at)]`` of the site, most recently refreshed first."""
+        return [(link, json.loads(fields), datetime.fromisoformat(refreshed_at)) for link, fields, refreshed_at in
+                self.conn.execute("SELECT link, fields, refreshed_at FROM show_metadata WHERE site = ? "
+                                  "ORDER BY refreshed_at DESC", (self.site,))]
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = f" ({self.hits / total:.0%})" if total else ""
+        return f"🗂️ Show metadata: {self.hits} from cache{rate}, {self.misses} scraped"
+
+
+@lru_cache(maxsize=None)
+def default_cache(site):
+    """One cache per site and process, for show-page functions called without one (``workqueue``)."""
+    return MetadataCache(site)
+
+
+def main(args):
+    for site in [args.site] if args.site else FIELDS:
+        cache = MetadataCache(site)
+        try:
+            if args.action == "clear":
+                print(f"{site}: {cache.clear()} show(s) cleared")
+                continue
+            now = datetime.now()
+            for link, fields, refreshed_at in cache.entries():
+                stale = " (stale)" if now - refreshed_at > cache.max_age else ""
+                print(f"{site:<14} {refreshed_at:%Y-%m-%d %H:%M}{stale:<8} {link}  "
+                      + "  ".join(f"{key}={value}" for key, value in fields.items()))
+        finally:
+            cache.close()
+    return 0
@@ -0,0 +1,144 @@
+"""MongoDB sink for scraped performances.
+
+Registered as the ``mongo`` output format, so any scraper can use it::
+
+    python broadway.py --formats csv,mongo
+    python -m scrapers queue collect --site broadway --queue ... --formats mongo
+
+Connection settings come from the environment (or a ``.env`` file):
+
+* ``MONGO_URI``        - default ``mongodb://localhost:27017``
+* ``MONGO_DB``         - default ``scrapers``
+* ``MONGO_COLLECTION`` - default ``performances``
+* ``MONGO_BATCH_SIZE`` - rows per ``bulk_write``, default 5000
+
+Each performance is one document keyed on ``(site, event_id)``, where
+``event_id`` is the dedup hash of the natural event key (site, title,
+date, time and venue; see ``scrapers.dedup``).  Rows are buffered and sent as
+unordered bulk upserts, so a 7k-row run is two round-trips, and a
+performance scraped again updates its document (``last_seen``) instead of
+duplicating it.
+"""
+import os
+import logging
+from datetime import datetime
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from scrapers import snapshots
+from scrapers.dedup import event_key, hash_event
+
+load_dotenv()
+
+DEFAULT_URI = "mongodb://localhost:27017"
+DEFAULT_DB = "scrapers"
+DEFAULT_COLLECTION = "performances"
+DEFAULT_BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+
+
+def get_client(uri=None):
+    """One client (and connection pool) per URI per process."""
+    uri = uri or os.getenv("MONGO_URI", DEFAULT_URI)
+    if uri not in _clients:
+        _clients[uri] = MongoClient(uri)
+    return _clients[uri]
+
+
+def get_database(uri=None, name=None):
+    return get_client(uri)[name or os.getenv("MONGO_DB", DEFAULT_DB)]
+
+
+def ensure_indexes(collection):
+    collection.create_index([("site", ASCENDING), ("event_id", ASCENDING)], unique=True)
+    collection.create_index([("site", ASCENDING), ("performance_date", ASCENDING)])
+    collection.create_index([("title_key", ASCENDING), ("performance_date", ASCENDING)])
+    collection.create_index([("last_seen", ASCENDING)])
+
+
+def to_upsert(site, row, scraped_at):
+    _, title_key, performed_on, starts_at, *_ = event_key(site, row)
+    try:
+        performance_date = datetime.fromisoformat(performed_on)
+    except ValueError:
+        performance_date = None
+    document = {
+        "site": site,
+        "title": snapshots.field(row, site, "title"),
+        "title_key": title_key,
+        "performance_date": performance_date,  # BSON has no date-only type: midnight
+        "performance_time": starts_at,
+        "data": row,
+        "last_seen": scraped_at,
+    }
+    event_id = f"{hash_event(site, row):016x}"
+    return UpdateOne(
+        {"site": site, "event_id": event_id},
+        {"$set": document, "$setOnInsert": {"first_seen": scraped_at}},
+        upsert=True,
+    )
+
+
+class MongoWriter:
+    """Row writer (see ``scrapers.writer``) that upserts into MongoDB in batches.
+
+    ``open_writer`` passes the usual ``data/<site>_<timestamp>.mongo`` path;
+    only the site and timestamp are taken from it.
+    """
+
+    extension = "mongo"
+
+    def __init__(self, path, columns=None, collection=None, batch_size=None):
+        self.site, self.scraped_at = snapshots.parse_snapshot_name(path.replace(".mongo", ".csv"))
+        self.columns = columns
+        self.batch_size = batch_size or int(os.getenv("MONGO_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        self._collection = collection
+        self._buffer = []
+        self.upserted = self.modified = 0
+
+    @property
+    def path(self):
+        return None  # nothing on disk; keeps MultiWriter.paths and the catalog to files
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_database()[os.getenv("MONGO_COLLECTION", DEFAULT_COLLECTION)]
+            ensure_indexes(self._collection)
+        return self._collection
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        ops = [to_upsert(self.site, row, self.scraped_at) for row in self._buffer]
+        self._buffer = []
+        try:
+            result = self.collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: the other operations still went through
+            details = e.details
+            logger.warning(f"MongoDB bulk write: {len(details.get('writeErrors', []))} of {len(ops)} upserts failed")
+            self.upserted += details.get("nUpserted", 0)
+            self.modified += details.get("nModified", 0)
+            return
+        self.upserted += result.upserted_count
+        self.modified += result.modified_count
+
+    def write_rows(self, rows):
+        if self.columns:
+            rows = [{col: row.get(col, "N/A") for col in self.columns} for row in rows]
+        self._buffer.extend(rows)
+        while len(self._buffer) >= self.batch_size:
+            pending, self._buffer = self._buffer[self.batch_size:], self._buffer[:self.batch_size]
+            self._flush()
+            self._buffer = pending
+
+    def close(self):
+        self._flush()
+        if self.upserted or self.modified:
+            logger.info(f"MongoDB: {self.upserted} new and {self.modified} updated {self.site} performances")
@@ -0,0 +1,169 @@
+"""Turning the sites' free-text fields into typed values.
+
+Each site names and formats its columns differently: broadway.com dates look
+like ``2025-07-19``, playbill's like ``June 24, 2025`` and tnny packs date
+and time together as ``15 July 2025 - 7:00 pm``.  ``FIELDS`` maps every site's
+columns onto one set of common field names, and ``normalize_row`` returns a
+row in that common shape with real ``date`` / ``time`` / ``int`` values.
+"""
+import re
+import unicodedata
+from datetime import datetime, time
+
+# site -> common field -> that site's column
+FIELDS = {
+    "broadway": {
+        "title": "Title", "link": "Link", "description": "Description", "image_url": "Image URL",
+        "theatre": "Theatre", "production_type": "Production Type", "market_presence": "Market Presence",
+        "age_of_production": "Age of Production (yrs)", "category": "Category", "origin": "Origin",
+        "status": "Status", "date": "Date", "time": "Time",
+    },
+    "playbill": {
+        "title": "Name", "link": "Link", "image_url": "Image URL", "theatre": "Theatre", "market": "Market",
+        "market_presence": "Market Presence", "production_type": "Production Type", "origin": "Origin",
+        "status": "Status", "age_of_production": "Age of Production (yrs)", "date_range": "Date Range",
+        "category": "Category", "date": "Date", "time": "Time",
+    },
+    "broadway_shows": {
+        "title": "Name", "link": "Link", "image_url": "Image URL", "theatre": "Venue Name",
+        "venue_link": "Venue Link", "market": "Market", "market_presence": "Market Presence",
+        "production_type": "Production Type", "origin": "Origin", "status": "Status",
+        "age_of_production": "Age of Production", "date_range": "Date Range", "date": "Date", "time": "Time",
+    },
+    "ticketmaster": {
+        "title": "Show", "link": "Link", "image_url": "Image url", "theatre": "Theatre",
+        "location": "Location", "date": "Date", "time": "Time",
+    },
+    "tnny_events": {
+        "title": "title", "link": "event_url", "image_url": "image_url", "status": "status",
+        "production_type": "production_type", "origin": "origin", "market_presence": "market_presence",
+        "age_of_production": "age_of_production", "date": "date_time", "time": None,
+    },
+}
+
+DATE_FORMATS = (
+    "%Y-%m-%d", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y",
+    "%a, %b %d, %Y", "%A, %B %d, %Y", "%m/%d/%Y",
+)
+
+MISSING = ("", "N/A", "n/a", "None", None)
+
+# "SIX: The Musical", "Operation Mincemeat: A New Musical", "Dolly: A True Original Musical"
+TITLE_SUFFIX_RE = re.compile(
+    r"\s*(?:[:,\-\u2013\u2014]\s*(?:(?:a|the)\s+)?|\s\b(?:a|the)\s+)(?:new\s+)?(?:true\s+)?(?:original\s+)?musical\s*$",
+    re.IGNORECASE,
+)
+# ticketmaster's market tags: "Hamilton (Broadway)", "Wicked (NY)", "Hadestown [Touring]"
+MARKET_SUFFIX_RE = re.compile(r"\s*[(\[][^()\[\]]*[)\]]$")
+ARTICLES = ("the", "a", "an")
+VENUE_WORDS = ("the", "theatre", "theater")
+
+TIME_12H_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s*m\b\.?", re.IGNORECASE)
+TIME_24H_RE = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+
+
+def clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return None if value in MISSING else value
+
+
+def parse_date(text):
+    """Performance date in any of the sites' formats -> ``date`` (None if unparseable).
+
+    tnny's combined ``"15 July 2025 - 7:00 pm"`` is accepted too.
+    """
+    text = clean(text)
+    if text is None:
+        return None
+    text = text.split(" - ")[0].strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_time(text):
+    """``8:00pm`` / ``7pm`` / ``7:00 PM`` / ``19:30`` -> ``time`` (None if unparseable)."""
+    text = clean(text)
+    if text is None:
+        return None
+    match = TIME_12H_RE.search(text)
+    if match:
+        hour, minute = int(match.group(1)) % 12, int(match.group(2) or 0)
+        if match.group(3).lower() == "p":
+            hour += 12
+        return time(hour, minute) if hour < 24 and minute < 60 else None
+    match = TIME_24H_RE.search(text)
+    if match and int(match.group(1)) < 24 and int(match.group(2)) < 60:
+        return time(int(match.group(1)), int(match.group(2)))
+    return None
+
+
+def parse_int(text):
+    text = clean(text)
+    if text is None:
+        return None
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def standardize_title(title):
+    """Display title with the sites' decorations removed: ``"MJ The Musical"`` and
+    ``"MJ (Broadway)"`` -> ``"MJ"``."""
+    title = clean(title)
+    if title is None:
+        return None
+    title = " ".join(title.split())
+    stripped = TITLE_SUFFIX_RE.sub("", MARKET_SUFFIX_RE.sub("", title)).rstrip(" :,-")
+    return stripped or title
+
+
+def title_key(title):
+    """Comparison key of a title: ``"The Lion King"`` and ``"Lion King"`` or ``"& Juliet"`` and
+    ``"and juliet"`` give the same key."""
+    title = standardize_title(title)
+    if title is None:
+        return ""
+    title = "".join(c for c in unicodedata.normalize("NFKD", title) if not unicodedata.combining(c))
+    words = re.sub(r"[^\w]+", " ", title.casefold().replace("&", " and ")).split()
+    if len(words) > 1 and words[0] in ARTICLES:
+        words = words[1:]
+    return " ".join(words)
+
+
+def venue_key(name):
+    """Comparison key of a venue: ``"The Shubert Theatre"``, ``"Shubert Theater"`` and ``"Shubert"``
+    give the same key."""
+    name = clean(name)
+    if name is None:
+        return ""
+    name = "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+    words = re.sub(r"[^\w]+", " ", name.casefold().replace("&", " and ")).split()
+    return " ".join(word for word in words if word not in VENUE_WORDS) or " ".join(words)
+
+
+def normalize_row(site, row):
+    """Site row -> ``{common field: value}`` with typed date, time and age_of_production,
+    plus ``standardized_title``.
+
+    Columns the site has that are not in ``FIELDS`` are returned under ``extra``.
+    """
+    mapping = FIELDS.get(site, {})
+    out = {name: clean(row.get(column)) for name, column in mapping.items() if column}
+    raw_date = out.pop("date", None)
+    raw_time = out.pop("time", None)
+    if raw_time is None and raw_date and " - " in raw_date:
+        raw_time = raw_date.split(" - ", 1)[1]
+    out["date"] = parse_date(raw_date)
+    out["time"] = parse_time(raw_time)
+    out["age_of_production"] = parse_int(out.get("age_of_production"))
+    out["standardized_title"] = standardize_title(out.get("title"))
+    known = set(mapping.values())
+    out["extra"] = {k: v for k, v in row.items() if k not in known and clean(v) is not None}
+    return out
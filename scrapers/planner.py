@@ -0,0 +1,217 @@
+"""Adaptive refresh planner: spend a run's browser time on the shows that matter.
+
+For every show the planner looks at the site's past snapshots and learns how
+often its upcoming calendar actually changed between runs (performances that
+dropped off because their date passed do not count).  Each run it scores a
+show by
+
+    P(changed since last scraped) x urgency of its next performance
+
+where the change probability comes from a Poisson rate with a weak prior of
+one change a week, and urgency halves at ``URGENCY_DAYS`` out.  Shows never
+seen before, and shows not refreshed for ``MAX_STALENESS``, always make the
+plan.  The top ``budget`` shows are scraped; the others keep their upcoming
+rows from the snapshot they were last scraped in, so the output stays a full
+snapshot.  Which shows were carried rather than scraped is logged to
+``data/plans/<site>.jsonl`` so carried rows never count as "unchanged".
+
+    python -m scrapers plan --site broadway --budget 15
+"""
+import os
+import json
+import math
+import logging
+from datetime import datetime, timedelta
+
+from scrapers import snapshots
+
+PLAN_DIR = os.path.join("data", "plans")
+
+PRIOR_CHANGES = 1.0   # prior: one change ...
+PRIOR_DAYS = 7.0      # ... per week
+URGENCY_DAYS = 7.0
+NO_UPCOMING_URGENCY = 0.25
+MAX_STALENESS = timedelta(days=7)
+
+logger = logging.getLogger(__name__)
+
+
+class ShowHistory:
+    def __init__(self, key, title):
+        self.key = key
+        self.title = title
+        self.observations = 0
+        self.changes = 0
+        self.exposure_days = 0.0
+        self.last_scraped = None     # datetime of the last snapshot the show was freshly scraped in
+        self.last_snapshot = None    # Snapshot holding that observation
+        self.performances = set()
+
+    @property
+    def change_rate(self):
+        """Expected calendar changes per day."""
+        return (self.changes + PRIOR_CHANGES) / (self.exposure_days + PRIOR_DAYS)
+
+    def next_performance(self, today):
+        upcoming = snapshots.upcoming(self.performances, today)
+        return min(upcoming)[0] if upcoming else None
+
+
+def load_plan_log(site, directory=PLAN_DIR):
+    """snapshot name -> keys that were carried forward (not scraped) in that run."""
+    carried = {}
+    try:
+        with open(os.path.join(directory, f"{site}.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                carried[record["snapshot"]] = set(record["carried"])
+    except FileNotFoundError:
+        pass
+    return carried
+
+
+def calendar_changed(before, after, observed_at):
+    """Did the upcoming calendar change between two observations?
+
+    Only the window both observations cover is compared: from the later
+    observation's date up to the nearer of the two horizons.
+    """
+    if not before or not after:
+        return bool(before) != bool(after)
+    start = observed_at.date()
+    horizon = min(max(before)[0], max(after)[0])
+    window = lambda perfs: {p for p in perfs if start <= p[0] <= horizon}
+    return window(before) != window(after)
+
+
+def learn(site, directories=snapshots.SNAPSHOT_DIRS, plan_dir=PLAN_DIR):
+    """Build a ShowHistory per show from the site's snapshots, oldest first."""
+    carried = load_plan_log(site, plan_dir)
+    histories = {}
+    for snapshot in snapshots.find_snapshots(site, directories):
+        skipped = carried.get(snapshot.name, set())
+        for key, show in snapshots.performances_by_show(snapshot).items():
+            if key in skipped:
+                continue
+            history = histories.setdefault(key, ShowHistory(key, show["title"]))
+            if history.last_scraped is not None:
+                history.exposure_days += (snapshot.taken_at - history.last_scraped).total_seconds() / 86400
+                if calendar_changed(history.performances, show["performances"], snapshot.taken_at):
+                    history.changes += 1
+            history.observations += 1
+            history.last_scraped = snapshot.taken_at
+            history.last_snapshot = snapshot
+            history.performances = show["performances"]
+    return histories
+
+
+def score(history, now):
+    """(priority, reason) for one show; forced refreshes score infinity."""
+    if history is None:
+        return math.inf, "new show"
+    staleness = now - history.last_scraped
+    if staleness >= MAX_STALENESS:
+        return math.inf, f"not refreshed for {staleness.days}d"
+
+    p_changed = 1 - math.exp(-history.change_rate * staleness.total_seconds() / 86400)
+    next_date = history.next_performance(now.date())
+    if next_date is None:
+        urgency = NO_UPCOMING_URGENCY
+        when = "no upcoming performances"
+    else:
+        days_out = (next_date - now.date()).days
+        urgency = 1 / (1 + days_out / URGENCY_DAYS)
+        when = f"next performance in {days_out}d"
+    reason = f"{history.changes}/{max(history.observations - 1, 0)} runs changed, {when}"
+    return p_changed * urgency, reason
+
+
+class CrawlPlan:
+    def __init__(self, site, ranked, budget, histories, now):
+        self.site = site
+        self.ranked = ranked            # [(item, priority, reason)] highest priority first
+        self.budget = budget
+        self.histories = histories
+        self.now = now
+        cut = len(ranked) if budget is None else budget
+        self.selected = [item for item, _, _ in ranked[:cut]]
+        self.skipped = [item for item, _, _ in ranked[cut:]]
+
+    def summary(self):
+        lines = [f"{self.site}: scraping {len(self.selected)} of {len(self.ranked)} show(s)"]
+        for rank, (item, priority, reason) in enumerate(self.ranked, 1):
+            marker = "*" if rank <= len(self.selected) else " "
+            lines.append(f"{marker} {rank:>3}. {priority:>6.3f}  {item.get('Title') or item.get('Name') or item['Link']}  ({reason})")
+        return "\n".join(lines)
+
+    def carry_forward(self, writer, exclude=(), plan_dir=PLAN_DIR):
+        """Write the skipped shows' upcoming rows from their last scraped snapshot and log the carry.
+
+        ``exclude`` holds links whose rows are already in the output (e.g. replayed from a checkpoint).
+        """
+        today = self.now.date()
+        by_snapshot = {}
+        for item in self.skipped:
+            if item["Link"] in exclude:
+                continue
+            history = self.histories.get(item["Link"])
+            if history is None:  # a new show that did not fit the budget has nothing to carry
+                continue
+            by_snapshot.setdefault(history.last_snapshot, set()).add(item["Link"])
+
+        carried = 0
+        for snapshot, keys in by_snapshot.items():
+            rows = {}
+            for row in snapshot.rows():
+                key = snapshots.show_key(row, self.site)
+                performed_on = snapshots.parse_date(snapshots.field(row, self.site, "date"))
+                if key in keys and (performed_on is None or performed_on >= today):
+                    rows.setdefault(key, []).append(row)
+            for key_rows in rows.values():
+                writer.write_rows(key_rows)
+                carried += len(key_rows)
+
+        if writer.paths:
+            os.makedirs(plan_dir, exist_ok=True)
+            record = {
+                "snapshot": os.path.splitext(os.path.basename(writer.paths[0]))[0],
+                "carried": [item["Link"] for item in self.skipped],
+                "planned_at": self.now.isoformat(timespec="seconds"),
+            }
+            with open(os.path.join(plan_dir, f"{self.site}.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return carried
+
+
+def plan_crawl(site, links, budget=None, now=None, directories=snapshots.SNAPSHOT_DIRS, plan_dir=PLAN_DIR):
+    """Rank the list page's show cards (dicts with a "Link") and keep the top ``budget``.
+
+    With ``budget=None`` every show is selected in list-page order, i.e. a
+    normal full run.
+    """
+    now = now or datetime.now()
+    if budget is None:
+        return CrawlPlan(site, [(item, math.inf, "full run") for item in links], None, {}, now)
+
+    histories = learn(site, directories, plan_dir)
+    ranked = []
+    for item in links:
+        priority, reason = score(histories.get(item["Link"]), now)
+        ranked.append((item, priority, reason))
+    ranked.sort(key=lambda entry: entry[1], reverse=True)
+    return CrawlPlan(site, ranked, budget, histories, now)
+
+
+def main(args):
+    """Print the plan for the shows in the site's latest snapshot (no browser needed)."""
+    latest = snapshots.latest_snapshot(args.site)
+    if latest is None:
+        raise SystemExit(f"No snapshots of '{args.site}' in {', '.join(snapshots.SNAPSHOT_DIRS)}")
+    links = [{"Link": key, "Title": show["title"]} for key, show in snapshots.performances_by_show(latest).items()]
+    now = datetime.fromisoformat(args.as_of) if args.as_of else None
+    budget = args.budget if args.budget is not None else len(links)
+    print(plan_crawl(args.site, links, budget=budget, now=now).summary())
+    return 0
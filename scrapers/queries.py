@@ -0,0 +1,120 @@
+"""Common questions answered from the SQLite store (``scrapers.sqlite_store``).
+
+Every query is a single indexed lookup, so answers come back in
+milliseconds however many runs the store holds.  Only performances listed
+by the latest run that saw their show are returned; ones a later run no
+longer lists (moved, cancelled, sold off) stay in the store but not in the
+answers::
+
+    performances_at_venue("Gershwin", *next_week())
+    show_schedule("Wicked", date(2025, 8, 1), date(2025, 8, 31))
+
+    python -m scrapers query venue Gershwin --next-week
+    python -m scrapers query show Wicked --from 2025-08-01 --to 2025-08-31
+    python -m scrapers query date 2025-07-20
+"""
+from datetime import date, timedelta
+
+from scrapers.sqlite_store import STORE_DB, connect
+
+PERFORMANCE_COLUMNS = """
+    p.performance_date, p.performance_time, s.title, s.site, v.name AS venue, p.status, s.link, p.last_seen
+"""
+# Still listed: seen in the latest run of its show (runs stamp the show and its performances alike)
+CURRENT = "p.last_seen = s.last_seen"
+
+
+def next_week(today=None):
+    """(Monday, Sunday) of the coming week."""
+    today = today or date.today()
+    monday = today + timedelta(days=7 - today.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+def _rows(conn, sql, params):
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def performances_at_venue(venue, start, end, conn=None):
+    """Performances at a venue (case-insensitive name) between two dates, in time order."""
+    conn = conn or connect(STORE_DB)
+    return _rows(conn, f"""
+        SELECT {PERFORMANCE_COLUMNS}
+        FROM venues v
+        JOIN performances p ON p.venue_id = v.id
+        JOIN shows s ON s.id = p.show_id
+        WHERE v.name = ? AND p.performance_date BETWEEN ? AND ? AND {CURRENT}
+        ORDER BY p.performance_date, p.performance_time, s.title
+    """, (venue, start.isoformat(), end.isoformat()))
+
+
+def show_schedule(title, start, end, site=None, conn=None):
+    """Performances of a show (exact title, case-insensitive) between two dates, across sites unless ``site``."""
+    conn = conn or connect(STORE_DB)
+    sql = f"""
+        SELECT {PERFORMANCE_COLUMNS}
+        FROM shows s
+        JOIN performances p ON p.site = s.site AND p.show_id = s.id
+        LEFT JOIN venues v ON v.id = p.venue_id
+        WHERE s.title_key = ? AND p.performance_date BETWEEN ? AND ? AND {CURRENT}
+    """
+    params = [" ".join(title.split()).casefold(), start.isoformat(), end.isoformat()]
+    if site:
+        sql += " AND s.site = ?"
+        params.append(site)
+    return _rows(conn, sql + " ORDER BY p.performance_date, p.performance_time, s.site", params)
+
+
+def performances_on(day, site=None, conn=None):
+    """Everything playing on one date."""
+    conn = conn or connect(STORE_DB)
+    sql = f"""
+        SELECT {PERFORMANCE_COLUMNS}
+        FROM performances p
+        JOIN shows s ON s.id = p.show_id
+        LEFT JOIN venues v ON v.id = p.venue_id
+        WHERE p.performance_date = ? AND {CURRENT}
+    """
+    params = [day.isoformat()]
+    if site:
+        sql += " AND p.site = ?"
+        params.append(site)
+    return _rows(conn, sql + " ORDER BY p.performance_time, s.title", params)
+
+
+def venues(conn=None):
+    """Venues with their number of upcoming performances."""
+    conn = conn or connect(STORE_DB)
+    return _rows(conn, f"""
+        SELECT v.name, v.location, COUNT(p.id) AS upcoming
+        FROM venues v
+        LEFT JOIN (performances p JOIN shows s ON s.id = p.show_id AND {CURRENT})
+            ON p.venue_id = v.id AND p.performance_date >= ?
+        GROUP BY v.id
+        ORDER BY upcoming DESC, v.name
+    """, (date.today().isoformat(),))
+
+
+def main(args):
+    from time import perf_counter
+
+    start = date.fromisoformat(args.start) if args.start else date.today()
+    end = date.fromisoformat(args.end) if args.end else start + timedelta(days=30)
+    if args.next_week:
+        start, end = next_week()
+
+    began = perf_counter()
+    if args.what == "venue":
+        rows = performances_at_venue(args.value, start, end)
+    elif args.what == "show":
+        rows = show_schedule(args.value, start, end, site=args.site)
+    elif args.what == "date":
+        rows = performances_on(date.fromisoformat(args.value), site=args.site)
+    else:
+        rows = venues()
+    elapsed = (perf_counter() - began) * 1000
+
+    for row in rows:
+        print("  ".join(str(v) if v is not None else "-" for v in row.values()))
+    print(f"{len(rows)} row(s) in {elapsed:.1f} ms")
+    return 0
@@ -0,0 +1,183 @@
+"""Retry policy with jittered exponential backoff and a per-domain circuit breaker.
+
+Every scraper talks to a single site, so when that site is down or starts
+blocking us every remaining show would burn a 10-20 s timeout.  The breaker
+counts consecutive transient failures per domain and, once tripped, fails
+fast with ``CircuitOpenError`` until the cool-down has passed.
+"""
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import (
+    InvalidArgumentException,
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+logger = logging.getLogger(__name__)
+
+# Chrome network error codes that are worth another attempt.
+RETRYABLE_MESSAGES = (
+    "ERR_CONNECTION",
+    "ERR_NAME_NOT_RESOLVED",
+    "ERR_TIMED_OUT",
+    "ERR_INTERNET_DISCONNECTED",
+    "ERR_NETWORK_CHANGED",
+    "ERR_EMPTY_RESPONSE",
+    "ERR_HTTP2_PROTOCOL_ERROR",
+    "timed out",
+    "timeout",
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a site whose breaker is open."""
+
+
+def domain_of(url):
+    return urlparse(url).netloc.lower() if url else ""
+
+
+def is_retryable(exc):
+    """Classify an exception as transient (retry) or fatal (give up now).
+
+    Missing elements mean the page layout is not what we expect, and a dead
+    browser session will not come back, so neither is retried.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException, InvalidArgumentException)):
+        return False
+    if isinstance(exc, (TimeoutException, StaleElementReferenceException)):
+        return True
+    if isinstance(exc, NoSuchElementException):
+        return False
+    if isinstance(exc, WebDriverException):
+        message = str(exc)
+        return any(code in message for code in RETRYABLE_MESSAGES)
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+class RetryPolicy:
+    def __init__(self, attempts=3, base_delay=2.0, max_delay=30.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number ``attempt`` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(self.base_delay / 2, max(ceiling, self.base_delay / 2))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures,
+    half-open (one trial call) after ``cooldown`` seconds."""
+
+    def __init__(self, domain, failure_threshold=5, cooldown=300.0):
+        self.domain = domain
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        if self.state == "open":
+            remaining = self.cooldown - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(
+                f"Circuit open for {self.domain} after {self.failures} consecutive failures "
+                f"(retry in {remaining:.0f}s)"
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                logger.warning(f"Circuit opened for {self.domain} ({self.failures} consecutive failures)")
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(url_or_domain, **kwargs):
+    domain = domain_of(url_or_domain) if "/" in url_or_domain else url_or_domain.lower()
+    with _breakers_lock:
+        if domain not in _breakers:
+            _breakers[domain] = CircuitBreaker(domain, **kwargs)
+        return _breakers[domain]
+
+
+def call_with_retry(fn, *args, url=None, policy=DEFAULT_POLICY, description=None, **kwargs):
+    """Call ``fn(*args, **kwargs)``, retrying transient errors with backoff.
+
+    Transient failures count against the breaker of ``url``'s domain; once it
+    opens, ``CircuitOpenError`` is raised without calling ``fn``.
+    """
+    breaker = breaker_for(url) if url else None
+    description = description or url or getattr(fn, "__name__", "call")
+
+    for attempt in range(1, policy.attempts + 1):
+        if breaker:
+            breaker.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker and retryable:
+                breaker.record_failure()
+            if not retryable or attempt == policy.attempts:
+                raise
+            if breaker and breaker.state == "open":
+                raise CircuitOpenError(f"Circuit opened for {breaker.domain} while loading {description}") from e
+            delay = policy.backoff(attempt)
+            logger.warning(
+                f"Attempt {attempt}/{policy.attempts} failed for {description}: "
+                f"{type(e).__name__}. Retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+        else:
+            if breaker:
+                breaker.record_success()
+            return result
+
+
+def get_page(driver, url, wait_for=None, timeout=10, policy=DEFAULT_POLICY):
+    """``driver.get(url)`` and optionally wait for a CSS selector, with retries."""
+
+    def load():
+        driver.get(url)
+        if wait_for:
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, wait_for))
+            )
+
+    call_with_retry(load, url=url, policy=policy)
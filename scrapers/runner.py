@@ -0,0 +1,188 @@
+"""Run several site scrapers at once, one process (and one Chrome) per site.
+
+Each scraper module keeps its own ``__main__`` block; the runner just imports
+the module in a worker process and calls its entry point, so a site can
+still be run by hand exactly as before.
+"""
+import os
+import sys
+import time
+import inspect
+import logging
+import importlib
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, in-process checks still apply
+    fcntl = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# site name -> (module, entry point). Entry points return the number of rows saved.
+SITES = {
+    "broadway": ("broadway", "scrape_shows"),
+    "broadway_prices": ("broadway", "scrape_prices"),
+    "playbill": ("playbill", "scrape_shows"),
+    "ticketmaster": ("ticketmaster", "scrape_shows"),
+    "tnny": ("tnny", "main"),
+    "todaytix": ("todaytix", "scrape_shows"),
+    "conspicuous": ("conspicuous1", "scrape_jobs"),
+}
+
+MAX_BROWSERS = 3
+ERROR_MARKERS = ("❌", "🚫", "⛔")
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"  # the scrapers' own basicConfig format
+
+
+class ErrorCounter(logging.Handler):
+    """Counts error records, including the emoji-tagged INFO lines from log_and_print."""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.count = 0
+
+    def emit(self, record):
+        if record.levelno >= logging.ERROR or str(record.msg).lstrip().startswith(ERROR_MARKERS):
+            self.count += 1
+
+
+def site_log_handler(module):
+    """File handler for the site's log (the module's ``log_file``), or None when one is already attached.
+
+    The scrapers set their log up with ``logging.basicConfig(filename=log_file, ...)`` at import,
+    which does nothing once the root logger has a handler - in a pool worker, anything left by an
+    earlier run - so the runner attaches the file itself.  Modules without ``log_file`` (tnny)
+    add their handlers directly.
+    """
+    path = getattr(module, "log_file", None)
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+    if any(getattr(handler, "baseFilename", None) == path for handler in logging.getLogger().handlers):
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _limit_worker(cpus, quiet):
+    """Pool initializer: pin the worker (and the Chrome it spawns) to ``cpus`` cores."""
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        allowed = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, allowed[:cpus])
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+
+
+class SiteBusyError(Exception):
+    """Another process (runner, scheduler or a manual run) holds the site's lock."""
+
+
+@contextlib.contextmanager
+def site_lock(site):
+    """Hold ``log/<site>.lock`` for the duration of a run so two runs of a site never overlap."""
+    os.makedirs(os.path.join(ROOT, "log"), exist_ok=True)
+    with open(os.path.join(ROOT, "log", f"{site}.lock"), "w") as handle:
+        if fcntl:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise SiteBusyError(f"{site} is already running") from None
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def run_site(site, kwargs=None):
+    """Run one site's scraper in the current process and return its summary."""
+    module_name, func_name = SITES[site]
+    counter = ErrorCounter()
+    root = logging.getLogger()
+    attached = []
+    start = time.monotonic()
+    rows, failure = 0, None
+    try:
+        with site_lock(site):
+            # Handlers go on after the import, so a first import's basicConfig still sets up the log
+            module = importlib.import_module(module_name)
+            attached = [handler for handler in (site_log_handler(module), counter) if handler is not None]
+            root.setLevel(logging.INFO)
+            for handler in attached:
+                root.addHandler(handler)
+            entry_point = getattr(module, func_name)
+            # Only pass options (e.g. resume) the site's entry point understands
+            accepted = inspect.signature(entry_point).parameters
+            result = entry_point(**{k: v for k, v in (kwargs or {}).items() if k in accepted})
+            rows = result if isinstance(result, int) else 0
+    except Exception as e:
+        failure = f"{type(e).__name__}: {e}"
+        counter.count += 1
+    finally:
+        for handler in attached:
+            root.removeHandler(handler)
+            handler.close()
+    return {
+        "site": site,
+        "duration": time.monotonic() - start,
+        "rows": rows,
+        "errors": counter.count,
+        "failure": failure,
+    }
+
+
+def make_pool(max_browsers=MAX_BROWSERS, cpus=None, quiet=False):
+    # spawn keeps each worker free of the parent's logging handlers and Chrome state
+    return ProcessPoolExecutor(
+        max_workers=max_browsers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_limit_worker,
+        initargs=(cpus, quiet),
+    )
+
+
+def run_sites(sites, max_browsers=MAX_BROWSERS, cpus=None, quiet=False, kwargs=None):
+    unknown = [s for s in sites if s not in SITES]
+    if unknown:
+        raise ValueError(f"Unknown site(s): {', '.join(unknown)}. Choose from: {', '.join(SITES)}")
+
+    results = []
+    with make_pool(min(max_browsers, len(sites)), cpus, quiet) as pool:
+        futures = {pool.submit(run_site, site, kwargs): site for site in sites}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:  # worker process died (e.g. OOM-killed Chrome)
+                results.append({"site": futures[future], "duration": 0.0, "rows": 0, "errors": 1,
+                                "failure": f"{type(e).__name__}: {e}"})
+    order = {site: i for i, site in enumerate(sites)}
+    return sorted(results, key=lambda r: order[r["site"]])
+
+
+def format_summary(results, wall_clock):
+    lines = [f"{'Site':<17}{'Status':<8}{'Duration':>10}{'Rows':>8}{'Errors':>8}"]
+    for r in results:
+        status = "FAILED" if r["failure"] else "ok"
+        lines.append(f"{r['site']:<17}{status:<8}{r['duration']:>9.1f}s{r['rows']:>8}{r['errors']:>8}")
+        if r["failure"]:
+            lines.append(f"    {r['failure']}")
+    serial = sum(r["duration"] for r in results)
+    lines.append(f"Wall clock: {wall_clock:.1f}s (sum of site runs: {serial:.1f}s)")
+    return "\n".join(lines)
+
+
+def main(args):
+    sites = [s.strip() for s in args.sites.split(",") if s.strip()] if args.sites else list(SITES)
+    start = time.monotonic()
+    results = run_sites(sites, max_browsers=args.max_browsers, cpus=args.cpus, quiet=args.quiet,
+                        kwargs={"resume": args.resume, "budget": args.budget, "new_only": args.new_only})
+    print(format_summary(results, time.monotonic() - start))
+    return 1 if any(r["failure"] for r in results) else 0
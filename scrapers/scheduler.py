@@ -0,0 +1,157 @@
+"""Long-running daemon that runs each site on its own cadence.
+
+* Each site is a ``schedule`` job; a site is never started while its previous
+  run is still going (in-process check plus the ``log/<site>.lock`` file
+  lock taken by ``runner.run_site``, which also keeps cron jobs out).
+* Runs go to one long-lived process pool, so worker processes stay warm with
+  selenium/pandas and the scraper modules already imported.
+* Last-run times are persisted to ``log/scheduler_state.json``; after a
+  restart each job resumes from ``last_start + cadence`` instead of firing
+  every site at once.
+"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import schedule
+
+from scrapers import runner
+
+STATE_FILE = os.path.join(runner.ROOT, "log", "scheduler_state.json")
+
+# Default cadence per site
+CADENCES = {
+    "broadway": timedelta(hours=6),
+    "broadway_prices": timedelta(hours=1),
+    "playbill": timedelta(hours=6),
+    "ticketmaster": timedelta(hours=6),
+    "tnny": timedelta(hours=12),
+}
+
+# Spread first-ever runs apart so a fresh daemon does not start every browser at once
+FIRST_RUN_STAGGER = timedelta(minutes=2)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_cadence(text):
+    """'6h' / '30m' / '1d' / '90s' -> timedelta."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd])\s*", text)
+    if not match:
+        raise ValueError(f"Invalid cadence '{text}' (expected e.g. 30m, 6h, 1d)")
+    value, unit = float(match.group(1)), match.group(2)
+    return timedelta(**{{"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}[unit]: value})
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class SiteScheduler:
+    def __init__(self, cadences, max_browsers=runner.MAX_BROWSERS, cpus=None, state_path=STATE_FILE):
+        self.cadences = cadences
+        self.state_path = state_path
+        self.state = load_state(state_path)
+        self.running = {}
+        self.lock = threading.Lock()
+        self.pool = runner.make_pool(max_browsers, cpus, quiet=True)
+        self.scheduler = schedule.Scheduler()
+
+    def first_run(self, site, index, now):
+        last_start = self.state.get(site, {}).get("last_start")
+        if last_start:
+            return max(now, datetime.fromisoformat(last_start) + self.cadences[site])
+        return now + index * FIRST_RUN_STAGGER
+
+    def setup(self):
+        now = datetime.now()
+        for index, (site, cadence) in enumerate(self.cadences.items()):
+            job = self.scheduler.every(int(cadence.total_seconds())).seconds.do(self.trigger, site)
+            job.next_run = self.first_run(site, index, now)
+            logger.info(f"{site}: every {cadence}, next run at {job.next_run:%Y-%m-%d %H:%M:%S}")
+
+    def trigger(self, site):
+        with self.lock:
+            future = self.running.get(site)
+            if future and not future.done():
+                logger.warning(f"{site}: previous run still in progress, skipping this slot")
+                return
+            self.state.setdefault(site, {})["last_start"] = datetime.now().isoformat(timespec="seconds")
+            save_state(self.state, self.state_path)
+            future = self.pool.submit(runner.run_site, site)
+            self.running[site] = future
+        logger.info(f"{site}: run started")
+        future.add_done_callback(lambda f: self.finished(site, f))
+
+    def finished(self, site, future):
+        try:
+            result = future.result()
+        except Exception as e:  # the worker process itself died
+            result = {"rows": 0, "errors": 1, "duration": 0.0, "failure": f"{type(e).__name__}: {e}"}
+        with self.lock:
+            entry = self.state.setdefault(site, {})
+            entry.update(
+                last_end=datetime.now().isoformat(timespec="seconds"),
+                last_status="failed" if result["failure"] else "ok",
+                last_rows=result["rows"],
+                last_errors=result["errors"],
+                last_duration=round(result["duration"], 1),
+            )
+            save_state(self.state, self.state_path)
+        logger.info(
+            f"{site}: run finished in {result['duration']:.1f}s, {result['rows']} rows, "
+            f"{result['errors']} errors{' (' + result['failure'] + ')' if result['failure'] else ''}"
+        )
+
+    def run_forever(self, poll_seconds=30):
+        self.setup()
+        try:
+            while True:
+                self.scheduler.run_pending()
+                idle = self.scheduler.idle_seconds
+                time.sleep(max(1, min(poll_seconds, idle if idle is not None else poll_seconds)))
+        except KeyboardInterrupt:
+            logger.info("Scheduler stopping; waiting for running sites to finish")
+        finally:
+            self.pool.shutdown(wait=True)
+
+
+def main(args):
+    os.makedirs(os.path.join(runner.ROOT, "log"), exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(os.path.join(runner.ROOT, "log", "scheduler.log"), encoding="utf-8"),
+            logging.StreamHandler(),
+        ],
+    )
+
+    cadences = dict(CADENCES)
+    for override in args.every or []:
+        site, _, text = override.partition("=")
+        if site not in runner.SITES:
+            raise SystemExit(f"Unknown site '{site}'. Choose from: {', '.join(runner.SITES)}")
+        cadences[site] = parse_cadence(text)
+    if args.sites:
+        selected = [s.strip() for s in args.sites.split(",") if s.strip()]
+        cadences = {site: cadences.get(site, timedelta(hours=6)) for site in selected}
+
+    SiteScheduler(cadences, max_browsers=args.max_browsers, cpus=args.cpus).run_forever()
+    return 0
@@ -0,0 +1,245 @@
+"""Sitemap-driven discovery: only crawl the production pages that changed.
+
+Instead of rendering the site's listing page in Chrome, ``discover`` reads
+the XML sitemap(s) and compares each production URL's ``<lastmod>`` with the
+one recorded after the last successful run (``data/sitemaps/<site>.json``):
+
+* shows from the latest snapshot whose page changed (or has no lastmod), and
+  Broadway productions whose page appeared or changed since the last run,
+  are crawled;
+* the other shows keep their upcoming rows from their last scraped snapshot
+  (``planner.CrawlPlan.carry_forward``), so the output stays a full snapshot;
+* shows of the latest snapshot the sitemap doesn't list (gone from it, or in
+  a child sitemap not fetched) are carried at most ``MAX_UNCOVERED_RUNS``
+  runs in a row, then crawled again, so their rows don't dwindle away;
+* shows whose crawl failed keep their old lastmod and are kept in the
+  state's ``retry`` list, so the next run crawls them again even if they
+  dropped out of the snapshot.
+
+Sitemaps are stream-parsed with ``iterparse`` and every element is dropped
+as soon as it is read, so memory stays bounded by the URLs kept, not the
+file size.  Child sitemaps of an index whose own ``<lastmod>`` predates the
+last run are not even downloaded.  Sources can be URLs, ``file://`` URLs or
+local paths (``.gz`` included), so fixtures work as well as the live site::
+
+    python playbill.py --discover sitemap
+    python -m scrapers sitemap playbill --source fixtures/sitemap_index.xml
+"""
+import os
+import re
+import gzip
+import json
+import logging
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from xml.etree.ElementTree import iterparse
+
+from scrapers import planner, snapshots
+
+SITEMAP_DIR = os.path.join("data", "sitemaps")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+MAX_DEPTH = 3  # sitemap index -> sitemap nesting followed
+NEW_SHOW_WINDOW = timedelta(days=30)  # first run: productions changed this recently count as new
+MAX_UNCOVERED_RUNS = 3  # runs a known show missing from the sitemap is carried before it is crawled again
+
+SITEMAPS = {
+    "playbill": "https://playbill.com/sitemap.xml",
+}
+# Production pages worth tracking on each site
+PAGE_PATTERNS = {
+    "playbill": re.compile(r"^https?://(?:www\.)?playbill\.com/production/"),
+}
+# Pages of productions not seen before that are crawled as new shows
+NEW_SHOW_PATTERNS = {
+    "playbill": re.compile(r"-broadway-"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _tag(element):
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def parse_lastmod(text):
+    """W3C datetime (``2025-07-01``, ``2025-07-01T10:00:00+00:00``, ``...Z``) -> aware UTC datetime."""
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=parsed.tzinfo or timezone.utc).astimezone(timezone.utc)
+
+
+def open_source(source):
+    """Binary file object for a sitemap URL, ``file://`` URL or local path, gunzipped when needed."""
+    if re.match(r"^[a-z]+://", source):
+        request = urllib.request.Request(source, headers={"User-Agent": USER_AGENT})
+        handle = urllib.request.urlopen(request, timeout=60)
+        gzipped = handle.headers.get("Content-Encoding") == "gzip"
+    else:
+        handle = open(source, "rb")
+        gzipped = False
+    if gzipped or source.endswith(".gz"):
+        return gzip.GzipFile(fileobj=handle)
+    return handle
+
+
+def iter_entries(source, since=None, depth=0):
+    """``(loc, lastmod text)`` of every ``<url>`` under ``source``, following sitemap indexes.
+
+    Index entries whose lastmod is not after ``since`` (aware datetime) are
+    skipped without being fetched.
+    """
+    children = []
+    with open_source(source) as f:
+        root = None
+        for event, element in iterparse(f, events=("start", "end")):
+            if root is None:
+                root = element
+            if event != "end" or _tag(element) not in ("url", "sitemap"):
+                continue
+            fields = {_tag(child): (child.text or "").strip() for child in element}
+            loc, lastmod = fields.get("loc"), fields.get("lastmod") or None
+            root.clear()  # nothing read so far is kept
+            if not loc:
+                continue
+            if _tag(element) == "url":
+                yield loc, lastmod
+            else:
+                modified = parse_lastmod(lastmod)
+                if since is None or modified is None or modified > since:
+                    if not re.match(r"^[a-z]+://", loc) and not re.match(r"^[a-z]+://", source):
+                        loc = os.path.join(os.path.dirname(source), loc)  # local index: relative to it
+                    children.append(loc)
+    for child in children:
+        if depth >= MAX_DEPTH:
+            logger.warning("Not following %s: sitemaps nested more than %d deep", child, MAX_DEPTH)
+            continue
+        yield from iter_entries(child, since, depth + 1)
+
+
+class SitemapState:
+    """Lastmods recorded after the last successful run of a site, for how many runs in a row
+    each known show missing from the sitemap has been carried forward (``uncovered``), and the
+    shows selected by the last run whose crawl failed (``retry``)."""
+
+    def __init__(self, site, directory=SITEMAP_DIR):
+        self.path = os.path.join(directory, f"{site}.json")
+        self.checked_at, self.lastmod, self.uncovered, self.retry = None, {}, {}, []
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.checked_at = parse_lastmod(state.get("checked_at"))
+            self.lastmod = state.get("lastmod", {})
+            self.uncovered = state.get("uncovered", {})
+            self.retry = state.get("retry", [])
+
+    def save(self, lastmods, checked_at, uncovered=None, retry=None):
+        self.lastmod.update(lastmods)
+        self.checked_at = checked_at
+        if uncovered is not None:
+            self.uncovered = uncovered
+        if retry is not None:
+            self.retry = retry
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"checked_at": checked_at.isoformat(timespec="seconds"), "lastmod": self.lastmod,
+                       "uncovered": self.uncovered, "retry": self.retry}, f)
+        os.replace(tmp_path, self.path)
+
+
+class Discovery:
+    def __init__(self, site, plan, lastmods, state, started_at, uncovered=None):
+        self.site = site
+        self.plan = plan            # planner.CrawlPlan: selected = changed or uncovered too long, skipped = carried
+        self.lastmods = lastmods    # {link: lastmod} of the selected shows found in the sitemap
+        self.state = state
+        self.started_at = started_at
+        self.uncovered = uncovered or {}  # {link: runs carried since its last crawl} of the shows missing from the sitemap
+
+    def summary(self):
+        recrawled = len(self.plan.selected) - len(self.lastmods)
+        return (f"🗺️ {self.site} sitemap: {len(self.lastmods)} changed or new show(s) and {recrawled} not in "
+                f"the sitemap to scrape, {len(self.plan.skipped)} carried forward")
+
+    def save(self, crawled=None):
+        """Record the lastmods of the shows crawled; call once the run has finished.
+
+        ``crawled`` holds the links whose rows were actually written (e.g.
+        ``Checkpoint.completed``); a selected show not in it failed, so its old
+        lastmod is kept and it is retried next run.  None: every selected show.
+        """
+        selected = [item["Link"] for item in self.plan.selected]
+        crawled = set(selected if crawled is None else crawled)
+        lastmods = {link: lastmod for link, lastmod in self.lastmods.items() if link in crawled}
+        # An uncovered show whose re-crawl failed is due again: drop its count (missing = due)
+        uncovered = {link: runs for link, runs in self.uncovered.items() if runs or link in crawled}
+        retry = [link for link in selected if link not in crawled]
+        self.state.save(lastmods, self.started_at, uncovered, retry)
+
+
+def known_shows(site, directories=snapshots.SNAPSHOT_DIRS):
+    """``{link: first row}`` of the shows in the site's latest snapshot."""
+    latest = snapshots.latest_snapshot(site, directories)
+    shows = {}
+    if latest is not None:
+        for row in latest.rows():
+            shows.setdefault(snapshots.show_key(row, site), row)
+    return shows
+
+
+def discover(site, to_entry, source=None, now=None, directories=snapshots.SNAPSHOT_DIRS,
+             state_dir=SITEMAP_DIR, plan_dir=planner.PLAN_DIR):
+    """Which of ``site``'s shows to crawl this run, as a ``Discovery``.
+
+    ``to_entry(link, row)`` turns a link and its row from the latest snapshot
+    (None for a new show) into the scraper's show-card dict.
+    """
+    now = now or datetime.now()
+    state = SitemapState(site, state_dir)
+    pattern, new_pattern = PAGE_PATTERNS[site], NEW_SHOW_PATTERNS[site]
+    known = known_shows(site, directories)
+    retry = set(state.retry)
+
+    # A production not in the latest snapshot is new if its page changed since the last run
+    cutoff = state.checked_at or now.astimezone(timezone.utc) - NEW_SHOW_WINDOW
+    lastmods = {}
+    for loc, lastmod in iter_entries(source or SITEMAPS[site], since=state.checked_at):
+        if not pattern.match(loc):
+            continue
+        if loc in known or loc in retry or (new_pattern.search(loc) and (parse_lastmod(lastmod) or cutoff) > cutoff):
+            lastmods[loc] = lastmod
+    changed = {loc: lastmod for loc, lastmod in lastmods.items()
+               if lastmod is None or state.lastmod.get(loc) != lastmod}
+    # Known shows the sitemap didn't list: nothing says whether they changed, so they are only
+    # carried for a few runs (never-tracked ones are crawled straight away)
+    uncovered = [loc for loc in known if loc not in lastmods]
+    recrawl = [loc for loc in uncovered if state.uncovered.get(loc, MAX_UNCOVERED_RUNS) >= MAX_UNCOVERED_RUNS]
+    carried = {loc: 0 if loc in recrawl else state.uncovered[loc] + 1 for loc in uncovered}
+    # Failed last run and listed by neither the sitemap nor the snapshot: crawled as new shows
+    recrawl += [loc for loc in state.retry if loc not in lastmods and loc not in known]
+
+    ranked = [(to_entry(loc, known.get(loc)), 1.0, "changed in sitemap" if loc in known else "new in sitemap")
+              for loc in changed]
+    ranked += [(to_entry(loc, known.get(loc)), 1.0, "not in sitemap" if loc in known else "retried")
+               for loc in recrawl]
+    ranked += [(to_entry(loc, row), 0.0, "not in sitemap, carried" if loc in uncovered else "unchanged in sitemap")
+               for loc, row in known.items() if loc not in changed and loc not in recrawl]
+    plan = planner.CrawlPlan(site, ranked, len(changed) + len(recrawl), planner.learn(site, directories, plan_dir), now)
+    return Discovery(site, plan, changed, state, now.astimezone(timezone.utc), carried)
+
+
+def main(args):
+    """Print what a sitemap-driven run would crawl (no browser, state left untouched)."""
+    if args.site not in SITEMAPS:
+        raise SystemExit(f"No sitemap known for '{args.site}'. Choose from: {', '.join(SITEMAPS)}")
+    discovery = discover(args.site, lambda link, row: {"Link": link}, source=args.source)
+    print(discovery.summary())
+    for item in discovery.plan.selected:
+        link = item["Link"]
+        lastmod = (discovery.lastmods[link] or "no lastmod") if link in discovery.lastmods else "not in sitemap"
+        print(f"  {lastmod:<26} {link}")
+    return 0
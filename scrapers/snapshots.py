@@ -0,0 +1,108 @@
+"""Reading past scrape outputs back in.
+
+Every run leaves ``data/<site>_<YYYYmmdd_HHMMSS>.<csv|ndjson>`` behind and
+older runs are moved to ``data/old/``.  This module finds those snapshots,
+streams their rows and maps each site's own column names onto a few common
+fields (title, link, date, time) so history can be compared across runs.
+"""
+import os
+import re
+import csv
+import json
+from datetime import date, datetime
+
+from scrapers.normalize import FIELDS, MISSING, parse_date
+
+SNAPSHOT_DIRS = ("data", os.path.join("data", "old"))
+
+FILENAME_RE = re.compile(r"^(?P<site>.+)_(?P<stamp>\d{8}_\d{6})\.(?P<ext>csv|ndjson)$")
+
+
+class Snapshot:
+    def __init__(self, path, site, taken_at):
+        self.path = path
+        self.site = site
+        self.taken_at = taken_at
+
+    @property
+    def name(self):
+        """File name without extension, e.g. ``broadway_20250718_105404``."""
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    def __repr__(self):
+        return f"Snapshot({self.path!r})"
+
+    def rows(self):
+        if self.path.endswith(".ndjson"):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                yield from csv.DictReader(f)
+
+
+def parse_snapshot_name(path):
+    """``data/broadway_20250718_105404.csv`` -> ``("broadway", datetime(2025, 7, 18, 10, 54, 4))``, else None."""
+    match = FILENAME_RE.match(os.path.basename(path))
+    if not match:
+        return None
+    return match.group("site"), datetime.strptime(match.group("stamp"), "%Y%m%d_%H%M%S")
+
+
+def find_snapshots(site=None, directories=SNAPSHOT_DIRS):
+    """Snapshots of ``site`` (or every site) oldest first.
+
+    When a run was saved in several formats only one file per run is kept,
+    preferring CSV.
+    """
+    found = {}
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.listdir(directory):
+            parsed = parse_snapshot_name(entry)
+            if not parsed or (site and parsed[0] != site):
+                continue
+            path = os.path.join(directory, entry)
+            run = (parsed[0], parsed[1])
+            if run not in found or path.endswith(".csv"):
+                found[run] = Snapshot(path, *parsed)
+    return sorted(found.values(), key=lambda s: (s.taken_at, s.site))
+
+
+def latest_snapshot(site, directories=SNAPSHOT_DIRS):
+    snapshots = find_snapshots(site, directories)
+    return snapshots[-1] if snapshots else None
+
+
+def field(row, site, name):
+    column = FIELDS.get(site, {}).get(name)
+    value = row.get(column) if column else None
+    return None if value in MISSING else value
+
+
+def show_key(row, site):
+    """Stable identity of a show across runs: its link, or its title when there is none."""
+    return field(row, site, "link") or field(row, site, "title")
+
+
+def performances_by_show(snapshot):
+    """``{show key: {"title": ..., "performances": {(date, time), ...}}}`` for one snapshot."""
+    site = snapshot.site
+    shows = {}
+    for row in snapshot.rows():
+        key = show_key(row, site)
+        if not key:
+            continue
+        show = shows.setdefault(key, {"title": field(row, site, "title") or key, "performances": set()})
+        performed_on = parse_date(field(row, site, "date"))
+        if performed_on is not None:
+            show["performances"].add((performed_on, field(row, site, "time") or ""))
+    return shows
+
+
+def upcoming(performances, today=None):
+    today = today or date.today()
+    return {p for p in performances if p[0] >= today}
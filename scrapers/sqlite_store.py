@@ -0,0 +1,218 @@
+"""Embedded SQLite store for scraped performances (``data/scrapes.sqlite``).
+
+Registered as the ``sqlite`` output format (``--formats csv,sqlite``).  Rows
+are normalised into three tables:
+
+* ``venues``       - one row per theatre name
+* ``shows``        - one row per (site, show), with its latest descriptive fields
+* ``performances`` - one row per (show, date, time) with ``first_seen`` / ``last_seen``
+
+The database runs in WAL mode so readers never block the scrapers, and
+writers batch ``BATCH_SIZE`` rows into one short ``BEGIN IMMEDIATE``
+transaction of ``executemany`` upserts, so several scrapers writing at once
+just queue for a few milliseconds (``busy_timeout``).  ``scrapers.queries``
+answers the common questions on top of it.
+"""
+import os
+import json
+import sqlite3
+
+from scrapers import snapshots
+from scrapers.normalize import normalize_row
+
+STORE_DB = os.path.join("data", "scrapes.sqlite")
+BATCH_SIZE = 1000
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS venues (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+        location TEXT
+    );
+    CREATE TABLE IF NOT EXISTS shows (
+        id INTEGER PRIMARY KEY,
+        site TEXT NOT NULL,
+        show_key TEXT NOT NULL,
+        title TEXT,
+        title_key TEXT,
+        link TEXT,
+        production_type TEXT,
+        category TEXT,
+        origin TEXT,
+        market_presence TEXT,
+        age_of_production INTEGER,
+        image_url TEXT,
+        description TEXT,
+        last_seen TEXT,
+        UNIQUE (site, show_key)
+    );
+    CREATE TABLE IF NOT EXISTS performances (
+        id INTEGER PRIMARY KEY,
+        site TEXT NOT NULL,
+        show_id INTEGER NOT NULL REFERENCES shows (id),
+        venue_id INTEGER REFERENCES venues (id),
+        performance_date TEXT NOT NULL,  -- YYYY-MM-DD, '' when the site's date could not be parsed
+        performance_time TEXT NOT NULL,  -- HH:MM, ''
+        status TEXT,
+        extra TEXT,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        UNIQUE (show_id, performance_date, performance_time)
+    );
+    CREATE INDEX IF NOT EXISTS idx_performances_site_show_date ON performances (site, show_id, performance_date);
+    CREATE INDEX IF NOT EXISTS idx_performances_venue_date ON performances (venue_id, performance_date);
+    CREATE INDEX IF NOT EXISTS idx_performances_date ON performances (performance_date);
+    CREATE INDEX IF NOT EXISTS idx_shows_title_key ON shows (title_key);
+"""
+
+SHOW_FIELDS = ("title", "title_key", "link", "production_type", "category", "origin", "market_presence",
+               "age_of_production", "image_url", "description")
+
+
+def connect(path=STORE_DB):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe against corruption in WAL mode
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class SqliteWriter:
+    """Row writer (see ``scrapers.writer``) that upserts into the store in batched transactions.
+
+    ``open_writer`` passes the usual ``data/<site>_<timestamp>.sqlite`` path;
+    the site and timestamp are taken from it and the rows go to
+    ``scrapes.sqlite`` in the same directory.
+    """
+
+    extension = "sqlite"
+
+    def __init__(self, path, columns=None, batch_size=BATCH_SIZE):
+        self.site, self.scraped_at = snapshots.parse_snapshot_name(path.replace(".sqlite", ".csv"))
+        self.db_path = os.path.join(os.path.dirname(path) or ".", os.path.basename(STORE_DB))
+        self.batch_size = batch_size
+        self.seen_at = self.scraped_at.isoformat(timespec="seconds")
+        self._conn = None
+        self._buffer = []
+        self._venue_ids = {}
+        self._show_ids = {}
+
+    @property
+    def path(self):
+        return None  # the database is shared by every run; keeps it out of MultiWriter.paths and the catalog
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self._conn is None:
+            self._conn = connect(self.db_path)
+        typed = [(snapshots.show_key(row, self.site), normalize_row(self.site, row)) for row in self._buffer]
+        self._buffer = []
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._upsert_venues(conn, typed)
+            self._upsert_shows(conn, typed)
+            conn.executemany(
+                """
+                INSERT INTO performances (site, show_id, venue_id, performance_date, performance_time, status,
+                                          extra, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (show_id, performance_date, performance_time) DO UPDATE SET
+                    venue_id = excluded.venue_id, status = excluded.status, extra = excluded.extra,
+                    last_seen = excluded.last_seen
+                """,
+                (
+                    (self.site, self._show_ids[key], self._venue_ids.get(row.get("theatre")),
+                     row["date"].isoformat() if row["date"] else "",
+                     row["time"].strftime("%H:%M") if row["time"] else "",
+                     row.get("status"), json.dumps(row["extra"], ensure_ascii=False) if row["extra"] else None,
+                     self.seen_at, self.seen_at)
+                    for key, row in typed if key
+                ),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _upsert_venues(self, conn, typed):
+        names = {row.get("theatre") for _, row in typed} - self._venue_ids.keys() - {None}
+        if not names:
+            return
+        locations = {row.get("theatre"): row.get("location") for _, row in typed}
+        conn.executemany(
+            "INSERT INTO venues (name, location) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET location = COALESCE(excluded.location, venues.location)",
+            ((name, locations.get(name)) for name in names),
+        )
+        marks = ",".join("?" * len(names))
+        for venue_id, name in conn.execute(f"SELECT id, name FROM venues WHERE name IN ({marks})", list(names)):
+            self._venue_ids[name] = venue_id
+        for name in names - self._venue_ids.keys():  # stored under another case (COLLATE NOCASE)
+            self._venue_ids[name] = conn.execute("SELECT id FROM venues WHERE name = ?", (name,)).fetchone()[0]
+
+    def _upsert_shows(self, conn, typed):
+        latest = {}
+        for key, row in typed:
+            if key:
+                latest[key] = row
+        columns = ", ".join(SHOW_FIELDS)
+        updates = ", ".join(f"{f} = COALESCE(excluded.{f}, shows.{f})" for f in SHOW_FIELDS)
+        conn.executemany(
+            f"INSERT INTO shows (site, show_key, {columns}, last_seen) VALUES (?, ?, {', '.join('?' * len(SHOW_FIELDS))}, ?) "
+            f"ON CONFLICT (site, show_key) DO UPDATE SET {updates}, last_seen = excluded.last_seen",
+            (
+                (self.site, key, *[self._show_value(row, f) for f in SHOW_FIELDS], self.seen_at)
+                for key, row in latest.items()
+            ),
+        )
+        missing = [key for key in latest if key not in self._show_ids]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for show_id, key in conn.execute(
+                f"SELECT id, show_key FROM shows WHERE site = ? AND show_key IN ({marks})", [self.site, *chunk]
+            ):
+                self._show_ids[key] = show_id
+
+    @staticmethod
+    def _show_value(row, name):
+        if name == "title_key":
+            return " ".join((row.get("title") or "").split()).casefold() or None
+        return row.get(name)
+
+    def write_rows(self, rows):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def import_snapshots(site=None, path=STORE_DB):
+    """Load past CSV/NDJSON snapshots into the store, oldest first; returns the row count."""
+    total = 0
+    for snapshot in snapshots.find_snapshots(site):
+        if snapshot.site not in snapshots.FIELDS:
+            continue
+        stamp = snapshot.taken_at.strftime("%Y%m%d_%H%M%S")
+        writer = SqliteWriter(os.path.join(os.path.dirname(path) or ".", f"{snapshot.site}_{stamp}.sqlite"))
+        writer.db_path = path
+        for row in snapshot.rows():
+            writer.write_rows([row])
+            total += 1
+        writer.close()
+    return total
+
+
+def main(args):
+    print(f"{import_snapshots(args.site)} rows loaded into {STORE_DB}")
+    return 0
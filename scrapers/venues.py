@@ -0,0 +1,155 @@
+"""Venues shared by every site and run (``data/venues.sqlite``).
+
+There are only ~40 Broadway houses, yet every show page used to be asked
+for its venue's address and the market worked out from it again.  The
+registry keeps one entry per venue - canonical name, address, market
+presence - found by its link or by its normalized name (``"The Shubert
+Theatre"``, ``"Shubert Theater"`` and ``"Shubert"`` are one venue), so a
+scraper reads the address once and reuses it on every other show, site and
+run until the entry is ``STALE_AFTER`` old::
+
+    registry = default_registry()
+    venue = registry.fresh(name, link)
+    if venue is None:
+        venue = registry.record("broadway", name, link, address=read_address())
+    venue["market_presence"]  # "US" / "UK" / "Unknown"
+
+    python -m scrapers venues list
+"""
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from scrapers.normalize import clean, venue_key
+
+VENUES_DB = os.path.join("data", "venues.sqlite")
+STALE_AFTER = timedelta(days=30)  # re-read a known venue's address after this long
+
+MARKETS = (
+    ("US", re.compile(r"\bNew York\b|\bNY\b|\bN\.Y\.|\bBroadway\b", re.IGNORECASE)),
+    ("UK", re.compile(r"\bLondon\b|\bUK\b|\bUnited Kingdom\b|\bEngland\b", re.IGNORECASE)),
+)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS venues (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        match_key TEXT NOT NULL UNIQUE,
+        address TEXT,
+        market_presence TEXT NOT NULL,
+        refreshed_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS venue_links (
+        link TEXT PRIMARY KEY,
+        venue_id INTEGER NOT NULL REFERENCES venues (id),
+        site TEXT NOT NULL
+    );
+"""
+
+
+def classify_market(address):
+    """``"US"`` / ``"UK"`` / ``"Unknown"`` from a venue's address."""
+    for market, pattern in MARKETS:
+        if address and pattern.search(address):
+            return market
+    return "Unknown"
+
+
+class Registry:
+    def __init__(self, path=VENUES_DB, max_age=STALE_AFTER):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.max_age = max_age
+        self.venues = {}   # id -> venue dict
+        self.keys = {}     # match key -> id
+        self.links = {}    # link -> id
+        self._load()
+
+    def _load(self):
+        for row in self.conn.execute("SELECT * FROM venues"):
+            venue = dict(row)
+            venue["refreshed_at"] = datetime.fromisoformat(venue["refreshed_at"])
+            self.venues[venue["id"]] = venue
+            self.keys[venue["match_key"]] = venue["id"]
+        self.links = dict(self.conn.execute("SELECT link, venue_id FROM venue_links"))
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, name=None, link=None):
+        """The known venue at ``link`` or named ``name`` (None when unknown)."""
+        venue_id = self.links.get(clean(link)) if link else None
+        if venue_id is None:
+            venue_id = self.keys.get(venue_key(name))
+        return self.venues.get(venue_id)
+
+    def fresh(self, name=None, link=None, now=None):
+        """Like ``get`` but None for an entry older than ``max_age`` or without an address."""
+        venue = self.get(name, link)
+        if venue is None or venue["address"] is None:
+            return None
+        if (now or datetime.now()) - venue["refreshed_at"] > self.max_age:
+            return None
+        return venue
+
+    def record(self, site, name, link=None, address=None, now=None):
+        """Add or refresh a venue as ``site`` shows it; returns the stored entry.
+
+        The longer of the known and new names is kept as the canonical one
+        (``"Stephen Sondheim Theatre"`` over ``"Stephen Sondheim"``).
+        """
+        name, link, address = clean(name), clean(link), clean(address)
+        now = (now or datetime.now()).replace(microsecond=0)
+        venue = self.get(name, link)
+        if venue is None:
+            key = venue_key(name)
+            if not key:
+                return None
+            venue = {"id": None, "name": name, "match_key": key, "address": None}
+        elif name and len(name) > len(venue["name"]):
+            venue["name"] = name
+        if address:
+            venue["address"] = " ".join(address.split())
+        venue["market_presence"] = classify_market(venue["address"])
+        venue["refreshed_at"] = now
+        with self.conn:
+            if venue["id"] is None:
+                venue["id"] = self.conn.execute(
+                    "INSERT INTO venues (name, match_key, address, market_presence, refreshed_at) VALUES (?, ?, ?, ?, ?)",
+                    (venue["name"], venue["match_key"], venue["address"], venue["market_presence"], now.isoformat()),
+                ).lastrowid
+            else:
+                self.conn.execute(
+                    "UPDATE venues SET name = ?, address = ?, market_presence = ?, refreshed_at = ? WHERE id = ?",
+                    (venue["name"], venue["address"], venue["market_presence"], now.isoformat(), venue["id"]),
+                )
+            if link and self.links.get(link) != venue["id"]:
+                self.conn.execute("INSERT OR REPLACE INTO venue_links VALUES (?, ?, ?)", (link, venue["id"], site))
+                self.links[link] = venue["id"]
+        self.venues[venue["id"]] = venue
+        self.keys[venue["match_key"]] = venue["id"]
+        return venue
+
+
+@lru_cache(maxsize=None)
+def default_registry():
+    """One registry per process, shared by the scrapers' show-page functions."""
+    return Registry()
+
+
+def main(args):
+    registry = Registry()
+    try:
+        now = datetime.now()
+        for venue in sorted(registry.venues.values(), key=lambda venue: venue["name"].casefold()):
+            stale = " (stale)" if now - venue["refreshed_at"] > registry.max_age else ""
+            links = sum(1 for venue_id in registry.links.values() if venue_id == venue["id"])
+            print(f"{venue['name']:<35} {venue['market_presence']:<8} {venue['address'] or 'N/A':<55} "
+                  f"{links} link(s), refreshed {venue['refreshed_at']:%Y-%m-%d}{stale}")
+    finally:
+        registry.close()
+    return 0
@@ -0,0 +1,444 @@
+"""Lease-based work queue for spreading show pages across processes and hosts.
+
+The list page is scraped once and every show is enqueued as a task; any
+number of workers then lease tasks, keep the lease alive with heartbeats
+while the show is being scraped, and store the show's rows as the task
+result.  A worker that dies mid-show simply stops heartbeating: its lease
+expires and another worker picks the show up (up to ``max_attempts``).
+
+Backends:
+
+* ``SQLiteBackend`` - single host, ``data/workqueue.sqlite`` (WAL mode).
+* ``MongoBackend``  - shared storage for several hosts (``MONGO_URI`` / ``MONGO_DB``, see
+  ``scrapers.mongo_sink``).
+
+Command line (see ``python -m scrapers queue --help``)::
+
+    python -m scrapers queue enqueue --site broadway --queue broadway-0718
+    python -m scrapers queue work    --site broadway --queue broadway-0718   # on every worker
+    python -m scrapers queue collect --site broadway --queue broadway-0718
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import importlib
+import itertools
+import threading
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DB = os.path.join("data", "workqueue.sqlite")
+LEASE_SECONDS = 600
+MAX_ATTEMPTS = 3
+
+# Sites whose modules expose start_driver(), scrape_show_cards(), scrape_show_detail() and COLUMNS
+QUEUE_SITES = ("broadway", "playbill", "ticketmaster")
+
+
+class Task:
+    def __init__(self, id, queue, key, payload, attempts, lease_token):
+        self.id = id
+        self.queue = queue
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+        self.lease_token = lease_token
+
+    def __repr__(self):
+        return f"Task({self.queue!r}, {self.key!r}, attempt {self.attempts})"
+
+
+class QueueBackend(ABC):
+    """Storage interface shared by all backends. ``now`` is a Unix timestamp."""
+
+    @abstractmethod
+    def enqueue(self, queue, items):
+        """Add ``(key, payload)`` pairs; keys already in the queue are left alone."""
+
+    @abstractmethod
+    def lease(self, queue, owner, lease_seconds, max_attempts):
+        """Atomically claim the oldest pending (or lease-expired) task, or return None."""
+
+    @abstractmethod
+    def heartbeat(self, task, lease_seconds):
+        """Extend the lease; False if the lease was lost to another worker."""
+
+    @abstractmethod
+    def complete(self, task, result):
+        """Store the result of a leased task; False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, task, error, max_attempts):
+        """Record the error; the task goes back to pending until its ``max_attempts`` are used up."""
+
+    @abstractmethod
+    def release(self, task):
+        """Give a task back without counting the attempt (e.g. worker shutting down)."""
+
+    @abstractmethod
+    def stats(self, queue):
+        """``{status: task count}`` of the queue."""
+
+    @abstractmethod
+    def results(self, queue):
+        """Yield ``(key, result)`` for completed tasks in enqueue order."""
+
+
+class SQLiteBackend(QueueBackend):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            queue TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_token TEXT,
+            lease_expires REAL,
+            result TEXT,
+            error TEXT,
+            updated_at REAL,
+            UNIQUE (queue, key)
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (queue, status, lease_expires);
+    """
+
+    def __init__(self, path=QUEUE_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # autocommit mode; write transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()  # the heartbeat thread shares this connection
+
+    def _write(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).rowcount
+
+    def enqueue(self, queue, items):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (queue, key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                ((queue, key, json.dumps(payload, ensure_ascii=False), now) for key, payload in items),
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        return added
+
+    def lease(self, queue, owner, lease_seconds, max_attempts):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'failed', error = 'lease expired on final attempt', updated_at = ? "
+                    "WHERE queue = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, queue, now, max_attempts),
+                )
+                row = self.conn.execute(
+                    "SELECT id, key, payload, attempts FROM tasks "
+                    "WHERE queue = ? AND attempts < ? "
+                    "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                    "ORDER BY id LIMIT 1",
+                    (queue, max_attempts, now),
+                ).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                token = uuid.uuid4().hex
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_token = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (owner, token, now + lease_seconds, now, row[0]),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return Task(row[0], queue, row[1], json.loads(row[2]), row[3] + 1, token)
+
+    def heartbeat(self, task, lease_seconds):
+        return self._write(
+            "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (time.time() + lease_seconds, time.time(), task.id, task.lease_token),
+        ) == 1
+
+    def complete(self, task, result):
+        return self._write(
+            "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (json.dumps(result, ensure_ascii=False), time.time(), task.id, task.lease_token),
+        ) == 1
+
+    def fail(self, task, error, max_attempts):
+        status = "failed" if task.attempts >= max_attempts else "pending"
+        return self._write(
+            "UPDATE tasks SET status = ?, error = ?, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (status, error, time.time(), task.id, task.lease_token),
+        ) == 1
+
+    def release(self, task):
+        return self._write(
+            "UPDATE tasks SET status = 'pending', attempts = attempts - 1, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (time.time(), task.id, task.lease_token),
+        ) == 1
+
+    def stats(self, queue):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE queue = ? GROUP BY status", (queue,)
+            ).fetchall()
+        return dict(rows)
+
+    def results(self, queue):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key, result FROM tasks WHERE queue = ? AND status = 'done' ORDER BY id", (queue,)
+            ).fetchall()
+        for key, result in rows:
+            yield key, json.loads(result)
+
+
+class MongoBackend(QueueBackend):
+    def __init__(self, uri=None, database=None, collection="work_queue"):
+        from pymongo import ASCENDING
+
+        from scrapers.mongo_sink import get_database
+
+        self.tasks = get_database(uri, database)[collection]
+        self.tasks.create_index([("queue", ASCENDING), ("key", ASCENDING)], unique=True)
+        self.tasks.create_index([("queue", ASCENDING), ("status", ASCENDING), ("lease_expires", ASCENDING)])
+
+    def enqueue(self, queue, items):
+        from pymongo import UpdateOne
+
+        now = time.time()
+        ops = [
+            UpdateOne(
+                {"queue": queue, "key": key},
+                {"$setOnInsert": {"payload": payload, "status": "pending", "attempts": 0, "created_at": now}},
+                upsert=True,
+            )
+            for key, payload in items
+        ]
+        if not ops:
+            return 0
+        return self.tasks.bulk_write(ops, ordered=False).upserted_count
+
+    def lease(self, queue, owner, lease_seconds, max_attempts):
+        from pymongo import ReturnDocument
+
+        now = time.time()
+        self.tasks.update_many(
+            {"queue": queue, "status": "leased", "lease_expires": {"$lt": now}, "attempts": {"$gte": max_attempts}},
+            {"$set": {"status": "failed", "error": "lease expired on final attempt"}},
+        )
+        token = uuid.uuid4().hex
+        doc = self.tasks.find_one_and_update(
+            {
+                "queue": queue,
+                "attempts": {"$lt": max_attempts},
+                "$or": [{"status": "pending"}, {"status": "leased", "lease_expires": {"$lt": now}}],
+            },
+            {
+                "$set": {"status": "leased", "lease_owner": owner, "lease_token": token,
+                         "lease_expires": now + lease_seconds},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1), ("_id", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return None
+        return Task(doc["_id"], queue, doc["key"], doc["payload"], doc["attempts"], token)
+
+    def _update_leased(self, task, update):
+        result = self.tasks.update_one({"_id": task.id, "lease_token": task.lease_token, "status": "leased"}, update)
+        return result.modified_count == 1
+
+    def heartbeat(self, task, lease_seconds):
+        return self._update_leased(task, {"$set": {"lease_expires": time.time() + lease_seconds}})
+
+    def complete(self, task, result):
+        return self._update_leased(task, {"$set": {"status": "done", "result": result, "lease_expires": None}})
+
+    def fail(self, task, error, max_attempts):
+        status = "failed" if task.attempts >= max_attempts else "pending"
+        return self._update_leased(task, {"$set": {"status": status, "error": error, "lease_expires": None}})
+
+    def release(self, task):
+        return self._update_leased(task, {"$set": {"status": "pending", "lease_expires": None}, "$inc": {"attempts": -1}})
+
+    def stats(self, queue):
+        pipeline = [{"$match": {"queue": queue}}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {row["_id"]: row["count"] for row in self.tasks.aggregate(pipeline)}
+
+    def results(self, queue):
+        for doc in self.tasks.find({"queue": queue, "status": "done"}).sort([("created_at", 1), ("_id", 1)]):
+            yield doc["key"], doc["result"]
+
+
+BACKENDS = {
+    "sqlite": SQLiteBackend,
+    "mongo": MongoBackend,
+}
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Heartbeat:
+    """Background thread that keeps a task's lease alive while it is being worked on."""
+
+    def __init__(self, queue, task):
+        self.queue = queue
+        self.task = task
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            if not self.queue.backend.heartbeat(self.task, self.queue.lease_seconds):
+                logger.warning(f"Lost lease on {self.task}")
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class WorkQueue:
+    def __init__(self, backend, name, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.backend = backend
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def enqueue(self, items):
+        return self.backend.enqueue(self.name, items)
+
+    def lease(self, owner):
+        return self.backend.lease(self.name, owner, self.lease_seconds, self.max_attempts)
+
+    def stats(self):
+        return self.backend.stats(self.name)
+
+    def results(self):
+        return self.backend.results(self.name)
+
+    def drain(self, handler, worker_id=None, poll_seconds=15, stop_on=()):
+        """Lease and process tasks until none are pending or held by live workers.
+
+        ``handler(task)`` returns the task result.  Exceptions fail the task
+        (it is retried until ``max_attempts``); exceptions in ``stop_on`` give
+        the task back untouched and stop this worker.
+        """
+        worker_id = worker_id or default_worker_id()
+        processed = 0
+        while True:
+            task = self.lease(worker_id)
+            if task is None:
+                if self.stats().get("leased"):
+                    # Other workers still hold leases; wait in case one of them dies
+                    time.sleep(poll_seconds)
+                    continue
+                return processed
+
+            with Heartbeat(self, task):
+                try:
+                    result = handler(task)
+                except stop_on:
+                    self.backend.release(task)
+                    raise
+                except Exception as e:
+                    logger.warning(f"{task} failed: {type(e).__name__}: {e}")
+                    self.backend.fail(task, f"{type(e).__name__}: {e}", self.max_attempts)
+                    continue
+
+            if self.backend.complete(task, result):
+                processed += 1
+            else:
+                logger.warning(f"{task} finished after its lease was lost; result discarded")
+
+
+# --- Site glue ---
+def open_queue(args):
+    backend = SQLiteBackend(args.db) if args.backend == "sqlite" else MongoBackend()
+    return WorkQueue(backend, args.queue, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+
+
+def enqueue_site(site, queue):
+    module = importlib.import_module(site)
+    driver = module.start_driver()
+    try:
+        links = module.scrape_show_cards(driver)
+    finally:
+        driver.quit()
+    added = queue.enqueue((item["Link"], item) for item in links)
+    logger.info(f"Enqueued {added} new show(s) of {len(links)} found on {site}")
+    return added
+
+
+def work_site(site, queue, worker_id=None):
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from scrapers.retry import CircuitOpenError
+
+    module = importlib.import_module(site)
+    driver = module.start_driver()
+    wait = WebDriverWait(driver, 10)
+    shows = itertools.count()  # the scrapers number their log lines from this index; task ids may be ObjectIds
+
+    def handle(task):
+        return module.scrape_show_detail(driver, wait, next(shows), task.payload)
+
+    try:
+        return queue.drain(handle, worker_id=worker_id, stop_on=(CircuitOpenError,))
+    finally:
+        driver.quit()
+
+
+def collect_site(site, queue, formats=("csv",)):
+    from scrapers.writer import open_writer
+
+    module = importlib.import_module(site)
+    with open_writer(site, module.COLUMNS, formats) as writer:
+        for _, rows in queue.results():
+            writer.write_rows(rows)
+        # Shows still pending or failed are missing from the file
+        writer.close(complete=set(queue.stats()) <= {"done"})
+    return writer
+
+
+def main(args):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    queue = open_queue(args)
+    if args.action == "enqueue":
+        enqueue_site(args.site, queue)
+    elif args.action == "work":
+        processed = work_site(args.site, queue, worker_id=args.worker_id)
+        logger.info(f"Worker finished after {processed} show(s)")
+    elif args.action == "collect":
+        writer = collect_site(args.site, queue, formats=args.formats)
+        logger.info(f"Collected {writer.rows_written} rows into {', '.join(writer.paths) or 'nothing'}")
+    print(json.dumps(queue.stats(), sort_keys=True))
+    return 0
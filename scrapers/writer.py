@@ -0,0 +1,207 @@
+"""Streaming row writers.
+
+Scrapers hand each show's rows to a writer as soon as the show is done; the
+rows are appended and flushed straight away, so memory stays flat however
+many performances a run collects and a crash still leaves the shows written
+so far on disk.  Repeated performances are dropped on the way in
+(``scrapers.dedup``) and finished files are recorded in the snapshot catalog
+(``scrapers.catalog``).  ``open_writer`` fans one stream out to several formats::
+
+    writer = open_writer("broadway", COLUMNS, formats=("csv", "ndjson"))
+    writer.write_rows(show_rows)
+    ...
+    writer.close()
+"""
+import os
+import csv
+import json
+from datetime import datetime
+
+from scrapers.catalog import SnapshotStats, record_files
+from scrapers.consolidate import record_files as record_consolidated
+from scrapers.dataset import DatasetWriter
+from scrapers.dedup import DedupIndex
+from scrapers.history import record_files as record_history
+from scrapers.mongo_sink import MongoWriter
+from scrapers.normalize import FIELDS
+from scrapers.sqlite_store import SqliteWriter
+
+DATA_DIR = "data"
+NEW_ONLY_DIR = "new"  # under DATA_DIR: new-only extracts, kept apart from the snapshots
+
+
+class CsvWriter:
+    extension = "csv"
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, restval="N/A", extrasaction="ignore",
+                                      lineterminator="\n")  # as the older pandas-written snapshots
+        self._writer.writeheader()
+
+    def write_rows(self, rows):
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class NdjsonWriter:
+    extension = "ndjson"
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.columns = columns
+        self._file = None
+
+    def write_rows(self, rows):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+        for row in rows:
+            if self.columns:
+                row = {col: row.get(col, "N/A") for col in self.columns}
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+# format name -> writer class
+WRITERS = {
+    "csv": CsvWriter,
+    "ndjson": NdjsonWriter,
+    "parquet": DatasetWriter,
+    "mongo": MongoWriter,
+    "sqlite": SqliteWriter,
+}
+
+DEDUP_MODES = ("run", "all", None)
+
+
+class MultiWriter:
+    """Writes every batch of rows to all of its writers in one pass.
+
+    When ``site`` and ``taken_at`` are given, catalog metadata (row and show
+    counts, performance date range) is gathered as the rows go by and the
+    files are recorded in ``catalog_path`` on close, in the history index
+    (``scrapers.history``) under ``history_dir`` and merged into the
+    consolidated performances (``scrapers.consolidate``) in ``consolidate_dir``.
+    A ``new_only`` writer holds a filtered extract, not a snapshot, and is
+    never recorded in any of them.
+    """
+
+    def __init__(self, writers, site=None, taken_at=None, catalog_path=None, dedup=None, new_only=False,
+                 history_dir=None, consolidate_dir=None):
+        self.writers = writers
+        self.rows_written = 0
+        self.duplicates_skipped = 0
+        self.dedup = dedup
+        self.new_only = new_only
+        self.site = site
+        self.taken_at = taken_at
+        self.catalog_path = catalog_path
+        self.history_dir = history_dir
+        self.consolidate_dir = consolidate_dir
+        self.stats = SnapshotStats(site) if site and catalog_path and not new_only else None
+        self._closed = False
+
+    @property
+    def paths(self):
+        return [w.path for w in self.writers if getattr(w, "path", None)]
+
+    def write_rows(self, rows):
+        rows = list(rows)
+        if self.dedup is not None:
+            fresh_in_run, fresh_ever = self.dedup.split(rows)
+            kept = fresh_ever if self.new_only else fresh_in_run
+            self.duplicates_skipped += len(rows) - len(kept)
+            rows = kept
+        if not rows:
+            return
+        for writer in self.writers:
+            writer.write_rows(rows)
+        self.rows_written += len(rows)
+        if self.stats is not None:
+            self.stats.add_rows(rows)
+
+    def close(self, complete=True):
+        """Close every writer and record the files; ``complete=False`` for a run that stopped early."""
+        if self._closed:
+            return
+        self._closed = True
+        for writer in self.writers:
+            writer.close()
+        if self.dedup is not None:
+            self.dedup.commit()
+        if self.stats is not None and self.rows_written:
+            # One catalog entry per run: the file snapshots.find_snapshots reads (CSV, then NDJSON)
+            on_disk = sorted((w for w in self.writers if w.path),
+                             key=lambda w: ("csv", "ndjson", w.extension).index(w.extension))
+            if on_disk:
+                record_files([on_disk[0].path], self.site, self.taken_at, self.stats,
+                             columns=getattr(on_disk[0], "columns", None), catalog_path=self.catalog_path)
+            if self.history_dir and self.site in FIELDS:
+                record_history(self.paths, self.history_dir)
+            if self.consolidate_dir and self.site in FIELDS:
+                record_consolidated(self.paths, self.consolidate_dir, complete=complete)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+
+def open_writer(site, columns, formats=("csv",), timestamp=None, directory=DATA_DIR, dedup="run"):
+    """Writer for ``<directory>/<site>_<timestamp>.<ext>`` in each of ``formats``.
+
+    Files are only created once the first rows arrive, so an empty run leaves
+    nothing behind.  ``dedup`` drops repeated performances: ``"run"`` within
+    this run, ``"all"`` also those written by earlier runs (see
+    ``scrapers.dedup``), ``None`` keeps everything.  With ``"all"`` the file
+    only holds what is new, so it goes to ``<directory>/new/`` instead, where
+    nothing reading snapshots (planner, diff, sitemap discovery) looks, and
+    skips the catalog, history and consolidation hooks.
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode '{dedup}'. Choose from: {', '.join(map(str, DEDUP_MODES))}")
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s): {', '.join(unknown)}. Choose from: {', '.join(WRITERS)}")
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    new_only = dedup == "all"
+    output_dir = os.path.join(directory, NEW_ONLY_DIR) if new_only else directory
+    writers = []
+    for fmt in formats:
+        cls = WRITERS[fmt]
+        writers.append(cls(os.path.join(output_dir, f"{site}_{timestamp}.{cls.extension}"), columns))
+    return MultiWriter(
+        writers,
+        site=site,
+        taken_at=datetime.strptime(timestamp, "%Y%m%d_%H%M%S"),
+        catalog_path=os.path.join(directory, "catalog.sqlite"),
+        # Dedup needs to know where a site keeps title/date/time (e.g. not the price snapshot)
+        dedup=DedupIndex(site, os.path.join(directory, "dedup")) if dedup and site in FIELDS else None,
+        new_only=new_only,
+        history_dir=os.path.join(directory, "history"),
+        consolidate_dir=directory,
+    )
+
+
+def parse_formats(text):
+    """'csv,ndjson' -> ('csv', 'ndjson') for the scrapers' --formats option."""
+    return tuple(fmt.strip() for fmt in text.split(",") if fmt.strip())
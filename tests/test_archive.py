@@ -0,0 +1,23 @@
+from scrapers import snapshots
+from scrapers.archive import Archive
+from scrapers.writer import CsvWriter
+
+COLUMNS = ["Title", "Description", "Date", "Time", "Link"]
+
+
+def test_extract_gives_back_the_original_bytes(tmp_path):
+    source = tmp_path / "broadway_20250718_105404.csv"
+    writer = CsvWriter(str(source), COLUMNS)
+    writer.write_rows([
+        {"Title": "Wicked", "Description": 'The untold story of "the witches" of Oz, in two acts',
+         "Date": f"2025-07-{day}", "Time": time, "Link": "https://www.broadway.com/shows/wicked/"}
+        for day in (19, 20) for time in ("2:00 PM", "7:00 PM")
+    ] + [{"Title": "Hamilton", "Description": "", "Date": "2025-07-19", "Time": "8:00 PM"}])
+    writer.close()
+
+    archive = Archive(str(tmp_path / "archive"))
+    snapshot = snapshots.Snapshot(str(source), *snapshots.parse_snapshot_name(str(source)))
+    archive.add(snapshot)
+    extracted = archive.extract(snapshot.name, str(tmp_path / "extracted.csv"))
+    assert open(extracted, "rb").read() == source.read_bytes()
+    assert b"\r\n" not in source.read_bytes()
@@ -0,0 +1,36 @@
+from datetime import date
+
+from scrapers.catalog import Catalog
+from scrapers.writer import open_writer
+
+COLUMNS = ["Title", "Theatre", "Date", "Time", "Link"]
+
+
+def performance(day, month=8):
+    return {"Title": "Wicked", "Theatre": "Gershwin Theatre", "Date": f"2025-{month:02d}-{day:02d}",
+            "Time": "7:00 PM", "Link": "https://www.broadway.com/shows/wicked/"}
+
+
+def write_run(directory):
+    with open_writer("broadway", COLUMNS, ("csv", "ndjson"), timestamp="20250720_100000", directory=directory) as writer:
+        writer.write_rows([performance(30, month=7), performance(31, month=7), performance(1), performance(15)])
+    return writer
+
+
+def test_runs_with_show_counts_only_dates_in_range(tmp_path):
+    write_run(str(tmp_path))
+    catalog = Catalog(str(tmp_path / "catalog.sqlite"))
+    hit, = catalog.runs_with_show("Wicked", date(2025, 7, 31), date(2025, 8, 1))
+    assert (hit["performances"], hit["first_date"], hit["last_date"]) == (2, "2025-07-31", "2025-08-01")
+    # Performances on both sides of the range, none in it
+    assert catalog.runs_with_show("Wicked", date(2025, 8, 2), date(2025, 8, 14)) == []
+
+
+def test_a_run_saved_in_two_formats_is_cataloged_once(tmp_path):
+    writer = write_run(str(tmp_path))
+    assert len(writer.paths) == 2
+    catalog = Catalog(str(tmp_path / "catalog.sqlite"))
+    assert [entry["format"] for entry in catalog.snapshots()] == ["csv"]
+    catalog.refresh(directories=(str(tmp_path),))
+    assert [entry["format"] for entry in catalog.snapshots()] == ["csv"]
+    assert len(catalog.runs_with_show("Wicked", date(2025, 7, 1), date(2025, 8, 31))) == 1
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+
+from scrapers.dedup import DTYPE, DedupIndex, event_key, hash_event
+from scrapers.writer import open_writer
+
+COLUMNS = ["Show", "Link", "Image url", "Theatre", "Date", "Time", "Location"]
+
+
+def ticketmaster_event(theatre, location, time="7:30 PM"):
+    return {"Show": "Hamilton", "Link": "https://www.ticketmaster.com/hamilton-tickets/artist/1999015",
+            "Image url": "", "Theatre": theatre, "Date": "2025-07-19", "Time": time, "Location": location}
+
+
+def test_same_title_and_time_at_different_venues_are_different_events():
+    chicago = ticketmaster_event("CIBC Theatre", "Chicago, IL")
+    boston = ticketmaster_event("Citizens Bank Opera House", "Boston, MA")
+    assert hash_event("ticketmaster", chicago) != hash_event("ticketmaster", boston)
+    # Venue spelling doesn't split one event in two
+    assert event_key("ticketmaster", chicago) == event_key("ticketmaster", dict(chicago, Theatre="The CIBC Theater"))
+
+
+def test_sites_without_venue_keep_the_plain_key():
+    row = {"title": "Tiny Beautiful Things", "event_url": "x", "date_time": "15 July 2025 - 7:00 pm"}
+    assert event_key("tnny_events", row) == ("tnny_events", "tiny beautiful things", "2025-07-15", "19:00")
+
+
+def test_run_dedup_keeps_both_venues(tmp_path):
+    writer = open_writer("ticketmaster", COLUMNS, timestamp="20250701_100000", directory=str(tmp_path))
+    chicago = ticketmaster_event("CIBC Theatre", "Chicago, IL")
+    writer.write_rows([chicago, ticketmaster_event("Citizens Bank Opera House", "Boston, MA"), dict(chicago)])
+    writer.close()
+    assert writer.rows_written == 2
+    assert writer.duplicates_skipped == 1
+
+
+def test_index_split_drops_repeats_of_one_venue(tmp_path):
+    index = DedupIndex("ticketmaster", str(tmp_path))
+    chicago = ticketmaster_event("CIBC Theatre", "Chicago, IL")
+    fresh, _ = index.split([chicago, dict(chicago, Theatre="CIBC Theater"),
+                            ticketmaster_event("Citizens Bank Opera House", "Boston, MA")])
+    assert [row["Location"] for row in fresh] == ["Chicago, IL", "Boston, MA"]
+
+
+def test_committed_hashes_are_a_sorted_u64_file_seen_by_later_runs(tmp_path):
+    events = [ticketmaster_event("CIBC Theatre", "Chicago, IL", time=time) for time in ("2:00 PM", "7:30 PM", "8:00 PM")]
+    first = DedupIndex("ticketmaster", str(tmp_path))
+    first.split(events[:2])
+    first.commit()
+    stored = np.fromfile(os.path.join(str(tmp_path), "ticketmaster.u64"), dtype=DTYPE)
+    assert len(stored) == 2 and list(stored) == sorted(stored)
+    assert first.pending == set()
+
+    later = DedupIndex("ticketmaster", str(tmp_path))
+    assert list(later.seen_before([hash_event("ticketmaster", row) for row in events])) == [True, True, False]
+    fresh_in_run, fresh_ever = later.split(events[::-1])
+    assert fresh_in_run == events[::-1]
+    assert fresh_ever == [events[2]]
+
+
+def test_commit_merges_hashes_committed_by_another_process(tmp_path):
+    chicago = ticketmaster_event("CIBC Theatre", "Chicago, IL")
+    boston = ticketmaster_event("Citizens Bank Opera House", "Boston, MA")
+    ours, theirs = DedupIndex("ticketmaster", str(tmp_path)), DedupIndex("ticketmaster", str(tmp_path))
+    ours.split([chicago])
+    theirs.split([boston, chicago])
+    theirs.commit()
+    ours.commit()  # must not overwrite what the other index committed meanwhile
+    assert len(DedupIndex("ticketmaster", str(tmp_path))) == 2
+    assert list(ours.seen_before([hash_event("ticketmaster", boston)])) == [True]
+
+
+def test_new_only_writer_emits_events_never_written_before(tmp_path):
+    chicago = ticketmaster_event("CIBC Theatre", "Chicago, IL")
+    boston = ticketmaster_event("Citizens Bank Opera House", "Boston, MA")
+    with open_writer("ticketmaster", COLUMNS, timestamp="20250701_100000", directory=str(tmp_path)) as writer:
+        writer.write_rows([chicago])
+    with open_writer("ticketmaster", COLUMNS, timestamp="20250702_100000", directory=str(tmp_path),
+                     dedup="all") as writer:
+        writer.write_rows([chicago, boston])
+    assert writer.rows_written == 1
+    assert writer.paths == [os.path.join(str(tmp_path), "new", "ticketmaster_20250702_100000.csv")]
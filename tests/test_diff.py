@@ -0,0 +1,59 @@
+import csv
+import json
+
+from scrapers import snapshots
+from scrapers.diff import diff_snapshots
+
+COLUMNS = ["Title", "Theatre", "Date", "Time", "Status"]
+
+
+def write_csv(path, rows, columns=COLUMNS):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    return snapshots.Snapshot(str(path), *snapshots.parse_snapshot_name(str(path)))
+
+
+def row(title, day, time="7:00 PM", status="On sale"):
+    return {"Title": title, "Theatre": "Gershwin Theatre", "Date": f"2025-07-{day:02d}", "Time": time, "Status": status}
+
+
+def summarize(changes):
+    return sorted((c.kind, c.key, tuple(sorted(c.fields))) for c in changes)
+
+
+def test_added_removed_and_changed_rows_across_small_batches(tmp_path):
+    old = write_csv(tmp_path / "broadway_20250717_100000.csv",
+                    [row("Wicked", day) for day in range(1, 29)] + [row("Hamilton", 19, "8:00 PM")])
+    new = write_csv(tmp_path / "broadway_20250718_100000.csv",
+                    [row("Wicked", day, status="Sold out" if day == 12 else "On sale") for day in range(2, 30)]
+                    + [row("  hamilton ", 19, "8pm")])  # same performance, written differently
+
+    changes = summarize(diff_snapshots(old, new, block_size=256))  # several Arrow batches per file
+    assert changes == [
+        ("added", ("broadway", "wicked", "2025-07-29", "19:00"), ()),
+        ("changed", ("broadway", "hamilton", "2025-07-19", "20:00"), ("Time", "Title")),
+        ("changed", ("broadway", "wicked", "2025-07-12", "19:00"), ("Status",)),
+        ("removed", ("broadway", "wicked", "2025-07-01", "19:00"), ()),
+    ]
+
+
+def test_repeated_keys_pair_up_in_order(tmp_path):
+    old = write_csv(tmp_path / "broadway_20250717_100000.csv", [row("Wicked", 19), row("Wicked", 19)])
+    new = write_csv(tmp_path / "broadway_20250718_100000.csv", [row("Wicked", 19)])
+    assert summarize(diff_snapshots(old, new)) == [("removed", ("broadway", "wicked", "2025-07-19", "19:00"), ())]
+
+
+def test_ndjson_with_reordered_columns_compares_on_values(tmp_path):
+    old = write_csv(tmp_path / "broadway_20250717_100000.csv", [row("Wicked", 19), row("Wicked", 20)])
+    path = tmp_path / "broadway_20250718_100000.ndjson"
+    with open(path, "w", encoding="utf-8") as f:
+        for r in (row("Wicked", 19), row("Wicked", 20, status="Sold out")):
+            f.write(json.dumps(dict(reversed(list(r.items())))) + "\n")
+    new = snapshots.Snapshot(str(path), *snapshots.parse_snapshot_name(str(path)))
+
+    change, = diff_snapshots(old, new)
+    assert change.kind == "changed"
+    assert change.fields == {"Status": ("On sale", "Sold out")}
+    assert change.to_dict()["date"] == "2025-07-20"
@@ -0,0 +1,25 @@
+from scrapers.entities import Resolver
+from scrapers.normalize import standardize_title, title_key
+
+
+def test_market_tags_are_not_part_of_the_title():
+    assert title_key("Hamilton (Broadway)") == title_key("Hamilton") == "hamilton"
+    assert title_key("MJ The Musical [NY]") == "mj"
+    assert standardize_title("Wicked (NY)") == "Wicked"
+    assert standardize_title("(Untitled)") == "(Untitled)"
+
+
+def test_ticketmaster_markets_resolve_to_the_known_show(tmp_path):
+    resolver = Resolver(str(tmp_path / "entities.sqlite"))
+    hamilton, _ = resolver.resolve("broadway", "Hamilton")
+    assert resolver.resolve("ticketmaster", "Hamilton (Broadway)") == (hamilton, "Hamilton")
+    assert resolver.resolve("ticketmaster", "Hamilton (Chicago)")[0] == hamilton
+    wicked, _ = resolver.resolve("playbill", "Wicked")
+    assert resolver.match("Hamilton (Broadway)") == hamilton
+    assert resolver.match("  Wicked ") == wicked
+    resolver.close()
+
+    reopened = Resolver(str(tmp_path / "entities.sqlite"))
+    assert reopened.match("Hamilton (Chicago)") == hamilton
+    assert len(reopened.titles) == 2
+    reopened.close()
@@ -0,0 +1,85 @@
+import logging
+from datetime import date
+
+import pytest
+
+from scrapers.dedup import event_key
+from scrapers.expand import expand_schedule, parse_days, parse_range, parse_rules
+
+REFERENCE = date(2025, 6, 20)  # a Friday
+
+
+@pytest.mark.parametrize("text", ["Through June 29", "Now–June 29", "Now - June 29", "Now through June 29",
+                                  "Until June 29", "through June 29, 2025"])
+def test_open_start_runs_from_the_reference_date(text):
+    assert parse_range(text, REFERENCE) == (REFERENCE, date(2025, 6, 29))
+
+
+def test_open_range_already_over_is_not_a_range():
+    assert parse_range("Through June 10", REFERENCE) is None
+
+
+def test_open_start_rows_expand_to_distinct_events(caplog):
+    rules = [{"Name": "Wicked", "Date Range": "Through June 29", "Date": "Tuesday", "Time": "7pm"},
+             {"Name": "Wicked", "Date Range": "Now–June 29", "Date": "Sat", "Time": "2pm"}]
+    with caplog.at_level(logging.WARNING, logger="scrapers.expand"):
+        rows = expand_schedule(rules, reference=REFERENCE)
+    assert [(row["Date"], row["Time"]) for row in rows] == [
+        ("June 24, 2025", "7pm"), ("June 21, 2025", "2pm"), ("June 28, 2025", "2pm"),
+    ]
+    assert len({event_key("playbill", row) for row in rows}) == 3
+    assert caplog.records == []
+
+
+def test_rows_left_unexpanded_are_counted(caplog):
+    rules = [{"Date Range": "June 24–29", "Date": "Tuesday", "Time": "7pm"},
+             {"Date Range": "Opening soon", "Date": "Tuesday", "Time": "7pm"},
+             {"Date Range": "June 24–29", "Date": "Matinees", "Time": "2pm"}]
+    with caplog.at_level(logging.WARNING, logger="scrapers.expand"):
+        rows = expand_schedule(rules, reference=REFERENCE)
+    assert [row["Date"] for row in rows] == ["June 24, 2025", "Tuesday", "Matinees"]
+    assert "2 schedule row(s) not expanded" in caplog.text
+    assert "(unparsed ranges: Opening soon)" in caplog.text
+
+
+def test_parse_rules_repeats_days_for_bare_times():
+    assert parse_rules("Tuesday @ 7pm, Wednesday @ 2pm and 7pm, Thu–Sat @ 8pm") == (
+        ("Tuesday", "7pm"), ("Wednesday", "2pm"), ("Wednesday", "7pm"), ("Thu–Sat", "8pm"),
+    )
+    assert parse_rules("Tuesday, Thursday @ 7pm") == (("Tuesday, Thursday", "7pm"),)
+    assert parse_days("Thu–Sat") == (3, 4, 5)
+    assert parse_days("Sat - Mon") == (5, 6, 0)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("June 24–29", (date(2025, 6, 24), date(2025, 6, 29))),
+    ("June 30 - July 6", (date(2025, 6, 30), date(2025, 7, 6))),
+    ("December 29–January 4", (date(2025, 12, 29), date(2026, 1, 4))),
+    ("Dec 29, 2025–Jan 4, 2026", (date(2025, 12, 29), date(2026, 1, 4))),
+    ("January 5–11", (date(2025, 1, 5), date(2025, 1, 11))),  # within LOOKBACK: this year's
+    ("June 31–July 2", None),
+    ("Tickets on sale", None),
+])
+def test_parse_range(text, expected):
+    assert parse_range(text, REFERENCE) == expected
+
+
+def test_every_week_of_a_long_range_is_expanded_in_date_order():
+    rules = [{"Date Range": "June 30–August 3", "Date": "Tuesday", "Time": "7pm"},
+             {"Date Range": "June 30–August 3", "Date": "Wednesday", "Time": "2pm"},
+             {"Date Range": "June 30–August 3", "Date": "Wednesday", "Time": "7pm"},
+             {"Date Range": "June 30–August 3", "Date": "Thu–Sat", "Time": "8pm"}]
+    rows = expand_schedule(rules, reference=REFERENCE)
+    assert len(rows) == 5 * 6  # five weeks, six performances a week
+    assert [(row["Date"], row["Time"]) for row in rows[:4]] == [
+        ("July 01, 2025", "7pm"), ("July 02, 2025", "2pm"), ("July 02, 2025", "7pm"), ("July 03, 2025", "8pm"),
+    ]
+    assert rows[-1] == {"Date Range": "June 30–August 3", "Date": "August 02, 2025", "Time": "8pm"}
+
+
+def test_ranges_across_the_year_end_and_custom_columns():
+    rows = expand_schedule([{"Run": "December 29–January 4", "Day": "Fri", "Time": "8pm"}],
+                           date_range="Run", day="Day", reference=date(2025, 12, 1), date_format="%Y-%m-%d")
+    assert [row["Day"] for row in rows] == ["2026-01-02"]
+    assert parse_range("January 5–11", date(2025, 12, 1)) == (date(2026, 1, 5), date(2026, 1, 11))
+    assert expand_schedule([], reference=REFERENCE) == []
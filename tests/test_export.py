@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pandas as pd
+
+from scrapers.export import benchmark, parse_dates, parse_times, prepare
+
+COLUMNS = ["Title", "Theatre", "Date", "Time", "Status"]
+NOW = datetime(2025, 7, 19, 19, 58)
+
+
+def test_text_is_cleaned_and_missing_values_unified():
+    rows = prepare("broadway", [{"Title": "  Wicked\n ", "Theatre": "N/A", "Date": "2025-07-19", "Time": ""},
+                                {"Title": "Hamilton", "Date": None, "Extra": "dropped"}], COLUMNS)
+    assert rows == [
+        {"Title": "Wicked", "Theatre": "N/A", "Date": "2025-07-19", "Time": "N/A", "Status": "N/A"},
+        {"Title": "Hamilton", "Theatre": "N/A", "Date": "N/A", "Time": "N/A", "Status": "N/A"},
+    ]
+    assert prepare("broadway", [], COLUMNS) == []
+
+
+def test_status_by_date_against_one_now():
+    rows = prepare("broadway", [{"Title": "Wicked", "Date": day} for day in
+                                ("2025-07-18", "2025-07-19", "July 20, 2025", "someday")], COLUMNS,
+                   now=NOW, status="date", date_format="%Y-%m-%d")
+    assert [(row["Date"], row["Status"]) for row in rows] == [
+        ("2025-07-18", "closed"), ("2025-07-19", "active"), ("2025-07-20", "upcoming"), ("someday", "N/A"),
+    ]
+
+
+def test_status_by_date_and_time_for_tnny():
+    columns = ["title", "date_time", "status"]
+    rows = prepare("tnny_events", [{"title": "Tiny Beautiful Things", "date_time": f"19 July 2025 - {time}"}
+                                   for time in ("2:00 pm", "8:00 pm", "9:30 pm")], columns, now=NOW, status="datetime")
+    assert [row["status"] for row in rows] == ["closed", "active", "upcoming"]
+
+
+def test_parsers_work_per_distinct_value():
+    dates = parse_dates(pd.Series(["Saturday, Jul 19th", None, "Saturday, Jul 19th"], dtype=object),
+                        formats=("%A, %b %d",), year=2025)
+    assert dates.dt.strftime("%Y-%m-%d").tolist()[::2] == ["2025-07-19", "2025-07-19"] and pd.isna(dates[1])
+    times = parse_times(pd.Series(["8:00pm", "7pm", "19:30", "noon", "12:15 am"], dtype=object))
+    assert [None if pd.isna(t) else int(t.total_seconds() // 60) for t in times] == [1200, 1140, 1170, None, 15]
+
+
+def test_benchmark_output_matches_the_row_by_row_rules():
+    _, _, out = benchmark(500)
+    assert len(out) == 500
+    assert out["Title"].str.match(r"^Show \d+$").all()
+    assert set(out["Status"]) <= {"closed", "active", "upcoming"}
+    assert (out.loc[out["Date"] < "2025-10-01", "Status"] == "closed").all()
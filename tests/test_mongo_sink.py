@@ -0,0 +1,142 @@
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from scrapers.dedup import hash_event
+from scrapers.mongo_sink import DEFAULT_URI, MongoWriter, ensure_indexes
+
+COLUMNS = ["Title", "Theatre", "Date", "Time", "Link"]
+SCRAPED_AT = datetime(2025, 7, 1, 10, 0)
+
+
+class Result:
+    def __init__(self, upserted_count, modified_count=0):
+        self.upserted_count = upserted_count
+        self.modified_count = modified_count
+
+
+class RecordingCollection:
+    """Stands in for a pymongo collection: keeps every bulk_write call."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def bulk_write(self, ops, ordered=True):
+        self.calls.append((list(ops), ordered))
+        if self.error is not None:
+            raise self.error
+        return Result(len(ops))
+
+
+def performance(day, time="7:00 PM", title="Wicked"):
+    return {"Title": title, "Theatre": "Gershwin Theatre", "Date": f"2025-07-{day:02d}", "Time": time,
+            "Link": "https://www.broadway.com/shows/wicked/"}
+
+
+def open_mongo_writer(collection, batch_size):
+    return MongoWriter("data/broadway_20250701_100000.mongo", COLUMNS, collection=collection, batch_size=batch_size)
+
+
+def test_rows_are_flushed_in_unordered_batches():
+    collection = RecordingCollection()
+    writer = open_mongo_writer(collection, batch_size=2)
+    writer.write_rows([performance(19), performance(20), performance(21)])
+    assert [len(ops) for ops, _ in collection.calls] == [2]  # the third row waits for a full batch
+    writer.write_rows([performance(22), performance(23)])
+    writer.close()
+    assert [len(ops) for ops, _ in collection.calls] == [2, 2, 1]
+    assert all(ordered is False for _, ordered in collection.calls)
+    assert writer.upserted == 5
+
+
+def test_upserts_are_keyed_on_site_and_event_id():
+    collection = RecordingCollection()
+    writer = open_mongo_writer(collection, batch_size=10)
+    row = performance(19, time="2:00 PM")
+    writer.write_rows([row, dict(row, Theatre="Gershwin")])  # same performance, scraped twice
+    writer.close()
+
+    (ops, _), = collection.calls
+    event_id = f"{hash_event('broadway', row):016x}"
+    assert [op._filter for op in ops] == [{"site": "broadway", "event_id": event_id}] * 2
+    assert ops[0] == UpdateOne(
+        {"site": "broadway", "event_id": event_id},
+        {
+            "$set": {
+                "site": "broadway",
+                "title": "Wicked",
+                "title_key": "wicked",
+                "performance_date": datetime(2025, 7, 19),
+                "performance_time": "14:00",
+                "data": row,
+                "last_seen": SCRAPED_AT,
+            },
+            "$setOnInsert": {"first_seen": SCRAPED_AT},
+        },
+        upsert=True,
+    )
+
+
+def test_partial_bulk_failure_is_counted_not_raised():
+    error = BulkWriteError({"writeErrors": [{"index": 0}], "nUpserted": 1, "nModified": 0})
+    writer = open_mongo_writer(RecordingCollection(error), batch_size=10)
+    writer.write_rows([performance(19), performance(20)])
+    writer.close()
+    assert writer.upserted == 1
+
+
+def test_nothing_written_without_rows():
+    collection = RecordingCollection()
+    open_mongo_writer(collection, batch_size=10).close()
+    assert collection.calls == []
+
+
+# --- against a real server (MONGO_URI, default localhost); skipped when none answers ---
+@pytest.fixture
+def live_collection():
+    client = MongoClient(os.getenv("MONGO_URI", DEFAULT_URI), serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip("no MongoDB server reachable")
+    name = f"scrapers_test_{uuid.uuid4().hex[:8]}"
+    collection = client[name]["performances"]
+    ensure_indexes(collection)
+    yield collection
+    client.drop_database(name)
+    client.close()
+
+
+def test_live_rescrape_updates_instead_of_duplicating(live_collection):
+    unique = [index for index in live_collection.index_information().values() if index.get("unique")]
+    assert [index["key"] for index in unique] == [[("site", 1), ("event_id", 1)]]
+
+    first = MongoWriter("data/broadway_20250701_100000.mongo", COLUMNS, collection=live_collection, batch_size=2)
+    first.write_rows([performance(19), performance(20), performance(21)])
+    first.close()
+    again = MongoWriter("data/broadway_20250702_100000.mongo", COLUMNS, collection=live_collection, batch_size=2)
+    again.write_rows([performance(20), performance(21)])
+    again.close()
+
+    assert (first.upserted, again.upserted, again.modified) == (3, 0, 2)
+    assert live_collection.count_documents({}) == 3
+    doc = live_collection.find_one({"performance_date": datetime(2025, 7, 20)})
+    assert (doc["first_seen"], doc["last_seen"]) == (SCRAPED_AT, datetime(2025, 7, 2, 10, 0))
+
+
+def test_live_unordered_batch_keeps_the_rows_that_did_not_fail(live_collection):
+    # A stricter index than the sink's: one performance per title and time, whatever the venue
+    live_collection.create_index([("title_key", ASCENDING), ("performance_date", ASCENDING),
+                                  ("performance_time", ASCENDING)], unique=True)
+    writer = MongoWriter("data/broadway_20250701_100000.mongo", COLUMNS, collection=live_collection, batch_size=10)
+    writer.write_rows([performance(19), dict(performance(19), Theatre="Minskoff Theatre"), performance(20)])
+    writer.close()  # the duplicate fails; the batch is not aborted at it
+
+    assert writer.upserted == 2
+    assert sorted(doc["performance_date"].day for doc in live_collection.find()) == [19, 20]
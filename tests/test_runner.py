@@ -0,0 +1,65 @@
+import sys
+import logging
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scrapers import runner, scheduler
+
+# A scraper module as the real ones are written: basicConfig at import, emoji-tagged INFO lines
+FAKE_SCRAPER = '''
+import os
+import logging
+
+log_file = os.path.join(os.path.dirname(__file__), "log", "scrape.log")
+os.makedirs(os.path.dirname(log_file), exist_ok=True)
+logging.basicConfig(filename=log_file, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def log_and_print(message):
+    print(message)
+    logging.info(message)
+
+
+def scrape_shows():
+    log_and_print("📌 Finished scraping Wicked with 12 schedule entries.")
+    log_and_print("❌ Error visiting detail page for Hamilton: timeout")
+    log_and_print("🚫 Error scraping show Hadestown: no calendar")
+    return 12
+'''
+
+
+@pytest.fixture
+def fake_site(tmp_path, monkeypatch):
+    (tmp_path / "fake_scraper.py").write_text(FAKE_SCRAPER, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(runner, "ROOT", str(tmp_path))
+    monkeypatch.setitem(runner.SITES, "fake", ("fake_scraper", "scrape_shows"))
+    # A handler left on the root logger (as in a warm pool worker) turns the module's basicConfig into a no-op
+    leftover = logging.NullHandler()
+    logging.getLogger().addHandler(leftover)
+    yield tmp_path
+    logging.getLogger().removeHandler(leftover)
+    sys.modules.pop("fake_scraper", None)
+
+
+def test_run_site_counts_logged_errors_and_writes_the_log(fake_site):
+    result = runner.run_site("fake")
+    assert result["failure"] is None
+    assert result["rows"] == 12
+    assert result["errors"] == 2
+    log = (fake_site / "log" / "scrape.log").read_text()
+    assert "❌ Error visiting detail page for Hamilton" in log
+    assert "📌 Finished scraping Wicked" in log
+
+
+def test_scheduler_records_the_errors_of_a_run(fake_site, monkeypatch):
+    monkeypatch.setattr(runner, "make_pool", lambda *args, **kwargs: ThreadPoolExecutor(1))
+    daemon = scheduler.SiteScheduler({"fake": timedelta(hours=6)}, state_path=str(fake_site / "state.json"))
+    daemon.trigger("fake")
+    daemon.pool.shutdown(wait=True)
+    state = scheduler.load_state(str(fake_site / "state.json"))["fake"]
+    assert state["last_status"] == "ok"
+    assert state["last_rows"] == 12
+    assert state["last_errors"] == 2
@@ -0,0 +1,61 @@
+import csv
+import json
+import os
+from datetime import datetime, timezone
+
+from scrapers import sitemap
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+INDEX = os.path.join(FIXTURES, "sitemap_index.xml")
+
+WICKED = "https://playbill.com/production/wicked-gershwin-theatre-vault-0000000123"
+HAMILTON = "https://playbill.com/production/hamilton-richard-rodgers-theatre-vault-0000014375"
+NEW_SHOW = "https://playbill.com/production/maybe-happy-ending-belasco-theatre-broadway-2024"
+CHICAGO = "https://playbill.com/production/chicago-ambassador-theatre-vault-0000000456"
+
+
+def card(link, row):
+    return {"Link": link, "Name": row["Name"] if row else None}
+
+
+def write_snapshot(directory, links):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "playbill_20250620_100000.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Name", "Link", "Date", "Time"])
+        writer.writeheader()
+        for link in links:
+            writer.writerow({"Name": link.rsplit("/", 1)[1], "Link": link, "Date": "July 19, 2025", "Time": "7:00 PM"})
+
+
+def test_iter_entries_follows_the_index_and_skips_unchanged_children():
+    entries = dict(sitemap.iter_entries(INDEX))
+    assert len(entries) == 6
+    assert entries[WICKED] == "2025-07-01T09:00:00Z"
+    assert "https://playbill.com/person/cynthia-erivo-vault-0000081818" in entries
+
+    since = datetime(2025, 6, 15, tzinfo=timezone.utc)
+    assert not any("/person/" in loc for loc, _ in sitemap.iter_entries(INDEX, since=since))
+
+
+def test_failed_shows_keep_their_lastmod_and_are_retried(tmp_path):
+    data, state_dir = str(tmp_path / "data"), str(tmp_path / "sitemaps")
+    write_snapshot(data, [WICKED, HAMILTON, CHICAGO])
+    os.makedirs(state_dir)
+    with open(os.path.join(state_dir, "playbill.json"), "w", encoding="utf-8") as f:
+        json.dump({"checked_at": "2025-06-20T10:00:00+00:00",
+                   "lastmod": {WICKED: "2025-06-01", HAMILTON: "2025-06-01"}}, f)
+    options = dict(source=INDEX, directories=(data,), state_dir=state_dir, plan_dir=str(tmp_path / "plans"))
+
+    discovery = sitemap.discover("playbill", card, now=datetime(2025, 7, 2, 10, 0), **options)
+    assert {item["Link"] for item in discovery.plan.selected} == {WICKED, NEW_SHOW, CHICAGO}
+    assert [item["Link"] for item in discovery.plan.skipped] == [HAMILTON]
+
+    discovery.save(crawled={WICKED, CHICAGO})  # the new show's crawl failed
+    state = sitemap.SitemapState("playbill", state_dir)
+    assert state.lastmod == {WICKED: "2025-07-01T09:00:00Z", HAMILTON: "2025-06-01"}
+    assert state.retry == [NEW_SHOW]
+    assert state.uncovered == {CHICAGO: 0}
+
+    # Not in the snapshot and older than the last run, but still crawled again
+    retried = sitemap.discover("playbill", card, now=datetime(2025, 7, 3, 10, 0), **options)
+    assert NEW_SHOW in {item["Link"] for item in retried.plan.selected}
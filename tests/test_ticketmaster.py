@@ -0,0 +1,64 @@
+import os
+import json
+from datetime import date
+
+from bs4 import BeautifulSoup
+
+import ticketmaster
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "ticketmaster_structured.json")
+
+
+def load_fixture():
+    with open(FIXTURE, encoding="utf-8") as f:
+        page = json.load(f)
+    # What STRUCTURED_DATA_JS returns: the text of each JSON-LD script, then __NEXT_DATA__
+    return page["entry"], [json.dumps(page["ld_json"]), json.dumps(page["next_data"])]
+
+
+def test_structured_events_keep_only_the_show():
+    entry, blocks = load_fixture()
+    rows = ticketmaster.structured_events(blocks, entry)
+    assert [(row["Date"], row["Time"], row["Theatre"]) for row in rows] == [
+        ("2025-07-19", "2:00 PM", "Gershwin Theatre"),
+        ("2025-07-20", "7:00 PM", "Gershwin Theatre"),
+    ]
+    assert {row["Show"] for row in rows} == {"Wicked"}
+    assert all(row["Location"] == "New York, NY" for row in rows)
+
+
+def test_foreign_events_are_not_attributed():
+    entry, blocks = load_fixture()
+    rows = ticketmaster.structured_events(blocks, {**entry, "Name": "Hamilton",
+                                                   "Link": "https://www.ticketmaster.com/hamilton-tickets/artist/1999015"})
+    assert [(row["Date"], row["Theatre"]) for row in rows] == [("2025-07-19", "Richard Rodgers Theatre")]
+
+
+def test_event_matched_by_attraction_id_in_link():
+    entry, _ = load_fixture()
+    event = {"dates": {"start": {"localDate": "2025-07-20"}},
+             "_embedded": {"attractions": [{"id": "K8vZ917G1V0", "legacyId": 805926, "name": "Wicked: The Musical"}]}}
+    assert ticketmaster.is_show_event(event, {**entry, "Name": "N/A"})
+    assert not ticketmaster.is_show_event(event, {**entry, "Name": "N/A",
+                                                  "Link": "https://www.ticketmaster.com/hamilton-tickets/artist/1999015"})
+
+
+def listing_item(day, time, theatre="Gershwin Theatre"):
+    """A "More Events" listing ``li`` as the html and drain modes parse it."""
+    markup = (f'<li class="sc-a4c9d98c-1 gmqiju"><div class="sc-d4c18b64-0 kViXXz">{day}</div>'
+              f'<span class="sc-5ae165d4-1 xHFfV">{time}</span>'
+              f'<span class="sc-cce7ae2b-8 eHUDaT">New York, NY</span><span class="sc-cce7ae2b-8 eHUDaT">{theatre}</span></li>')
+    return BeautifulSoup(markup, "lxml").find("li")
+
+
+def test_listing_and_structured_rows_share_one_format():
+    entry, blocks = load_fixture()
+    listing = [ticketmaster.parse_event(listing_item(day, time), entry, today=date(2025, 7, 1))
+               for day, time in (("Sat • Jul 19", "2:00 PM"), ("Sun • Jul 20", "7:00pm"))]
+    assert ticketmaster.structured_events(blocks, entry) == listing
+
+
+def test_listing_dates_without_a_year_are_never_in_the_past():
+    assert ticketmaster.event_date("Fri • Jan 9", today=date(2025, 12, 20)) == "2026-01-09"
+    assert ticketmaster.event_date("JUL 19 2025", today=date(2025, 12, 20)) == "2025-07-19"
+    assert ticketmaster.event_time("19:00:00") == "7:00 PM"
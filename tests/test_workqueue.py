@@ -0,0 +1,86 @@
+import pytest
+
+from scrapers.workqueue import SQLiteBackend, WorkQueue
+
+SHOWS = [("https://www.broadway.com/shows/wicked/", {"Title": "Wicked"}),
+         ("https://www.broadway.com/shows/hamilton/", {"Title": "Hamilton"})]
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / "workqueue.sqlite"))
+
+
+def test_tasks_are_leased_once_in_enqueue_order(backend):
+    queue = WorkQueue(backend, "broadway-0718")
+    assert queue.enqueue(SHOWS) == 2
+    assert queue.enqueue(SHOWS[:1]) == 0  # already queued
+
+    first, second = queue.lease("worker-a"), queue.lease("worker-b")
+    assert (first.key, first.payload, first.attempts) == (SHOWS[0][0], {"Title": "Wicked"}, 1)
+    assert second.key == SHOWS[1][0]
+    assert queue.lease("worker-c") is None
+    assert queue.stats() == {"leased": 2}
+
+    assert backend.complete(second, [{"Title": "Hamilton", "Date": "2025-07-19"}])
+    assert backend.complete(first, [])
+    assert list(queue.results()) == [(SHOWS[0][0], []), (SHOWS[1][0], [{"Title": "Hamilton", "Date": "2025-07-19"}])]
+
+
+def test_an_expired_lease_is_taken_over_and_the_old_holder_locked_out(backend):
+    queue = WorkQueue(backend, "broadway-0718", lease_seconds=-1)  # every lease is already expired
+    queue.enqueue(SHOWS[:1])
+    stale = queue.lease("dead-worker")
+    fresh = queue.lease("worker-b")
+    assert fresh.key == stale.key and fresh.attempts == 2
+
+    assert not backend.heartbeat(stale, 600)
+    assert not backend.complete(stale, [{"Title": "Wicked"}])
+    assert backend.complete(fresh, [])
+    assert queue.stats() == {"done": 1}
+
+
+def test_a_task_fails_for_good_after_max_attempts(backend):
+    queue = WorkQueue(backend, "broadway-0718", max_attempts=2)
+    queue.enqueue(SHOWS[:1])
+    task = queue.lease("worker-a")
+    assert backend.fail(task, "TimeoutException: no calendar", queue.max_attempts)
+    assert queue.stats() == {"pending": 1}
+
+    task = queue.lease("worker-a")
+    assert task.attempts == 2
+    backend.fail(task, "TimeoutException: no calendar", queue.max_attempts)
+    assert queue.stats() == {"failed": 1}
+    assert queue.lease("worker-a") is None
+
+
+def test_expiry_on_the_last_attempt_fails_the_task(backend):
+    queue = WorkQueue(backend, "broadway-0718", lease_seconds=-1, max_attempts=1)
+    queue.enqueue(SHOWS[:1])
+    assert queue.lease("dead-worker") is not None
+    assert queue.lease("worker-b") is None
+    assert queue.stats() == {"failed": 1}
+
+
+def test_a_released_task_keeps_its_attempts(backend):
+    queue = WorkQueue(backend, "broadway-0718", max_attempts=1)
+    queue.enqueue(SHOWS[:1])
+    assert backend.release(queue.lease("worker-a"))
+    assert queue.lease("worker-b").attempts == 1
+
+
+def test_drain_retries_failures_and_stores_results(backend):
+    queue = WorkQueue(backend, "broadway-0718", max_attempts=2)
+    queue.enqueue(SHOWS)
+    calls = []
+
+    def handler(task):
+        calls.append(task.key)
+        if task.payload["Title"] == "Hamilton":
+            raise RuntimeError("calendar did not load")
+        return [{"Title": task.payload["Title"]}]
+
+    assert queue.drain(handler, worker_id="worker-a") == 1
+    assert calls == [SHOWS[0][0], SHOWS[1][0], SHOWS[1][0]]
+    assert queue.stats() == {"done": 1, "failed": 1}
+    assert list(queue.results()) == [(SHOWS[0][0], [{"Title": "Wicked"}])]
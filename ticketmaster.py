@@ -1,10 +1,11 @@
 import os
-import time
+import re
 import json
-import hashlib
+import time
+import argparse
 import logging
-import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
+from urllib.parse import urlsplit
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
@@ -14,11 +15,16 @@ from webdriver_manager.chrome import ChromeDriverManager
 import undetected_chromedriver as uc
 from bs4 import BeautifulSoup
 import random
+from scrapers.checkpoint import Checkpoint
+from scrapers.normalize import parse_date, parse_time, title_key
+from scrapers.retry import CircuitOpenError, get_page
+from scrapers.writer import open_writer, parse_formats
 
 # --- Configuration ---
 # Set to True to run the browser without a visible GUI.
 # Set to False to see the browser window during scraping.
 RUN_HEADLESS = True  # <--- Change this to True or False
+COLUMNS = ["Show", "Link", "Image url", "Theatre", "Date", "Time", "Location"]
 
 # --- Setup logging ---
 if not os.path.exists("log"):
@@ -37,16 +43,8 @@ def log_and_print(message):
     logging.info(message)
 
 
-# --- Hash function for (potential) deduplication ---
-def hash_event(event):
-    return hashlib.md5(json.dumps(event, sort_keys=True).encode()).hexdigest()
-
-
-# --- Scraper Logic ---
-def scrape_shows():  # No longer takes 'headless_mode' as an argument
-    start_time = datetime.now()
-    log_and_print(f"🚀 Scraping started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-
+# --- Browser Setup ---
+def build_options():
     options = webdriver.ChromeOptions()
     if RUN_HEADLESS:  # Uses the global RUN_HEADLESS variable
         options.add_argument("--headless=new")
@@ -56,141 +54,455 @@ def scrape_shows():  # No longer takes 'headless_mode' as an argument
     options.add_argument(
         "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.5845.188 Safari/537.36"
     )
+    return options
+
+
+def start_driver():
+    return uc.Chrome(options=build_options())
+
+
+# --- Show List Page ---
+def scrape_show_cards(driver):
+    """Collect name, link and image from every show card on the Broadway category page."""
+    get_page(driver, "https://www.ticketmaster.com/broadway")
+    log_and_print("🌐 Navigated to Broadway Ticketmaster page.")
+    time.sleep(random.uniform(2, 4))
+
+    soup = BeautifulSoup(driver.page_source, "lxml")
+    cards = soup.find_all("div", class_="card item ny-category-musicals ny")
+    log_and_print(f"📦 Found {len(cards)} show cards on the main page.")
+
+    links = []
+    for i, item in enumerate(cards):
+        name = item.find("h3").text.strip() if item.find("h3") else "N/A"
+        link = item.find("a")["href"] if item.find("a") else ""
+        img = item.find("img")["src"] if item.find("img") else ""
+        if link:
+            links.append({"Name": name, "Link": link, "Image url": img})
+            log_and_print(f"🔗 [{i+1}] Found show: {name} - {link}")
+
+    return links
+
+
+# --- Show Detail Page ---
+EVENT_SELECTOR = "li.sc-a4c9d98c-1.gmqiju"
+
+# Markup of the event items from index arguments[1] on, plus how many there are in total
+NEW_EVENTS_JS = """
+const items = document.querySelectorAll(arguments[0]);
+return [items.length, Array.from(items).slice(arguments[1]).map(item => item.outerHTML)];
+"""
+COUNT_EVENTS_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+
+def new_event_items(driver, seen):
+    """``(total, [li tags])`` for the event items added after the first ``seen`` ones."""
+    total, markup = driver.execute_script(NEW_EVENTS_JS, EVENT_SELECTOR, seen)
+    if not markup:
+        return total, []
+    soup = BeautifulSoup("".join(markup), "lxml")
+    return total, soup.find_all("li", class_="sc-a4c9d98c-1 gmqiju")
+
+
+# "Sat • Jul 19", "JUL 19 2025", "July 19, 2025"
+MONTH_DAY_RE = re.compile(r"\b([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{1,2})\b(?:,?\s*(\d{4})\b)?")
+
+
+def event_date(text, today=None):
+    """An event's date as ``YYYY-MM-DD``, whichever way the page gave it: ISO from the structured
+    data, or listing text like ``Sat • Jul 19`` (no year: the first one not before ``today``).
+    Anything else is returned as it is."""
+    text = (text or "").strip()
+    parsed = parse_date(text)
+    if parsed is not None:
+        return parsed.isoformat()
+    today = today or date.today()
+    for match in MONTH_DAY_RE.finditer(text):
+        month, day, year = match.groups()
+        try:
+            parsed = datetime.strptime(f"{month[:3]} {day} {year or today.year}", "%b %d %Y").date()
+        except ValueError:
+            continue
+        if year is None and parsed < today:
+            parsed = date(today.year + 1, parsed.month, parsed.day) if (parsed.month, parsed.day) != (2, 29) else parsed
+        return parsed.isoformat()
+    return text
+
+
+def event_time(text):
+    """An event's start as ``7:00 PM`` from ``19:00`` / ``19:00:00`` / ``7:00pm``; anything else as it is."""
+    text = (text or "").strip()
+    parsed = parse_time(text)
+    return parsed.strftime("%I:%M %p").lstrip("0") if parsed is not None else text
+
+
+def parse_event(event, entry, today=None):
+    """One listing ``li`` -> output row."""
+    date = event.find("div", class_="sc-d4c18b64-0 kViXXz")
+    time_ = event.find("span", class_="sc-5ae165d4-1 xHFfV")
+    span_tags = event.find_all(
+        "span", class_="sc-cce7ae2b-8 eHUDaT"
+    )
+    thea = span_tags[-1] if len(span_tags) > 0 else None
+    loc = span_tags[-2] if len(span_tags) > 1 else None
+
+    return {
+        "Show": entry["Name"],
+        "Link": entry["Link"],
+        "Image url": entry["Image url"],
+        "Theatre": thea.text.strip() if thea else "",
+        "Date": event_date(date.text if date else "", today),
+        "Time": event_time(time_.text if time_ else ""),
+        "Location": loc.text.strip() if loc else "",
+    }
+
+
+# Clicks "More Events" until it is gone, each time waiting (MutationObserver) for the list to
+# grow rather than sleeping; calls back with [clicks, items in the list, error or null]
+DRAIN_EVENTS_JS = """
+const [selector, maxClicks, stepTimeout, done] = arguments;
+const count = () => document.querySelectorAll(selector).length;
+const moreButton = () => {
+    const label = Array.from(document.querySelectorAll("button span")).find(s => s.textContent.trim() === "More Events");
+    const button = label && label.closest("button");
+    return button && !button.disabled ? button : null;
+};
+const grown = before => new Promise(resolve => {
+    if (count() > before) return resolve(true);
+    const timer = setTimeout(() => { observer.disconnect(); resolve(false); }, stepTimeout);
+    const observer = new MutationObserver(() => {
+        if (count() > before) { observer.disconnect(); clearTimeout(timer); resolve(true); }
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+});
+(async () => {
+    let clicks = 0;
+    try {
+        for (let button = moreButton(); button && clicks < maxClicks; button = moreButton()) {
+            const before = count();
+            button.scrollIntoView({block: "center"});
+            button.click();
+            clicks++;
+            if (!(await grown(before))) break;
+        }
+        done([clicks, count(), null]);
+    } catch (e) {
+        done([clicks, count(), String(e)]);
+    }
+})();
+"""
+DRAIN_MAX_CLICKS = 200
+DRAIN_STEP_TIMEOUT = 10  # seconds for one click to add events
+
+
+def drain_more_events(driver):
+    """Load the whole event listing with one in-page loop; returns ``(clicks, items)``."""
+    driver.set_script_timeout(DRAIN_MAX_CLICKS * DRAIN_STEP_TIMEOUT + 30)
+    clicks, total, error = driver.execute_async_script(
+        DRAIN_EVENTS_JS, EVENT_SELECTOR, DRAIN_MAX_CLICKS, DRAIN_STEP_TIMEOUT * 1000
+    )
+    if error:
+        raise RuntimeError(f"In-page 'More Events' loop failed after {clicks} click(s): {error}")
+    return clicks, total
+
+
+# Embedded structured data: JSON-LD blocks and the app's hydration state
+STRUCTURED_DATA_JS = """
+const blocks = Array.from(document.querySelectorAll('script[type="application/ld+json"]')).map(s => s.textContent);
+const state = document.getElementById("__NEXT_DATA__");
+if (state) blocks.push(state.textContent);
+return blocks;
+"""
+EXTRACT_MODES = ("auto", "json", "drain", "html")
+
+
+def _walk(node):
+    """Every dict nested anywhere in parsed JSON."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def _event_fields(node):
+    """``(start date, start time, theatre, location)`` of a JSON-LD ``Event`` or a hydrated event
+    object, None for anything else."""
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    if any(isinstance(t, str) and t.endswith("Event") for t in types) and node.get("startDate"):
+        start = str(node["startDate"])
+        place = node.get("location") or {}
+        place = place[0] if isinstance(place, list) and place else place
+        address = place.get("address") or {} if isinstance(place, dict) else {}
+        if isinstance(address, dict):
+            location = ", ".join(filter(None, (address.get("addressLocality"), address.get("addressRegion"))))
+        else:
+            location = str(address)
+        theatre = place.get("name", "") if isinstance(place, dict) else str(place)
+        date_part, _, time_part = start.partition("T")
+        return date_part, time_part[:5], theatre, location
+    start = (node.get("dates") or {}).get("start") if isinstance(node.get("dates"), dict) else None
+    if isinstance(start, dict) and start.get("localDate"):
+        venues = (node.get("_embedded") or {}).get("venues") or node.get("venues") or [{}]
+        venue = venues[0] if isinstance(venues, list) and venues else {}
+        city = (venue.get("city") or {}).get("name")
+        state = (venue.get("state") or {}).get("stateCode")
+        return start["localDate"], (start.get("localTime") or "")[:5], venue.get("name", ""), \
+            ", ".join(filter(None, (city, state)))
+    return None
+
+
+def _link_key(url):
+    """``https://www.ticketmaster.com/wicked-tickets/artist/805926/?x=1`` -> ``ticketmaster.com/wicked-tickets/artist/805926``."""
+    parts = urlsplit(str(url or "").strip())
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    return host + parts.path.rstrip("/")
+
+
+def _event_refs(node):
+    """``(urls, ids, names)`` saying which show a structured event is of: the event's own url and
+    name, and those of its JSON-LD performers / work performed or hydrated attractions."""
+    related = []
+    for key in ("performer", "workPerformed", "superEvent"):
+        value = node.get(key)
+        related.extend(value if isinstance(value, list) else [value])
+    attractions = (node.get("_embedded") or {}).get("attractions") or node.get("attractions") or []
+    related.extend(attractions if isinstance(attractions, list) else [attractions])
+    related = [item for item in related if isinstance(item, dict)]
+
+    urls, ids, names = {node.get("url")}, set(), {node.get("name")}
+    for item in related:
+        urls.update((item.get("url"), item.get("@id")))
+        ids.update((item.get("id"), item.get("legacyId")))
+        names.add(item.get("name"))
+    return ({_link_key(url) for url in urls if isinstance(url, str) and url},
+            {str(i) for i in ids if i not in (None, "")},
+            {title_key(name) for name in names if isinstance(name, str)} - {""})
+
+
+def is_show_event(node, entry):
+    """Whether a structured event belongs to ``entry``'s show (not a "you may also like" one):
+    same link, an attraction id in the show's link, or the same title."""
+    link = _link_key(entry["Link"])
+    urls, ids, names = _event_refs(node)
+    return link in urls or bool(ids & set(link.split("/"))) or title_key(entry["Name"]) in names
+
+
+def structured_events(blocks, entry):
+    """Rows for the show's events in the page's embedded JSON blocks (one parse per block), in date order.
+
+    Pages also embed other shows' events (recommendations, related
+    shows); only those ``is_show_event`` attributes to ``entry`` are kept.
+    """
+    found = set()
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except (TypeError, ValueError):
+            continue
+        for node in _walk(data):
+            fields = _event_fields(node)
+            if fields is not None and is_show_event(node, entry):
+                found.add(fields)
+
+    rows = []
+    for performed_on, starts_at, theatre, location in sorted(found):
+        rows.append({
+            "Show": entry["Name"],
+            "Link": entry["Link"],
+            "Image url": entry["Image url"],
+            "Theatre": theatre,
+            "Date": event_date(performed_on),
+            "Time": event_time(starts_at),
+            "Location": location,
+        })
+    return rows
+
+
+def scrape_show_detail(driver, wait, idx, entry, mode="auto"):
+    """Return one row per event of a show.
+
+    ``mode="json"`` reads the events from the page's embedded structured data
+    (JSON-LD / hydration state), which doesn't depend on the generated class
+    names; ``"drain"`` loads the whole listing with one in-page script that
+    clicks "More Events" until it is gone, then parses it in one pass;
+    ``"html"`` pages through "More Events" from Python and parses only the
+    items added by each click; ``"auto"`` uses the embedded data and falls
+    back to draining the listing when it has no events.  A failed drain
+    falls back to paging from Python.
+    """
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"Unknown extraction mode '{mode}'. Choose from: {', '.join(EXTRACT_MODES)}")
+    actions = ActionChains(driver)
+    get_page(driver, entry["Link"])
+    time.sleep(random.uniform(2, 4))
+
+    if mode != "html":
+        show_rows = structured_events(driver.execute_script(STRUCTURED_DATA_JS), entry)
+        log_and_print(f"🧾 {len(show_rows)} event(s) in the page's structured data.")
+        if show_rows or mode == "json":
+            return show_rows
+        log_and_print("↩️ No structured events; reading the event listing instead.")
+
+    try:
+        wait.until(
+            EC.element_to_be_clickable(
+                (By.XPATH, '//*[@id="pageInfo"]/div[1]/ul/li[1]/button')
+            )
+        ).click()
+        log_and_print("🧭 Expanded the event listing.")
+        time.sleep(random.uniform(2, 3))
+    except Exception:
+        pass
+
+    drained = False
+    if mode in ("auto", "drain"):
+        try:
+            clicks, total = drain_more_events(driver)
+            drained = True
+            log_and_print(f"📥 Loaded {total} event listings with {clicks} 'More Events' click(s) in the page.")
+        except Exception as e:
+            log_and_print(f"⚠️ {e}; paging through 'More Events' instead.")
+
+    show_rows = []
+    scraped = set()  # (date, time, theatre) of the events already in show_rows
+    seen = 0         # listing items already parsed
+    while True:
+        total, events = new_event_items(driver, seen)
+        if total < seen:
+            # The listing was re-rendered from scratch: read it again, skipping events already scraped
+            log_and_print(f"🔁 Event listing re-rendered ({total} items, {seen} read); re-reading it.")
+            total, events = new_event_items(driver, 0)
+        log_and_print(f"🔍 Found {len(events)} new event listings ({total} in total).")
+        seen = total
+
+        for i, event in enumerate(events):
+            try:
+                show_info = parse_event(event, entry)
+                key = (show_info["Date"], show_info["Time"], show_info["Theatre"])
+                if key in scraped:
+                    continue
+                scraped.add(key)
+                show_rows.append(show_info)
+                log_and_print(
+                    f"✅ Scraped event: {show_info['Date']} - {show_info['Time']} @ {show_info['Theatre']}"
+                )
+
+            except Exception as e:
+                log_and_print(f"⚠️ Error parsing event #{seen - len(events) + i + 1} for {entry['Name']}: {e}")
+
+        if drained:
+            break
+        try:
+            more_events_button = wait.until(
+                EC.element_to_be_clickable(
+                    (
+                        By.XPATH,
+                        "//span[text()='More Events']/ancestor::button",
+                    )
+                )
+            )
+            actions.move_to_element(more_events_button).perform()
+            more_events_button.click()
+            # Wait for the new items rather than a fixed pause
+            wait.until(lambda d: d.execute_script(COUNT_EVENTS_JS, EVENT_SELECTOR) != seen)
+            log_and_print("📥 Loaded more events.")
+        except:
+            log_and_print("🔚 No more events to load.")
+            break
+
+    return show_rows
+
+
+# --- Scraper Logic ---
+def scrape_shows(resume=False, formats=("ndjson", "csv"), new_only=False, extract="auto"):  # No longer takes 'headless_mode' as an argument
+    start_time = datetime.now()
+    log_and_print(f"🚀 Scraping started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
     driver = None
+    finished = False
+    failed = []  # links of shows whose scrape raised: the output doesn't list them
+    checkpoint = Checkpoint("ticketmaster", resume=resume)
+    writer = open_writer("ticketmaster", COLUMNS, formats, dedup="all" if new_only else "run")
+    if checkpoint.completed:
+        for show_rows in checkpoint.rows():
+            writer.write_rows(show_rows)
+        log_and_print(f"♻️ Resumed {len(checkpoint.completed)} show(s) from the checkpoint.")
     try:
-        driver = uc.Chrome(options=options)
-        driver.get("https://www.ticketmaster.com/broadway")
-        log_and_print("🌐 Navigated to Broadway Ticketmaster page.")
-        time.sleep(random.uniform(2, 4))
-
-        soup = BeautifulSoup(driver.page_source, "lxml")
-        cards = soup.find_all("div", class_="card item ny-category-musicals ny")
-        log_and_print(f"📦 Found {len(cards)} show cards on the main page.")
-
-        links = []
-        for i, item in enumerate(cards):
-            name = item.find("h3").text.strip() if item.find("h3") else "N/A"
-            link = item.find("a")["href"] if item.find("a") else ""
-            img = item.find("img")["src"] if item.find("img") else ""
-            if link:
-                links.append({"Name": name, "Link": link, "Image url": img})
-                log_and_print(f"🔗 [{i+1}] Found show: {name} - {link}")
+        driver = start_driver()
+        links = scrape_show_cards(driver)
 
         wait = WebDriverWait(driver, 10)
-        actions = ActionChains(driver)
-        
-        all_scraped_data = []
 
         for idx, entry in enumerate(links):
+            if checkpoint.is_done(entry["Link"]):
+                log_and_print(f"⏭️ Skipping show #{idx + 1}: {entry['Name']} (already in checkpoint)")
+                continue
+
             log_and_print(
                 f"\n➡️ Visiting show #{idx + 1}: {entry['Name']} ({entry['Link']})"
             )
             try:
-                driver.get(entry["Link"])
-                time.sleep(random.uniform(2, 4))
-
-                try:
-                    wait.until(
-                        EC.element_to_be_clickable(
-                            (By.XPATH, '//*[@id="pageInfo"]/div[1]/ul/li[1]/button')
-                        )
-                    ).click()
-                    log_and_print("🧭 Expanded the event listing.")
-                    time.sleep(random.uniform(2, 3))
-                except Exception:
-                    pass
-
-                event_count_current_show = 0
-                while True:
-                    soup = BeautifulSoup(driver.page_source, "lxml")
-                    events = soup.find_all("li", class_="sc-a4c9d98c-1 gmqiju")
-                    log_and_print(f"🔍 Found {len(events)} event listings.")
-
-                    for i, event in enumerate(events):
-                        try:
-                            date = event.find("div", class_="sc-d4c18b64-0 kViXXz")
-                            time_ = event.find("span", class_="sc-5ae165d4-1 xHFfV")
-                            span_tags = event.find_all(
-                                "span", class_="sc-cce7ae2b-8 eHUDaT"
-                            )
-                            thea = span_tags[-1] if len(span_tags) > 0 else None
-                            loc = span_tags[-2] if len(span_tags) > 1 else None
-
-                            show_info = {
-                                "Show": entry["Name"],
-                                "Link": entry["Link"],
-                                "Image url": entry["Image url"],
-                                "Theatre": thea.text.strip() if thea else "",
-                                "Date": date.text.strip() if date else "",
-                                "Time": time_.text.strip() if time_ else "",
-                                "Location": loc.text.strip() if loc else "",
-                            }
-
-                            all_scraped_data.append(show_info)
-                            event_count_current_show += 1
-                            log_and_print(
-                                f"✅ Scraped event: {show_info['Date']} - {show_info['Time']} @ {show_info['Theatre']}"
-                            )
-
-                        except Exception:
-                            pass
-
-                    try:
-                        more_events_button = wait.until(
-                            EC.element_to_be_clickable(
-                                (
-                                    By.XPATH,
-                                    "//span[text()='More Events']/ancestor::button",
-                                )
-                            )
-                        )
-                        actions.move_to_element(more_events_button).perform()
-                        more_events_button.click()
-                        log_and_print("📥 Loaded more events.")
-                        time.sleep(2)
-                    except:
-                        log_and_print("🔚 No more events to load.")
-                        break
-
+                show_rows = scrape_show_detail(driver, wait, idx, entry, mode=extract)
+                writer.write_rows(show_rows)
+                checkpoint.record(entry["Link"], show_rows)
                 log_and_print(
-                    f"📌 Finished scraping {entry['Name']} with {event_count_current_show} events processed.\n"
+                    f"📌 Finished scraping {entry['Name']} with {len(show_rows)} events processed.\n"
                 )
 
-            except Exception:
-                pass
-
-        log_and_print("🛑 Browser closed.")
-
-        if all_scraped_data:
-            log_and_print(f"🎉 Total events scraped: {len(all_scraped_data)}")
+            except CircuitOpenError as e:
+                log_and_print(f"⛔ {e}. Skipping the remaining shows.")
+                break
+            except Exception as e:
+                log_and_print(f"🚫 Error scraping show {entry['Name']}: {e}")
+                failed.append(entry["Link"])
         else:
-            log_and_print("📭 No events scraped.")
-
-        if not os.path.exists("data"):
-            os.makedirs("data")
-
-        now = datetime.now().strftime("%Y%m%d_%H%M%S")
-        json_path = f"data/ticketmaster_{now}.json"
-        csv_path = f"data/ticketmaster_{now}.csv"
-
-        pd.DataFrame(all_scraped_data).to_json(json_path, orient="records", indent=2)
-        pd.DataFrame(all_scraped_data).to_csv(csv_path, index=False)
+            finished = True
 
-        log_and_print(f"💾 Scraped data exported to:\n - {json_path}\n - {csv_path}")
+        log_and_print("🛑 Browser closed.")
 
     except Exception as e:
         log_and_print(f"❌ Fatal error in scraping function: {e}")
     finally:
         if driver:
             driver.quit()
+        # A show that failed is missing from the output, not gone from the site
+        writer.close(complete=finished and not failed)
+        if failed:
+            log_and_print(f"⚠️ {len(failed)} show(s) failed; their listings are left as they were.")
+        if writer.rows_written:
+            log_and_print(f"🎉 Total events scraped: {writer.rows_written}")
+            paths = "\n - ".join(writer.paths)
+            log_and_print(f"💾 Scraped data exported to:\n - {paths}")
+        else:
+            log_and_print("📭 No events scraped.")
+        if finished:
+            checkpoint.clear()
+        else:
+            checkpoint.close()
+            log_and_print(f"💾 Run incomplete; checkpoint kept at {checkpoint.path}. Rerun with --resume.")
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         log_and_print(
             f"✅ Scraping finished at {end_time.strftime('%Y-%m-%d %H:%M:%S')} (Duration: {duration:.2f} seconds)"
         )
 
+    return writer.rows_written
+
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
-    scrape_shows()  # Calls the scraper directly
+    parser = argparse.ArgumentParser(description="Scrape Ticketmaster Broadway event listings.")
+    parser.add_argument("--resume", action="store_true", help="Skip shows recorded in the checkpoint from an interrupted run")
+    parser.add_argument("--formats", type=parse_formats, default=("ndjson", "csv"), help="Output formats, e.g. ndjson,csv")
+    parser.add_argument("--new-only", action="store_true", help="Only write performances no earlier run has written (saved to data/new/)")
+    parser.add_argument("--extract", choices=EXTRACT_MODES, default="auto",
+                        help="Read events from the page's embedded JSON, the listing drained in-page or paged from Python, "
+                             "or JSON falling back to the drained listing")
+    args = parser.parse_args()
+    scrape_shows(resume=args.resume, formats=args.formats, new_only=args.new_only, extract=args.extract)  # Calls the scraper directly
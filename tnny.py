@@ -1,5 +1,4 @@
 # ========== Import Required Libraries ==========
-import csv  # For writing data to CSV files
 import os  # For creating folders and handling paths
 import time  # For adding delays (e.g., waiting for pages to load)
 from datetime import datetime  # For working with dates and times
@@ -8,6 +7,9 @@ import undetected_chromedriver as uc  # For bypassing bot detection in Chrome
 from selenium.webdriver.common.by import By  # For locating elements
 from selenium.webdriver.support.ui import WebDriverWait  # To wait until elements are available
 from selenium.webdriver.support import expected_conditions as EC  # Expected conditions for waits
+from scrapers.retry import DEFAULT_POLICY, CircuitOpenError, breaker_for, get_page, is_retryable  # Shared retry policy
+from scrapers.export import prepare  # Vectorised cleanup and status derivation
+from scrapers.writer import open_writer  # Streams rows to data/ as they are scraped
 
 # ========== Setup Logging ==========
 # Create 'log' folder if it doesn't exist
@@ -31,6 +33,19 @@ console_handler.setFormatter(console_formatter)
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
+# Columns of the output CSV, in order
+COLUMNS = [
+    "title",
+    "event_url",
+    "image_url",
+    "status",
+    "production_type",
+    "date_time",
+    "origin",
+    "market_presence",
+    "age_of_production",
+]
+
 # ========== Set Up Chrome Driver ==========
 def setup_driver():
     options = uc.ChromeOptions()
@@ -60,13 +75,9 @@ def setup_driver():
 # ========== Load Page and Wait for It ==========
 def load_page(driver, url):
     try:
-        driver.get(url)  # Navigate to URL
+        # Navigate and wait until body tag appears, retrying transient failures
+        get_page(driver, url, wait_for="body", timeout=20)
         logging.info(f"Navigated to {url}")
-
-        # Wait until body tag appears (ensures page is loaded)
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
         logging.info("Page fully loaded")
         return True
     except Exception as e:
@@ -241,6 +252,8 @@ def extract_events(driver):
         event_data_list = []
         processed_urls = set()
         index = 0
+        attempt = 1  # Attempt number for the current event
+        breaker = breaker_for(driver.current_url)
 
         while True:
             # Refresh events list every loop to get fresh DOM references
@@ -252,6 +265,7 @@ def extract_events(driver):
                 break
 
             try:
+                breaker.before_call()
                 event = events[index]
                 button = event.find_element(By.CSS_SELECTOR, "button.ot_prodInfoButton")
                 driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", button)
@@ -274,16 +288,35 @@ def extract_events(driver):
                 details = extract_event_details(driver)
                 event_data_list.append(details)
                 logging.info(f"Extracted event #{index + 1} details: {details}")
+                breaker.record_success()
 
                 driver.back()
                 click_second_toggle_button(driver)
                 index += 1
+                attempt = 1
+
+            except CircuitOpenError as e:
+                logging.error(f"{e}. Stopping event extraction.")
+                break
 
             except Exception as e:
                 logging.error(f"Error processing event #{index + 1}: {e}")
+                retryable = is_retryable(e)
+                if retryable:
+                    breaker.record_failure()
+
+                # Only transient errors get another attempt at the same event, with backoff
+                if retryable and attempt < DEFAULT_POLICY.attempts:
+                    delay = DEFAULT_POLICY.backoff(attempt)
+                    logging.info(f"Retrying event #{index + 1} in {delay:.1f}s (attempt {attempt + 1})")
+                    time.sleep(delay)
+                    attempt += 1
+                else:
+                    index += 1
+                    attempt = 1
+
                 driver.back()
                 click_second_toggle_button(driver)
-                index += 1
 
         return event_data_list
 
@@ -293,11 +326,14 @@ def extract_events(driver):
 
 
 # ========== Main Execution ==========
-def main():
+def main(formats=("csv",), new_only=False):
     url = "https://ci.ovationtix.com/35583/production/1152995"
+    started = datetime.now()
     driver = setup_driver()  # Launch Chrome in headless mode
 
-    all_events = []  # This will hold all event data to be written to CSV
+    writer = open_writer("tnny_events", COLUMNS, formats, dedup="all" if new_only else "run")  # Rows are written as each event page finishes
+    finished = False  # every event page visited (a partial run must not mark the rest dropped)
+    failed = []  # event pages whose scrape raised: their performances aren't in the output
 
     try:
         # Step 1: Load the main page
@@ -320,7 +356,7 @@ def main():
                     # Step 5: Visit each event URL and extract detailed data                      
                     for idx, link in enumerate(event_links, start=1):
                         try:
-                            driver.get(link["event_url"])
+                            get_page(driver, link["event_url"])
                             time.sleep(2)
 
                             event_data = extract_event_details(driver)
@@ -333,31 +369,17 @@ def main():
                                 merged_data[key] = val1 if val1 not in [None, "", "N/A"] else val2
 
                             # Go through each date/time combo
+                            event_rows = []
                             for date_time in merged_data.get("date_times", []):
                                 # Check if title is missing
                                 if not merged_data.get("title") or merged_data.get("title") == "N/A":
                                     logging.warning(f"Missing title for event: {merged_data.get('event_url')}")
 
-                                # Determine event status (upcoming, active, closed)
-                                try:
-                                    event_datetime = datetime.strptime(date_time, "%d %B %Y - %I:%M %p")
-                                    now = datetime.now()
-                                    if abs((event_datetime - now).total_seconds()) <= 300:
-                                        status = "active"
-                                    elif event_datetime > now:
-                                        status = "upcoming"
-                                    else:
-                                        status = "closed"
-                                except Exception as e:
-                                    logging.warning(f"Could not parse date_time '{date_time}' for status: {e}")
-                                    status = "N/A"
-
                                 # Append event data
-                                all_events.append({
+                                event_rows.append({
                                     "title": merged_data.get("title", "N/A"),
                                     "event_url": merged_data.get("event_url", "N/A"),
                                     "image_url": merged_data.get("image_url", "N/A"),
-                                    "status": status,
                                     "production_type": merged_data.get("production_type", "N/A"),
                                     "date_time": date_time,
                                     "origin": "N/A",
@@ -365,8 +387,18 @@ def main():
                                     "age_of_production": "N/A",  
                                 })
 
+                            # Clean up and derive each performance's status (against the run's start),
+                            # then save this event page's rows straight away
+                            writer.write_rows(prepare("tnny_events", event_rows, COLUMNS, now=started, status="datetime"))
+
+                        except CircuitOpenError as e:
+                            logging.error(f"{e}. Skipping the remaining event pages.")
+                            break
                         except Exception as e:
                             logging.error(f"Error scraping event page {link['event_url']}: {e}")
+                            failed.append(link["event_url"])
+                    else:
+                        finished = True
 
                 else:
                     logging.warning("No event URLs were extracted.")
@@ -375,37 +407,22 @@ def main():
         else:
             logging.error("Page did not load properly.")
 
-        # Step 8: Save results to CSV if data was collected
-        if all_events:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"data/tnny_events_{timestamp}.csv"
-            os.makedirs("data", exist_ok=True)
-            with open(filename, mode="w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=[
-                        "title",
-                        "event_url",
-                        "image_url",
-                        "status",
-                        "production_type",
-                        "date_time",
-                        "origin",	
-                        "market_presence",
-                        "age_of_production",
-                    ],
-                )
-                writer.writeheader()
-                writer.writerows(all_events)
-            logging.info(f"Successfully saved {len(all_events)} records to {filename}")
-        else:
-            logging.warning("No event data collected. CSV not created.")
-
     finally:
         # Step 9: Always quit the driver to release resources
         driver.quit()
         del driver  # Helps suppress warning messages in Windows
 
+        # Step 10: Close the output files and report what was saved
+        writer.close(complete=finished and not failed)
+        if failed:
+            logging.warning(f"{len(failed)} event page(s) failed; their listings are left as they were.")
+        if writer.rows_written:
+            logging.info(f"Successfully saved {writer.rows_written} records to {', '.join(writer.paths)}")
+        else:
+            logging.warning("No event data collected. CSV not created.")
+
+    return writer.rows_written
+
 # Run the script
 if __name__ == "__main__":
     main()
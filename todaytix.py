@@ -1,8 +1,6 @@
 import re
 import os
 import time
-import json
-import hashlib
 import logging
 import pandas as pd
 from datetime import datetime, date
@@ -35,10 +33,6 @@ def log_and_print(message):
     print(message)
     logging.info(message)
 
-# --- Hash function for (potential) deduplication ---
-def hash_event(event):
-    return hashlib.md5(json.dumps(event, sort_keys=True).encode()).hexdigest()
-
 # --- Scraper Logic ---
 def scrape_shows():
     start_time = datetime.now()